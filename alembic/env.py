@@ -27,8 +27,10 @@ fileConfig(config.config_file_name)
 # for 'autogenerate' support
 from app.models.business import Business
 from app.models.service import Service
+from app.models.service_snapshot import ServiceSnapshot
 from app.models.booking import Booking
 from app.models.payment import Payment
+from app.models.idempotency import IdempotencyKey
 
 # target_metadata = mymodel.Base.metadata
 target_metadata = sqlmodel.SQLModel.metadata
@@ -0,0 +1,25 @@
+"""add booking price breakdown
+
+Revision ID: 3c6e1d9a4f02
+Revises: 58916f4895c7
+Create Date: 2026-10-19 09:12:31.402118
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c6e1d9a4f02"
+down_revision = "58916f4895c7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("bookings", sa.Column("price_breakdown", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("bookings", "price_breakdown")
@@ -0,0 +1,149 @@
+"""dedupe booking service snapshots
+
+Revision ID: 5d8e3b17a6c4
+Revises: e41a7c5d2b96
+Create Date: 2026-10-19 12:41:19.830457
+
+"""
+
+import hashlib
+import json
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "5d8e3b17a6c4"
+down_revision = "e41a7c5d2b96"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+BATCH_SIZE = 1000
+
+
+def content_hash(data):
+    # Must match app.utils.hashing.content_hash
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def upgrade():
+    op.create_table(
+        "service_snapshots",
+        sa.Column("hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("service_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("snapshot", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.create_index(
+        op.f("ix_service_snapshots_service_id"),
+        "service_snapshots",
+        ["service_id"],
+        unique=False,
+    )
+    op.add_column(
+        "bookings",
+        sa.Column(
+            "service_snapshot_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=True
+        ),
+    )
+
+    bind = op.get_bind()
+    before = bind.execute(
+        sa.text(
+            "SELECT coalesce(sum(pg_column_size(service_snapshot)), 0) FROM bookings"
+        )
+    ).scalar()
+
+    # Backfill in keyset-ordered batches, inserting each distinct snapshot once
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, service_id, service_snapshot FROM bookings "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        snapshots = {}
+        assignments = []
+        for booking_id, service_id, snapshot in rows:
+            snapshot_hash = content_hash(snapshot)
+            snapshots[snapshot_hash] = (service_id, snapshot)
+            assignments.append({"id": booking_id, "hash": snapshot_hash})
+
+        bind.execute(
+            sa.text(
+                "INSERT INTO service_snapshots (hash, service_id, snapshot, created_at) "
+                "VALUES (:hash, :service_id, CAST(:snapshot AS json), now()) "
+                "ON CONFLICT (hash) DO NOTHING"
+            ),
+            [
+                {
+                    "hash": snapshot_hash,
+                    "service_id": service_id,
+                    "snapshot": json.dumps(snapshot),
+                }
+                for snapshot_hash, (service_id, snapshot) in snapshots.items()
+            ],
+        )
+        bind.execute(
+            sa.text("UPDATE bookings SET service_snapshot_hash = :hash WHERE id = :id"),
+            assignments,
+        )
+        last_id = rows[-1][0]
+
+    after = bind.execute(
+        sa.text(
+            "SELECT coalesce(sum(pg_column_size(snapshot)), 0) FROM service_snapshots"
+        )
+    ).scalar()
+    logger.info(
+        "service snapshots: %s bytes inline -> %s bytes deduplicated (%s bytes saved)",
+        before,
+        after,
+        before - after,
+    )
+
+    op.alter_column("bookings", "service_snapshot_hash", nullable=False)
+    op.create_index(
+        op.f("ix_bookings_service_snapshot_hash"),
+        "bookings",
+        ["service_snapshot_hash"],
+        unique=False,
+    )
+    op.create_foreign_key(
+        "bookings_service_snapshot_hash_fkey",
+        "bookings",
+        "service_snapshots",
+        ["service_snapshot_hash"],
+        ["hash"],
+    )
+    op.drop_column("bookings", "service_snapshot")
+
+
+def downgrade():
+    op.add_column("bookings", sa.Column("service_snapshot", sa.JSON(), nullable=True))
+    op.execute(
+        "UPDATE bookings SET service_snapshot = service_snapshots.snapshot "
+        "FROM service_snapshots WHERE service_snapshots.hash = bookings.service_snapshot_hash"
+    )
+    op.alter_column("bookings", "service_snapshot", nullable=False)
+    op.drop_constraint(
+        "bookings_service_snapshot_hash_fkey", "bookings", type_="foreignkey"
+    )
+    op.drop_index(op.f("ix_bookings_service_snapshot_hash"), table_name="bookings")
+    op.drop_column("bookings", "service_snapshot_hash")
+    op.drop_index(
+        op.f("ix_service_snapshots_service_id"), table_name="service_snapshots"
+    )
+    op.drop_table("service_snapshots")
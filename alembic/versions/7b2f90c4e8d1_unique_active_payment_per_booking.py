@@ -0,0 +1,48 @@
+"""unique active payment per booking
+
+Revision ID: 7b2f90c4e8d1
+Revises: 3c6e1d9a4f02
+Create Date: 2026-10-19 10:03:47.118520
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7b2f90c4e8d1"
+down_revision = "3c6e1d9a4f02"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cancel duplicate open payments so the unique index can be built; the
+    # succeeded payment (or else the newest one) is kept for each booking.
+    op.execute(
+        """
+        UPDATE payments SET status = 'CANCELLED', updated_at = now()
+        WHERE status IN ('PENDING', 'PROCESSING')
+          AND booking_id IS NOT NULL
+          AND id NOT IN (
+            SELECT DISTINCT ON (booking_id) id FROM payments
+            WHERE booking_id IS NOT NULL
+              AND status IN ('PENDING', 'PROCESSING', 'SUCCEEDED')
+            ORDER BY booking_id, (status = 'SUCCEEDED') DESC, created_at DESC
+          )
+        """
+    )
+    op.create_index(
+        "uq_payments_active_booking",
+        "payments",
+        ["booking_id"],
+        unique=True,
+        postgresql_where=sa.text(
+            "booking_id IS NOT NULL AND status IN ('PENDING', 'PROCESSING', 'SUCCEEDED')"
+        ),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_payments_active_booking", table_name="payments")
@@ -0,0 +1,34 @@
+"""add bookings service scheduled_at index
+
+Revision ID: 7f1c5b2e9d63
+Revises: e3b9a61d0f24
+Create Date: 2026-10-19 19:25:37.604118
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "7f1c5b2e9d63"
+down_revision = "e3b9a61d0f24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_bookings_service_scheduled_at",
+        "bookings",
+        ["service_id", "scheduled_at", "id"],
+        unique=False,
+    )
+    # Lookups by service_id alone use the leading column of the new index
+    op.drop_index("ix_bookings_service_id", table_name="bookings")
+
+
+def downgrade():
+    op.create_index("ix_bookings_service_id", "bookings", ["service_id"], unique=False)
+    op.drop_index("ix_bookings_service_scheduled_at", table_name="bookings")
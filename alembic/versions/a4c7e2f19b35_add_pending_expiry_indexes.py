@@ -0,0 +1,37 @@
+"""add pending expiry indexes
+
+Revision ID: a4c7e2f19b35
+Revises: 5d8e3b17a6c4
+Create Date: 2026-10-19 15:42:18.306117
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a4c7e2f19b35"
+down_revision = "5d8e3b17a6c4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_bookings_pending_created_at",
+        "bookings",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "ix_payments_pending_created_at",
+        "payments",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_payments_pending_created_at", table_name="payments")
+    op.drop_index("ix_bookings_pending_created_at", table_name="bookings")
@@ -0,0 +1,28 @@
+"""add idempotency key lease
+
+Revision ID: b52d8e0a3f17
+Revises: 7f1c5b2e9d63
+Create Date: 2026-10-19 20:14:48.106235
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "b52d8e0a3f17"
+down_revision = "7f1c5b2e9d63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "idempotency_keys", sa.Column("locked_until", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("idempotency_keys", "locked_until")
@@ -0,0 +1,37 @@
+"""expire processing payments
+
+Revision ID: c6a2f41e8b07
+Revises: b52d8e0a3f17
+Create Date: 2026-10-19 21:06:37.512904
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c6a2f41e8b07"
+down_revision = "b52d8e0a3f17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_payments_open_created_at",
+        "payments",
+        ["created_at"],
+        postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING')"),
+    )
+    op.drop_index("ix_payments_pending_created_at", table_name="payments")
+
+
+def downgrade():
+    op.create_index(
+        "ix_payments_pending_created_at",
+        "payments",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.drop_index("ix_payments_open_created_at", table_name="payments")
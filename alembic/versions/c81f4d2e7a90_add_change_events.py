@@ -0,0 +1,49 @@
+"""add change events
+
+Revision ID: c81f4d2e7a90
+Revises: a4c7e2f19b35
+Create Date: 2026-10-19 17:08:51.442973
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "c81f4d2e7a90"
+down_revision = "a4c7e2f19b35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "change_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column(
+            "txid",
+            sa.BigInteger(),
+            server_default=sa.text("pg_current_xact_id()::text::bigint"),
+            nullable=False,
+        ),
+        sa.Column("entity", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("entity_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("user_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("action", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_change_events_user_cursor",
+        "change_events",
+        ["user_id", "txid", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_change_events_user_cursor", table_name="change_events")
+    op.drop_table("change_events")
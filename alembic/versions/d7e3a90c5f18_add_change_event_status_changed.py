@@ -0,0 +1,30 @@
+"""add change event status_changed
+
+Revision ID: d7e3a90c5f18
+Revises: c6a2f41e8b07
+Create Date: 2026-10-19 21:48:12.640381
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d7e3a90c5f18"
+down_revision = "c6a2f41e8b07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "change_events",
+        sa.Column(
+            "status_changed", sa.Boolean(), server_default=sa.true(), nullable=False
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("change_events", "status_changed")
@@ -0,0 +1,57 @@
+"""add webhook subscriptions
+
+Revision ID: e3b9a61d0f24
+Revises: c81f4d2e7a90
+Create Date: 2026-10-19 18:42:10.218337
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "e3b9a61d0f24"
+down_revision = "c81f4d2e7a90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "webhook_subscriptions",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("owner_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("url", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("secret", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_webhook_subscriptions_owner_id"),
+        "webhook_subscriptions",
+        ["owner_id"],
+        unique=False,
+    )
+    op.create_table(
+        "outbox_cursors",
+        sa.Column("consumer", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("txid", sa.BigInteger(), nullable=False),
+        sa.Column("event_id", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("consumer"),
+    )
+    op.create_index(
+        "ix_change_events_cursor", "change_events", ["txid", "id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index("ix_change_events_cursor", table_name="change_events")
+    op.drop_table("outbox_cursors")
+    op.drop_index(
+        op.f("ix_webhook_subscriptions_owner_id"), table_name="webhook_subscriptions"
+    )
+    op.drop_table("webhook_subscriptions")
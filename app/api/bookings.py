@@ -1,42 +1,135 @@
 # app/api/bookings.py
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Header, Query, Request, Response
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_session
 from app.services.booking_service import BookingService
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse
+from app.schemas.booking import (
+    BookingCalendarFilter,
+    BookingCreate,
+    BookingUpdate,
+    BookingResponse,
+)
+from app.services.idempotency_service import IdempotencyService
+from app.services.export_service import ExportService
+from app.schemas.export import ExportFormat
+from app.core.tracing import TracedRoute
 from app.security import get_current_user_id
-from .deps import get_booking_service
+from app.core.compression import skip_compression
+from app.utils.projection import parse_fields
+from app.utils.etags import etag_matches, items_etag, not_modified, resource_etag
+from app.utils.responses import list_response, next_page_headers
+from .deps import (
+    get_booking_calendar_filter,
+    get_booking_service,
+    get_idempotency_service,
+    get_export_service,
+)
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
 def create_booking(
     booking_in: BookingCreate,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
     booking_service: BookingService = Depends(get_booking_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
     current_user_id: str = Depends(get_current_user_id),
 ):
-    return booking_service.create(
-        booking_in=booking_in, current_user_id=current_user_id
+    return idempotency_service.run(
+        key=idempotency_key,
+        user_id=current_user_id,
+        scope="POST /bookings",
+        payload=booking_in,
+        action=lambda: booking_service.create(
+            booking_in=booking_in, current_user_id=current_user_id
+        ),
+        response_model=BookingResponse,
+        status_code=status.HTTP_201_CREATED,
     )
 
 
 @router.get("/", response_model=List[BookingResponse])
 def list_my_bookings(
+    request: Request,
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated list of fields to return"
+    ),
     booking_service: BookingService = Depends(get_booking_service),
     current_user_id: str = Depends(get_current_user_id),
 ):
-    return booking_service.list_user_bookings(current_user_id=current_user_id)
+    projection = parse_fields(fields, BookingResponse)
+    if request.headers.get("if-none-match"):
+        etag = booking_service.list_etag(current_user_id=current_user_id, fields=projection)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    bookings = booking_service.list_user_bookings(
+        current_user_id=current_user_id, fields=projection
+    )
+    return list_response(
+        bookings, BookingResponse, projection, headers={"ETag": items_etag(bookings, projection)}
+    )
+
+
+@router.get("/owned", response_model=List[BookingResponse])
+def list_owned_bookings(
+    request: Request,
+    filters: BookingCalendarFilter = Depends(get_booking_calendar_filter),
+    after: Optional[str] = Query(
+        default=None, description="Cursor from the previous page's Link header"
+    ),
+    limit: int = Query(default=100, ge=1, le=500),
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated list of fields to return"
+    ),
+    booking_service: BookingService = Depends(get_booking_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    """Bookings of the services you own, in scheduled order."""
+    projection = parse_fields(fields, BookingResponse)
+    bookings, next_cursor = booking_service.list_owned_bookings(
+        current_user_id=current_user_id,
+        filters=filters,
+        cursor=after,
+        limit=limit,
+        fields=projection,
+    )
+    return list_response(
+        bookings, BookingResponse, projection, headers=next_page_headers(request, next_cursor)
+    )
+
+
+@router.get("/export")
+@skip_compression
+def export_bookings(
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    compress: bool = Query(default=False, description="Compress the file with zstd"),
+    export_service: ExportService = Depends(get_export_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    return export_service.export_bookings(
+        user_id=current_user_id, export_format=export_format, compress=compress
+    )
 
 
 @router.get("/{booking_id}", response_model=BookingResponse)
 def get_booking(
     booking_id: str,
+    request: Request,
+    response: Response,
     booking_service: BookingService = Depends(get_booking_service),
     current_user_id: str = Depends(get_current_user_id),
 ):
-    return booking_service.get(booking_id=booking_id, user_id=current_user_id)
+    if request.headers.get("if-none-match"):
+        etag = booking_service.get_etag(booking_id=booking_id, user_id=current_user_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    booking = booking_service.get(booking_id=booking_id, user_id=current_user_id)
+    response.headers["ETag"] = resource_etag(booking.id, booking.updated_at)
+    return booking
 
 
 @router.patch("/{booking_id}", response_model=BookingResponse)
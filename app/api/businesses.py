@@ -7,9 +7,10 @@ from app.schemas.business import (
 )
 from app.services.business_service import BusinessService
 from app.api.deps import get_business_service
+from app.core.tracing import TracedRoute
 from app.security import get_current_user_id
 
-router = APIRouter(dependencies=[Depends(get_current_user_id)])
+router = APIRouter(route_class=TracedRoute, dependencies=[Depends(get_current_user_id)])
 
 
 @router.post("/", response_model=BusinessResponse, status_code=status.HTTP_201_CREATED)
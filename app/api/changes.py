@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from app.schemas.change import ChangeFeedResponse
+from app.core.tracing import TracedRoute
+from app.security import get_current_user_id
+from app.services.change_service import ChangeFeedService
+from .deps import get_change_feed_service
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.get("/", response_model=ChangeFeedResponse)
+def get_changes(
+    since: Optional[str] = Query(
+        default=None,
+        description="next_cursor of the previous page; omit to start at the beginning",
+    ),
+    limit: int = Query(default=100, ge=1, le=1000),
+    change_feed_service: ChangeFeedService = Depends(get_change_feed_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    return change_feed_service.since(user_id=current_user_id, cursor=since, limit=limit)
@@ -1,10 +1,19 @@
-from fastapi import Depends
+from datetime import datetime
+from typing import Optional
+from fastapi import Depends, Query
 from sqlmodel import Session
 
+from app.models.booking import BookingStatus
+from app.schemas.booking import BookingCalendarFilter
+
 from app.services.business_service import BusinessService
 from app.services.manage_service import ServiceManager
 from app.services.booking_service import BookingService
 from app.services.payment_service import PaymentService
+from app.services.idempotency_service import IdempotencyService
+from app.services.export_service import ExportService
+from app.services.change_service import ChangeFeedService
+from app.services.webhook_service import WebhookService
 
 from app.database import get_session
 from app.security import get_current_user_id
@@ -32,3 +41,39 @@ def get_payment_service(
     session: Session = Depends(get_session),
 ) -> PaymentService:
     return PaymentService(session)
+
+
+def get_idempotency_service(
+    session: Session = Depends(get_session),
+) -> IdempotencyService:
+    return IdempotencyService(session)
+
+
+def get_change_feed_service(
+    session: Session = Depends(get_session),
+) -> ChangeFeedService:
+    return ChangeFeedService(session)
+
+
+def get_webhook_service(
+    session: Session = Depends(get_session),
+) -> WebhookService:
+    return WebhookService(session)
+
+
+def get_export_service() -> ExportService:
+    return ExportService()
+
+
+def get_booking_calendar_filter(
+    scheduled_from: Optional[datetime] = Query(
+        default=None, alias="from", description="Bookings scheduled at or after this time"
+    ),
+    scheduled_to: Optional[datetime] = Query(
+        default=None, alias="to", description="Bookings scheduled before this time"
+    ),
+    status: Optional[BookingStatus] = Query(default=None),
+) -> BookingCalendarFilter:
+    return BookingCalendarFilter(
+        scheduled_from=scheduled_from, scheduled_to=scheduled_to, status=status
+    )
@@ -1,24 +1,55 @@
-from fastapi import APIRouter, Depends, status, HTTPException, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Header, Request, Response
 from sqlmodel import Session
 from typing import List, Optional
 from app.database import get_session
 from app.services.payment_service import PaymentService
 from app.schemas.payment import PaymentResponse, PaymentRequest
 
+from app.services.idempotency_service import IdempotencyService
+from app.services.export_service import ExportService
+from app.schemas.export import ExportFormat
+from app.core.tracing import TracedRoute
 from app.security import get_current_user_id
-from .deps import get_payment_service
+from app.core.compression import skip_compression
+from app.utils.projection import parse_fields
+from app.utils.etags import etag_matches, items_etag, not_modified, resource_etag
+from app.utils.responses import list_response
+from .deps import get_payment_service, get_idempotency_service, get_export_service
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[PaymentResponse])
 def get_payments(
+    request: Request,
     booking_id: Optional[str] = Query(default=None),
     reference_id: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated list of fields to return"
+    ),
     payment_service: PaymentService = Depends(get_payment_service),
     current_user_id : str = Depends(get_current_user_id)
 ):
-    return payment_service.list_payments(booking_id=booking_id, reference_id=reference_id, user_id=current_user_id)
+    projection = parse_fields(fields, PaymentResponse)
+    if request.headers.get("if-none-match"):
+        etag = payment_service.list_etag(
+            booking_id=booking_id,
+            reference_id=reference_id,
+            user_id=current_user_id,
+            fields=projection,
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    payments = payment_service.list_payments(
+        booking_id=booking_id,
+        reference_id=reference_id,
+        user_id=current_user_id,
+        fields=projection,
+    )
+    return list_response(
+        payments, PaymentResponse, projection, headers={"ETag": items_etag(payments, projection)}
+    )
 
 
 @router.post(
@@ -28,12 +59,37 @@ def get_payments(
 )
 def create_payment(
     payment_in: PaymentRequest,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
     payment_service: PaymentService = Depends(get_payment_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
     current_user_id: str = Depends(get_current_user_id)
 ):
-    return payment_service.create_payment(payment_in=payment_in, user_id=current_user_id)
+    return idempotency_service.run(
+        key=idempotency_key,
+        user_id=current_user_id,
+        scope="POST /payments",
+        payload=payment_in,
+        action=lambda: payment_service.create_payment(
+            payment_in=payment_in, user_id=current_user_id
+        ),
+        response_model=PaymentResponse,
+        status_code=status.HTTP_201_CREATED,
+    )
+
 
 
+@router.get("/export")
+@skip_compression
+def export_payments(
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    compress: bool = Query(default=False, description="Compress the file with zstd"),
+    export_service: ExportService = Depends(get_export_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    return export_service.export_payments(
+        user_id=current_user_id, export_format=export_format, compress=compress
+    )
+
 
 @router.get(
     "/{payment_id}",
@@ -42,7 +98,16 @@ def create_payment(
 )
 def get_payment(
     payment_id: str,
+    request: Request,
+    response: Response,
     payment_service: PaymentService = Depends(get_payment_service),
     current_user_id: str = Depends(get_current_user_id)
 ):
-    return payment_service.get(payment_id)
+    if request.headers.get("if-none-match"):
+        etag = payment_service.get_etag(payment_id)
+        if etag is not None and etag_matches(request, etag):
+            return not_modified(etag)
+
+    payment = payment_service.get(payment_id)
+    response.headers["ETag"] = resource_etag(payment.id, payment.updated_at)
+    return payment
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api import businesses, services, bookings, payments
+from app.api import businesses, services, bookings, payments, changes, webhooks
 from app.models.payment import Payment
 
 api_router = APIRouter()
@@ -7,3 +7,5 @@ api_router = APIRouter()
 api_router.include_router(services.router, prefix="/services", tags=["services"])
 api_router.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
 api_router.include_router(payments.router, prefix="/payments", tags=["payments"])
+api_router.include_router(changes.router, prefix="/changes", tags=["changes"])
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
@@ -1,20 +1,36 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, status, Query, Request, Response
 from typing import List, Optional
+from app.schemas.booking import BookingCalendarFilter, BookingResponse
 from app.schemas.service import ServiceResponse, ServiceCreate, ServiceUpdate
+from app.schemas.pricing import QuoteRequest, QuoteBatchResponse
+from app.services.booking_service import BookingService
 from app.services.manage_service import ServiceManager
+from app.core.tracing import TracedRoute
 from app.security import get_current_user_id
-from .deps import get_service_manager
+from app.utils.projection import parse_fields
+from app.utils.etags import etag_matches, not_modified, resource_etag
+from app.utils.responses import json_response, list_response, next_page_headers
+from .deps import get_booking_calendar_filter, get_booking_service, get_service_manager
 
 
-router = APIRouter(dependencies=[Depends(get_current_user_id)])
+router = APIRouter(route_class=TracedRoute, dependencies=[Depends(get_current_user_id)])
 
 
 @router.get("/", response_model=List[ServiceResponse])
 def list_services(
+    request: Request,
     q: Optional[str] = Query(default=None, description="Search by name or description"),
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated list of fields to return"
+    ),
     service_manager: ServiceManager = Depends(get_service_manager),
 ):
-    return service_manager.list(q)
+    projection = parse_fields(fields, ServiceResponse)
+    catalog = service_manager.catalog(q, fields=projection)
+    if etag_matches(request, catalog.etag):
+        return not_modified(catalog.etag)
+
+    return json_response(catalog.body, headers={"ETag": catalog.etag})
 
 
 @router.get("/my", response_model=List[ServiceResponse])
@@ -22,7 +38,9 @@ async def get_owner_businesses(
     service_manager: ServiceManager = Depends(get_service_manager),
     current_user_id: str = Depends(get_current_user_id),
 ):
-    return service_manager.list_by_owner_id(current_user_id)
+    return list_response(
+        service_manager.list_by_owner_id(current_user_id), ServiceResponse
+    )
 
 
 @router.post("/", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
@@ -37,12 +55,60 @@ async def create_service(
 
 @router.get("/{service_id}", response_model=ServiceResponse)
 def read_service(
-    service_id: str, service_manager: ServiceManager = Depends(get_service_manager)
+    service_id: str,
+    request: Request,
+    response: Response,
+    service_manager: ServiceManager = Depends(get_service_manager),
 ):
+    if request.headers.get("if-none-match"):
+        etag = service_manager.get_etag(service_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
     service = service_manager.get(service_id)
+    response.headers["ETag"] = resource_etag(service.id, service.updated_at)
     return service
 
 
+@router.get("/{service_id}/bookings", response_model=List[BookingResponse])
+def list_service_bookings(
+    service_id: str,
+    request: Request,
+    filters: BookingCalendarFilter = Depends(get_booking_calendar_filter),
+    after: Optional[str] = Query(
+        default=None, description="Cursor from the previous page's Link header"
+    ),
+    limit: int = Query(default=100, ge=1, le=500),
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated list of fields to return"
+    ),
+    booking_service: BookingService = Depends(get_booking_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    """Bookings of a service you own, in scheduled order."""
+    projection = parse_fields(fields, BookingResponse)
+    bookings, next_cursor = booking_service.list_service_bookings(
+        service_id=service_id,
+        current_user_id=current_user_id,
+        filters=filters,
+        cursor=after,
+        limit=limit,
+        fields=projection,
+    )
+    return list_response(
+        bookings, BookingResponse, projection, headers=next_page_headers(request, next_cursor)
+    )
+
+
+@router.post("/{service_id}/quotes", response_model=QuoteBatchResponse)
+def quote_service(
+    service_id: str,
+    quote_in: QuoteRequest,
+    service_manager: ServiceManager = Depends(get_service_manager),
+):
+    return service_manager.quote(service_id, quote_in)
+
+
 @router.patch("/{service_id}", response_model=ServiceResponse)
 def update_service(
     service_id: str,
@@ -0,0 +1,39 @@
+from typing import List
+from fastapi import APIRouter, Depends, status
+from app.schemas.webhook import WebhookCreate, WebhookCreatedResponse, WebhookResponse
+from app.core.tracing import TracedRoute
+from app.security import get_current_user_id
+from app.services.webhook_service import WebhookService
+from .deps import get_webhook_service
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.post(
+    "/", response_model=WebhookCreatedResponse, status_code=status.HTTP_201_CREATED
+)
+def create_webhook(
+    webhook_in: WebhookCreate,
+    webhook_service: WebhookService = Depends(get_webhook_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    """Be sent booking.created and payment.succeeded events for the services you own."""
+    return webhook_service.create(webhook_in, owner_id=current_user_id)
+
+
+@router.get("/", response_model=List[WebhookResponse])
+def list_webhooks(
+    webhook_service: WebhookService = Depends(get_webhook_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    return webhook_service.list_by_owner(owner_id=current_user_id)
+
+
+@router.delete("/{webhook_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_webhook(
+    webhook_id: str,
+    webhook_service: WebhookService = Depends(get_webhook_service),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    webhook_service.delete(webhook_id=webhook_id, owner_id=current_user_id)
+    return None
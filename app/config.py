@@ -1,7 +1,7 @@
 # config.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -13,12 +13,81 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ALLOWED_HOSTS: List[str] = ["*"]
+    DEBUG: bool = False
 
     model_config = SettingsConfigDict(env_file=".env")
 
     SOLANA_DESTINATION_ADDRESS: str
     MANDEL_COIN_MINT_ADDRESS: str
 
+    FAST_JSON_RESPONSES: bool = True
+
+    METRICS_ENABLED: bool = True
+    # Bearer token scrapers send to /metrics; unset, the endpoint refuses everyone
+    METRICS_TOKEN: Optional[str] = None
+    SQL_N_PLUS_ONE_THRESHOLD: int = 3
+
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    # "otlp_file" appends OTLP/JSON to TRACING_OTLP_FILE, "memory" keeps traces in process
+    TRACING_EXPORTER: str = "otlp_file"
+    TRACING_OTLP_FILE: str = "traces.jsonl"
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CPU_BUDGET_MS: float = 5.0
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_GZIP_LEVEL: int = 6
+
+    WARMUP_ENABLED: bool = True
+    # Connections opened at startup, at most the engine's pool size (5)
+    WARMUP_POOL_CONNECTIONS: int = 2
+
+    PRICING_CACHE_SIZE: int = 1024
+
+    SERVICE_CATALOG_CACHE_SIZE: int = 256
+    SERVICE_CATALOG_CACHE_TTL_SECONDS: float = 30.0
+
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 24 * 60 * 60
+    # An unfinished request older than this no longer blocks retries of its key
+    IDEMPOTENCY_LEASE_SECONDS: int = 60
+    IDEMPOTENCY_PURGE_BATCH_SIZE: int = 1000
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = 60 * 60
+
+    SCHEDULER_ENABLED: bool = True
+    # Intervals are spread by this fraction either way
+    SCHEDULER_JITTER: float = 0.1
+
+    PAYMENT_RECONCILE_INTERVAL_SECONDS: float = 60
+    PAYMENT_RECONCILE_BATCH_SIZE: int = 50
+
+    # Pending rows older than these are cancelled by the expiry sweep
+    BOOKING_PENDING_TTL_SECONDS: int = 24 * 60 * 60
+    PAYMENT_PENDING_TTL_SECONDS: int = 60 * 60
+    EXPIRY_SWEEP_INTERVAL_SECONDS: float = 5 * 60
+    EXPIRY_SWEEP_BATCH_SIZE: int = 500
+
+    # Change events are kept this long, and until every outbox consumer has
+    # read them; /changes readers polling less often than this miss events
+    CHANGE_EVENT_RETENTION_SECONDS: int = 7 * 24 * 60 * 60
+    CHANGE_EVENT_PURGE_BATCH_SIZE: int = 1000
+    CHANGE_EVENT_PURGE_INTERVAL_SECONDS: float = 60 * 60
+
+    WEBHOOK_DELIVERY_INTERVAL_SECONDS: float = 5
+    # Change events read per run, and at most this many per request
+    WEBHOOK_SCAN_LIMIT: int = 1000
+    WEBHOOK_BATCH_SIZE: int = 100
+    WEBHOOK_MAX_CONNECTIONS: int = 20
+    WEBHOOK_ENDPOINT_CONCURRENCY: int = 2
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_BACKOFF_SECONDS: float = 0.5
+    WEBHOOK_TIMEOUT_SECONDS: float = 10
+    # Batches still unsent after this long are given up on for the run
+    WEBHOOK_RUN_TIMEOUT_SECONDS: float = 30
+
     @field_validator("DATABASE_URL", "SECRET_KEY")
     @classmethod
     def must_not_be_empty(cls, v, info):
@@ -0,0 +1,219 @@
+import time
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ZSTD = "zstd"
+GZIP = "gzip"
+
+# Preferred first when the client accepts several encodings equally
+SUPPORTED_ENCODINGS = (ZSTD, GZIP)
+FAST_LEVELS = {ZSTD: 1, GZIP: 1}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/problem+json",
+    "text/",
+)
+
+
+def skip_compression(endpoint: Callable) -> Callable:
+    """Mark a route endpoint whose responses must be sent uncompressed."""
+    endpoint.skip_compression = True
+    return endpoint
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    wildcard = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, level: int):
+        if encoding == ZSTD:
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+            self._sync = lambda: self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self._finish = self._obj.flush
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._sync = lambda: self._obj.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = lambda: self._obj.flush(zlib.Z_FINISH)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._obj.compress(data) + (self._finish() if final else self._sync())
+
+
+class CompressionMiddleware:
+    """
+    Negotiated zstd / gzip response compression.
+
+    Bodies smaller than ``minimum_size``, non-text content types, responses
+    that already carry a Content-Encoding and endpoints marked with
+    ``skip_compression`` pass through untouched. The observed CPU cost per
+    byte is tracked for each encoding and level; a body whose estimated
+    cost exceeds ``cpu_budget_ms`` is compressed at the fastest level
+    instead, or not at all when even that would exceed the budget.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        cpu_budget_ms: float = 5.0,
+        zstd_level: int = 3,
+        gzip_level: int = 6,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cpu_budget = cpu_budget_ms / 1000
+        self.levels = {ZSTD: zstd_level, GZIP: gzip_level}
+        # (encoding, level) -> moving average of CPU seconds per input byte
+        self.costs: Dict[Tuple[str, int], float] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder)
+
+    def choose_level(self, encoding: str, size: int) -> Optional[int]:
+        for level in (self.levels[encoding], FAST_LEVELS[encoding]):
+            cost = self.costs.get((encoding, level))
+            if cost is None or cost * size <= self.cpu_budget:
+                return level
+        return None
+
+    def record_cost(self, encoding: str, level: int, size: int, seconds: float) -> None:
+        if size <= 0:
+            return
+        key = (encoding, level)
+        sample = seconds / size
+        previous = self.costs.get(key)
+        self.costs[key] = sample if previous is None else previous * 0.8 + sample * 0.2
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        scope: Scope,
+        send: Send,
+        encoding: str,
+    ):
+        self.middleware = middleware
+        self.scope = scope
+        self.send = send
+        self.encoding = encoding
+        self.level: Optional[int] = None
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if self.compressor is not None:
+            await self._send_compressed(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self._eligible() or (
+            not more_body and len(body) < self.middleware.minimum_size
+        ):
+            await self._pass_through(message)
+            return
+
+        # Streaming bodies are budgeted on their first chunk
+        self.level = self.middleware.choose_level(self.encoding, len(body))
+        if self.level is None:
+            await self._pass_through(message)
+            return
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        self.compressor = _Compressor(self.encoding, self.level)
+
+        if not more_body:
+            compressed = self._compress(body, final=True)
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        await self.send(self.start)
+        await self._send_compressed(message)
+
+    def _eligible(self) -> bool:
+        endpoint = self.scope.get("endpoint")
+        if getattr(endpoint, "skip_compression", False):
+            return False
+
+        headers = Headers(raw=self.start["headers"])
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def _pass_through(self, message: Message) -> None:
+        self.passthrough = True
+        if self.start is not None:
+            await self.send(self.start)
+        await self.send(message)
+
+    async def _send_compressed(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        compressed = self._compress(message.get("body", b""), final=not more_body)
+        await self.send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+    def _compress(self, data: bytes, final: bool) -> bytes:
+        started = time.thread_time()
+        compressed = self.compressor.compress(data, final=final)
+        self.middleware.record_cost(
+            self.encoding, self.level, len(data), time.thread_time() - started
+        )
+        return compressed
@@ -0,0 +1,284 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.statement_timing import observe_statements
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+DB = "db"
+SOLANA_RPC = "solana_rpc"
+AUTH = "auth"
+PHASES = (DB, SOLANA_RPC, AUTH)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_pairs(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class Histogram:
+    """
+    Prometheus histogram keyed by a tuple of label values.
+
+    Each series is a flat list of per-bucket counts followed by the sum and
+    the count; buckets are only made cumulative when rendered. Observations
+    are made from the event loop thread, so no lock is taken.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # Buckets, then +Inf, sum and count
+            series = self._series.setdefault(labels, [0] * (len(self.buckets) + 3))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in list(self._series.items()):
+            pairs = _label_pairs(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{pairs},le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{pairs}}} {series[-2]}"
+            yield f"{self.name}_count{{{pairs}}} {series[-1]}"
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        self._values[labels] = value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{{{_label_pairs(self.label_names, labels)}}} {value}"
+
+
+class Counter:
+    """Prometheus counter: a total that only goes up, named with ``_total``"""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...]):
+        if not name.endswith("_total"):
+            raise ValueError(f"Counter {name} must be named with a _total suffix")
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be increased")
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{{{_label_pairs(self.label_names, labels)}}} {value}"
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests.",
+    ("method", "route", "status"),
+)
+REQUEST_PHASE_DURATION = Histogram(
+    "http_request_phase_duration_seconds",
+    "Time a request spent in the database, Solana RPC calls or authentication.",
+    ("method", "route", "phase"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ("method",),
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled database connections, checked out or idle.",
+    ("state",),
+)
+
+JOB_DURATION = Histogram(
+    "background_job_duration_seconds",
+    "Time background job runs took, by outcome: ok, error, or skipped when another machine held the job's lock.",
+    ("job", "outcome"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+JOB_ROWS = Counter(
+    "background_job_rows_processed_total",
+    "Rows processed by background jobs since the process started.",
+    ("job",),
+)
+
+WEBHOOK_DELIVERIES = Counter(
+    "webhook_deliveries_total",
+    "Webhook batches sent since the process started, by outcome: delivered or failed after every retry.",
+    ("outcome",),
+)
+
+REGISTRY = (
+    REQUEST_DURATION,
+    REQUEST_PHASE_DURATION,
+    REQUESTS_IN_FLIGHT,
+    DB_POOL_CONNECTIONS,
+    JOB_DURATION,
+    JOB_ROWS,
+    WEBHOOK_DELIVERIES,
+)
+
+# Engines whose pools are reported, read when metrics are scraped
+_engines: List[Engine] = []
+
+
+class RequestTimings:
+    __slots__ = PHASES
+
+    def __init__(self):
+        self.db: Optional[float] = None
+        self.solana_rpc: Optional[float] = None
+        self.auth: Optional[float] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        setattr(self, phase, (getattr(self, phase) or 0.0) + seconds)
+
+
+# Shared by reference with the threadpool workers that run sync routes
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+@contextmanager
+def record_phase(phase: str):
+    """Add the enclosed time to ``phase`` of the current request; also a decorator"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add(phase, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attribute every statement executed on ``engine`` to the current request
+    and report its pool.
+    """
+    _engines.append(engine)
+    observe_statements(engine, _record_statement)
+
+
+def _record_statement(statement: str, seconds: float, cursor) -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(DB, seconds)
+
+
+def render_metrics() -> str:
+    for engine in _engines:
+        DB_POOL_CONNECTIONS.set(("checked_out",), engine.pool.checkedout())
+        DB_POOL_CONNECTIONS.set(("idle",), engine.pool.checkedin())
+
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.append("")
+    return "\n".join(lines)
+
+
+class MetricsMiddleware:
+    """
+    Record per-route latency, in-flight requests and per-phase time.
+
+    Routes are labelled by their path template, so ids in the URL do not
+    create new series; requests that match no route share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec((method,))
+            current_timings.reset(token)
+
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            REQUEST_DURATION.observe((method, path, str(status_code)), elapsed)
+            for phase in PHASES:
+                seconds = getattr(timings, phase)
+                if seconds is not None:
+                    REQUEST_PHASE_DURATION.observe((method, path, phase), seconds)
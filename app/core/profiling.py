@@ -0,0 +1,163 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.statement_timing import observe_statements
+
+logger = logging.getLogger("app.sql_profile")
+
+
+class StatementStats:
+    __slots__ = ("count", "seconds", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+
+class QueryProfile:
+    """Queries executed within one request, grouped by SQL text."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.statements: Dict[str, StatementStats] = {}
+
+    def record(self, statement: str, seconds: float, rows: int = 0) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.rows += rows
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = StatementStats()
+        stats.count += 1
+        stats.seconds += seconds
+        stats.rows += rows
+
+    def repeated(self, threshold: int) -> Dict[str, StatementStats]:
+        """
+        Statements run at least ``threshold`` times with different
+        parameters: the usual signature of a lazy load inside a loop.
+        """
+        return {
+            statement: stats
+            for statement, stats in self.statements.items()
+            if stats.count >= threshold
+        }
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def fetched_rows(cursor) -> int:
+    """Rows a statement returned; server-side cursors report -1 and count as 0"""
+    if cursor.description is None:
+        return 0
+    return max(cursor.rowcount, 0)
+
+
+def _record_statement(statement: str, seconds: float, cursor) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(statement, seconds, fetched_rows(cursor))
+
+
+def install_query_profiler(engine: Engine) -> None:
+    # Timed by the same listeners as the request metrics
+    observe_statements(engine, _record_statement)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """Collect the queries executed inside the block, including in threadpool workers"""
+    profile = QueryProfile()
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+
+
+def server_timing(profile: QueryProfile, n_plus_one_threshold: int) -> str:
+    parts = [f'db;dur={profile.seconds * 1000:.2f};desc="{profile.count} queries"']
+    repeated = profile.repeated(n_plus_one_threshold)
+    if repeated:
+        parts.append(f'n-plus-one;desc="{len(repeated)} repeated statements"')
+    return ", ".join(parts)
+
+
+class QueryProfilerMiddleware:
+    """
+    Report the queries each request ran.
+
+    The totals go out in a ``Server-Timing`` header, so they show up in the
+    browser's network panel, and a JSON log line is written once the
+    response is complete. Statements repeated ``n_plus_one_threshold``
+    times or more are listed as N+1 candidates.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 3):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Streamed bodies may run more queries after this point
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", server_timing(profile, self.n_plus_one_threshold)
+                )
+            await send(message)
+
+        started = time.perf_counter()
+        with profile_queries() as profile:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._log(scope, status_code, profile, time.perf_counter() - started)
+
+    def _log(
+        self, scope: Scope, status_code: int, profile: QueryProfile, elapsed: float
+    ) -> None:
+        route = scope.get("route")
+        repeated: List[dict] = [
+            {
+                "statement": statement,
+                "count": stats.count,
+                "ms": round(stats.seconds * 1000, 2),
+            }
+            for statement, stats in profile.repeated(self.n_plus_one_threshold).items()
+        ]
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route.path if route is not None else None,
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "queries": profile.count,
+            "rows": profile.rows,
+            "db_ms": round(profile.seconds * 1000, 2),
+            "n_plus_one": repeated,
+        }
+        if repeated:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
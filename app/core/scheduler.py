@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+import random
+import time
+from typing import Any, Callable, List, Optional, Sequence
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+from app.core.metrics import JOB_DURATION, JOB_ROWS
+
+logger = logging.getLogger("app.scheduler")
+
+
+class Job:
+    """
+    A periodic job: ``run`` takes a session and returns the number of rows
+    it processed. A coroutine function ``run`` takes no arguments and is
+    awaited on the event loop instead, for jobs that mostly wait on I/O.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[..., Any],
+        interval_seconds: float,
+        jitter: float = 0.1,
+    ):
+        self.name = name
+        self.run = run
+        self.interval_seconds = interval_seconds
+        self.jitter = jitter
+        # Advisory lock keys are signed 64-bit integers
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+        self.lock_key = int.from_bytes(digest, "big", signed=True)
+
+    def next_delay(self) -> float:
+        """The interval, spread by ``jitter`` so machines don't wake in step"""
+        return self.interval_seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class Scheduler:
+    """
+    Run jobs at jittered intervals, synchronous ones on the event loop's
+    threadpool.
+
+    Each run takes a Postgres session-level advisory lock on the job's key
+    first and is skipped when another machine holds it, so a job runs on
+    one machine at a time however many are up.
+    """
+
+    def __init__(self, engine: Engine, jobs: Sequence[Job]):
+        self.engine = engine
+        self.jobs = list(jobs)
+        self._stopping = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs]
+
+    async def stop(self) -> None:
+        """Stop scheduling; a run in progress is allowed to finish."""
+        self._stopping.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=job.next_delay())
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.run_once(job)
+
+    async def run_once(self, job: Job) -> Optional[int]:
+        """Run ``job`` if no other machine is; None when it was skipped."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            if inspect.iscoroutinefunction(job.run):
+                rows = await self._run_locked_async(job)
+            else:
+                rows = await asyncio.to_thread(self._run_locked, job)
+            outcome = "ok" if rows is not None else "skipped"
+            if rows:
+                JOB_ROWS.inc((job.name,), rows)
+            return rows
+        except Exception:
+            logger.exception("Job %s failed", job.name)
+            return None
+        finally:
+            JOB_DURATION.observe((job.name, outcome), time.perf_counter() - started)
+
+    def _run_locked(self, job: Job) -> Optional[int]:
+        lock_connection = self._try_lock(job)
+        if lock_connection is None:
+            return None
+        try:
+            with Session(self.engine) as session:
+                return job.run(session)
+        finally:
+            self._unlock(job, lock_connection)
+
+    async def _run_locked_async(self, job: Job) -> Optional[int]:
+        lock_connection = await asyncio.to_thread(self._try_lock, job)
+        if lock_connection is None:
+            return None
+        try:
+            return await job.run()
+        finally:
+            await asyncio.to_thread(self._unlock, job, lock_connection)
+
+    def _try_lock(self, job: Job) -> Optional[Connection]:
+        """The connection holding ``job``'s lock, None when it is taken."""
+        lock_connection = self.engine.connect()
+        try:
+            locked = lock_connection.execute(
+                select(func.pg_try_advisory_lock(job.lock_key))
+            ).scalar()
+        except Exception:
+            lock_connection.close()
+            raise
+        if not locked:
+            lock_connection.close()
+            return None
+        return lock_connection
+
+    def _unlock(self, job: Job, lock_connection: Connection) -> None:
+        # A session-level lock outlives transactions, and the connection
+        # goes back to the pool, so unlock explicitly
+        try:
+            lock_connection.execute(select(func.pg_advisory_unlock(job.lock_key)))
+            lock_connection.commit()
+        finally:
+            lock_connection.close()
@@ -0,0 +1,69 @@
+"""
+Import-time profile of the app, for keeping cold starts in check.
+
+    python -m app.core.startup --top 15
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable
+
+
+def _package(module: str) -> str:
+    parts = module.split(".")
+    # Our own modules are grouped one level deeper, e.g. app.services
+    return ".".join(parts[:2]) if parts[0] == "app" else parts[0]
+
+
+def parse_importtime(lines: Iterable[str]) -> Dict[str, float]:
+    """
+    Sum the self time of ``-X importtime`` output per top-level package,
+    in milliseconds, largest first.
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        totals[_package(module.strip())] += int(self_us) / 1000
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def import_profile(module: str = "app.main") -> Dict[str, float]:
+    """Import ``module`` in a fresh interpreter and profile the imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr.splitlines())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the app")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    profile = import_profile(args.module)
+    print(
+        json.dumps(
+            {
+                "module": args.module,
+                "total_ms": round(sum(profile.values()), 1),
+                "packages_ms": {
+                    package: round(ms, 1)
+                    for package, ms in list(profile.items())[: args.top]
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import time
+from typing import Any, Callable, List
+from weakref import WeakKeyDictionary
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Called with (statement, seconds, cursor) once a statement has run
+StatementObserver = Callable[[str, float, Any], None]
+
+_observers: "WeakKeyDictionary[Engine, List[StatementObserver]]" = WeakKeyDictionary()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's execution context, which is dropped with it
+    # when the statement raises and after_cursor_execute never fires
+    if context is not None:
+        context._statement_started = time.perf_counter()
+
+
+def observe_statements(engine: Engine, observer: StatementObserver) -> None:
+    """
+    Report how long each statement executed on ``engine`` took to
+    ``observer``. Every observer of an engine shares one pair of cursor
+    listeners, so a statement is only timed once.
+    """
+    observers = _observers.get(engine)
+    if observers is None:
+        observers = _observers[engine] = []
+
+        def _after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            started = getattr(context, "_statement_started", None)
+            if started is None:
+                return
+            seconds = time.perf_counter() - started
+            for observe in observers:
+                observe(statement, seconds, cursor)
+
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    if observer not in observers:
+        observers.append(observer)
@@ -0,0 +1,377 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Dict, Iterator, List, Optional
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.tracing")
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_id",
+        "name",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str]):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        # list.append is atomic, spans may end in threadpool workers
+        self.trace.spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+
+class InMemoryExporter:
+    """Keeps finished traces in a list, for tests."""
+
+    def __init__(self):
+        self.traces: List[Trace] = []
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+    def clear(self) -> None:
+        self.traces.clear()
+
+    def close(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPFileExporter:
+    """
+    Appends each trace to ``path`` as one line of OTLP/JSON
+    (an ``ExportTraceServiceRequest``), the format the OpenTelemetry
+    collector's file exporter writes and its file receiver reads.
+
+    ``export`` only queues the trace; a background thread encodes and
+    writes it, so requests never wait on the disk. Traces arriving while
+    ``max_queue`` are already waiting are dropped.
+    """
+
+    def __init__(self, path: str, service_name: str, max_queue: int = 10000):
+        self.path = path
+        self.service_name = service_name
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(max_queue)
+        self._thread = threading.Thread(
+            target=self._write_loop, name="otlp-file-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Write out the queued traces and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            traces = [self._queue.get()]
+            # Everything already queued goes out in the same write
+            while traces[-1] is not None:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = traces[-1] is None
+            lines = "".join(self._line(trace) for trace in traces if trace is not None)
+            if lines:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as file:
+                        file.write(lines)
+                except OSError:
+                    logger.exception("Could not write traces to %s", self.path)
+            if stop:
+                return
+
+    def _line(self, trace: Trace) -> str:
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.core.tracing"},
+                            "spans": [self._span(trace, span) for span in trace.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        return json.dumps(request, separators=(",", ":")) + "\n"
+
+    def _span(self, trace: Trace, span: Span) -> Dict[str, Any]:
+        return {
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            # SPAN_KIND_SERVER for the request, SPAN_KIND_INTERNAL below it
+            "kind": 2 if span.parent_id is None else 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in span.attributes.items()
+            ],
+            "status": {"code": 2, "message": span.error} if span.error else {},
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time the enclosed block as a child of the current span.
+
+    Outside a sampled request this only costs a contextvar lookup. Also
+    usable as a decorator.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(parent.trace, name, parent.span_id)
+    child.attributes.update(attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = type(exc).__name__
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+def record_span(name: str, start_ns: int, **attributes: Any) -> None:
+    """Add a child span that started at ``start_ns`` and ends now."""
+    parent = current_span.get()
+    if parent is None:
+        return
+    child = Span(parent.trace, name, parent.span_id)
+    child.start_ns = start_ns
+    child.attributes.update(attributes)
+    child.end()
+
+
+def traced_methods(cls: type) -> type:
+    """
+    Class decorator wrapping each public method in a ``Class.method`` span.
+
+    Generator methods are left alone, since their work happens after the
+    call returns.
+    """
+    for attribute, function in list(vars(cls).items()):
+        if attribute.startswith("_") or not inspect.isfunction(function):
+            continue
+        if inspect.isgeneratorfunction(function):
+            continue
+        setattr(cls, attribute, _traced(f"{cls.__name__}.{attribute}", function))
+    return cls
+
+
+def _traced(name: str, function: Callable) -> Callable:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if current_span.get() is None:
+            return function(*args, **kwargs)
+        with span(name):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def _before_orm_execute(orm_execute_state) -> None:
+    session = orm_execute_state.session
+    if not session.in_transaction() and "checkout_started" not in session.info:
+        session.info["checkout_started"] = time.time_ns()
+
+
+def _after_begin(session, transaction, connection) -> None:
+    started = session.info.pop("checkout_started", None)
+    if started is not None:
+        record_span("db.session_checkout", started)
+
+
+def install_tracing() -> None:
+    """Trace connection checkout for every session."""
+    if not event.contains(Session, "do_orm_execute", _before_orm_execute):
+        # A session checks out a connection for the first statement of each
+        # transaction; after_begin fires once it has one.
+        event.listen(Session, "do_orm_execute", _before_orm_execute)
+        event.listen(Session, "after_begin", _after_begin)
+
+
+def uninstall_tracing() -> None:
+    if event.contains(Session, "do_orm_execute", _before_orm_execute):
+        event.remove(Session, "do_orm_execute", _before_orm_execute)
+        event.remove(Session, "after_begin", _after_begin)
+
+
+# Set by TracedRoute for the request; the endpoint wrapper appends the time
+# it returned. A list, so sync endpoints can report from the threadpool.
+_endpoint_returned: ContextVar[Optional[List[int]]] = ContextVar(
+    "endpoint_returned", default=None
+)
+
+
+def _note_returned(result: Any) -> None:
+    returned = _endpoint_returned.get()
+    # Endpoints returning a Response skip FastAPI's serialization entirely
+    if returned is not None and not isinstance(result, Response):
+        returned.append(time.time_ns())
+
+
+def _returns_noted(endpoint: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            _note_returned(result)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        result = endpoint(*args, **kwargs)
+        _note_returned(result)
+        return result
+
+    return wrapper
+
+
+class TracedRoute(APIRoute):
+    """
+    Route class tracing FastAPI's response validation and serialization as
+    a ``serialize_response`` span, from the endpoint returning until the
+    response is built. Routers opt in with ``APIRouter(route_class=...)``.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        self.dependant.call = _returns_noted(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if current_span.get() is None:
+                return await handler(request)
+            returned: List[int] = []
+            token = _endpoint_returned.set(returned)
+            try:
+                return await handler(request)
+            finally:
+                _endpoint_returned.reset(token)
+                if returned:
+                    record_span("serialize_response", returned[0])
+
+        return route_handler
+
+
+class TracingMiddleware:
+    """
+    Open a root span per sampled HTTP request and export the finished trace.
+
+    ``sample_rate`` is the fraction of requests traced; unsampled requests
+    create no spans at all.
+    """
+
+    def __init__(self, app: ASGIApp, exporter, sample_rate: float = 1.0):
+        self.app = app
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(Trace(), f"{scope['method']} {scope['path']}", None)
+        root.attributes["http.method"] = scope["method"]
+        root.attributes["http.target"] = scope["path"]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+            await send(message)
+
+        token = current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            root.error = type(exc).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+                root.attributes["http.route"] = route.path
+            root.end()
+            self.exporter.export(root.trace)
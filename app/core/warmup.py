@@ -0,0 +1,88 @@
+import logging
+import time
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.repositories.booking_repository import BookingRepository
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.repositories.payment_repository import PaymentRepository
+from app.repositories.service_repository import ServiceRepository
+from app.repositories.service_snapshot_repository import ServiceSnapshotRepository
+from app.schemas.booking import BookingResponse
+from app.schemas.payment import PaymentResponse
+from app.schemas.service import ServiceResponse
+from app.utils.responses import list_adapter
+
+logger = logging.getLogger("app.warmup")
+
+# Matches no row; only the statement shapes matter
+_NO_ID = "warmup"
+
+
+def open_connections(engine: Engine, count: int) -> None:
+    """Connect ``count`` pooled connections up front, all at once."""
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        # Closing returns them to the pool, still connected
+        for connection in connections:
+            connection.close()
+
+
+def compile_statements(engine: Engine) -> None:
+    """
+    Run the hot read statements of each repository once so SQLAlchemy's
+    compiled cache is filled before the first request.
+    """
+    with Session(engine) as session:
+        services = ServiceRepository(session)
+        services.get(_NO_ID)
+        services.get_version(_NO_ID)
+        services.list(search=_NO_ID)
+        services.list_by_owner_id(_NO_ID)
+
+        bookings = BookingRepository(session)
+        bookings.get(_NO_ID)
+        bookings.get_version(_NO_ID)
+        bookings.list_by_user(_NO_ID)
+        bookings.list_version(_NO_ID)
+        bookings.check_booking_conflict(_NO_ID, _NO_ID, datetime.now(timezone.utc))
+
+        payments = PaymentRepository(session)
+        payments.get(_NO_ID)
+        payments.get_version(_NO_ID)
+        payments.list_payments(user_id=_NO_ID)
+        payments.list_version(user_id=_NO_ID)
+
+        IdempotencyRepository(session).get(_NO_ID)
+        ServiceSnapshotRepository(session).get(_NO_ID)
+        session.rollback()
+
+
+def build_serializers() -> None:
+    """Build the cached list serializers and run them once."""
+    for model in (ServiceResponse, BookingResponse, PaymentResponse):
+        adapter = list_adapter(model)
+        adapter.dump_json(adapter.validate_python([], from_attributes=True))
+
+
+def warm_up(engine: Engine, connections: int) -> None:
+    """
+    Pay the first-request costs at startup. A failure is logged rather
+    than raised, so an unreachable database does not stop the app from
+    starting.
+    """
+    started = time.perf_counter()
+    try:
+        open_connections(engine, connections)
+        compile_statements(engine)
+        build_serializers()
+    except Exception:
+        logger.exception("Warm-up failed")
+        return
+    logger.info("Warm-up finished in %.0fms", (time.perf_counter() - started) * 1000)
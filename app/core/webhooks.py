@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import socket
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import httpx
+from app.core.metrics import WEBHOOK_DELIVERIES
+
+logger = logging.getLogger("app.webhooks")
+
+# Worth another attempt; other responses are the endpoint refusing the batch
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Names that only resolve inside our own network
+INTERNAL_SUFFIXES = (".localhost", ".local", ".internal", ".localdomain")
+
+
+class UnsafeDestinationError(ValueError):
+    pass
+
+
+def resolve_host(host: str, port: int) -> List[str]:
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+def public_address(url: httpx.URL) -> str:
+    """
+    An address of ``url``'s host that is safe to send to.
+
+    Raises UnsafeDestinationError when the host is an internal name, or
+    when any address it resolves to is loopback, private, link-local or
+    otherwise not globally routable, so owners can't point webhooks at
+    our own network. A failed lookup raises OSError.
+    """
+    host = url.host.lower().rstrip(".")
+    if not host or host == "localhost" or host.endswith(INTERNAL_SUFFIXES):
+        raise UnsafeDestinationError(f"{host or url} is an internal host")
+
+    addresses = resolve_host(host, url.port or (443 if url.scheme == "https" else 80))
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise UnsafeDestinationError(f"{host} resolves to non-public address {ip}")
+    if not addresses:
+        raise OSError(f"{host} has no addresses")
+    return addresses[0]
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    digest = hmac.new(
+        secret.encode("utf-8"), timestamp.encode("utf-8") + b"." + body, hashlib.sha256
+    ).hexdigest()
+    return f"sha256={digest}"
+
+
+class WebhookBatch:
+    """Events for one subscription, sent together in one request"""
+
+    def __init__(self, url: str, secret: str, events: List[Dict[str, Any]]):
+        self.url = url
+        self.secret = secret
+        self.events = events
+
+
+class WebhookSender:
+    """
+    POST event batches to webhook endpoints over one pooled httpx client.
+
+    Batches for the same URL share a semaphore, so a slow endpoint holds at
+    most ``endpoint_concurrency`` connections however many owners point at
+    it. Timeouts, connection errors and retryable statuses are retried
+    ``max_attempts`` times with jittered exponential backoff.
+
+    Each attempt resolves the host again, checks the address with
+    ``public_address`` and connects to that address, so a name rebound to
+    an internal address after registration is never reached.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        endpoint_concurrency: int,
+        max_attempts: int,
+        backoff_seconds: float,
+        timeout_seconds: float,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.endpoint_concurrency = endpoint_concurrency
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            follow_redirects=False,
+        )
+        self._endpoints: Dict[str, asyncio.Semaphore] = {}
+
+    async def deliver(
+        self, batches: Sequence[WebhookBatch], timeout: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """
+        Send ``batches`` concurrently; returns (delivered, failed) counts.
+
+        Batches still being sent or retried after ``timeout`` seconds are
+        cancelled and count as failed.
+        """
+        if not batches:
+            return 0, 0
+        tasks = [asyncio.ensure_future(self._deliver(batch)) for batch in batches]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+            logger.warning(
+                "Gave up on %d webhook batches still unsent after %ss",
+                len(pending),
+                timeout,
+            )
+            WEBHOOK_DELIVERIES.inc(("failed",), len(pending))
+        delivered = sum(task.result() for task in done)
+        return delivered, len(batches) - delivered
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _deliver(self, batch: WebhookBatch) -> bool:
+        body = json.dumps({"events": batch.events}, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        endpoint = self._endpoints.setdefault(
+            batch.url, asyncio.Semaphore(self.endpoint_concurrency)
+        )
+        for attempt in range(1, self.max_attempts + 1):
+            async with endpoint:
+                retry = await self._post(batch, body)
+            if retry is None:
+                WEBHOOK_DELIVERIES.inc(("delivered",))
+                return True
+            if not retry or attempt == self.max_attempts:
+                break
+            # Outside the semaphore, so waiting doesn't hold up other batches
+            await asyncio.sleep(
+                self.backoff_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+            )
+
+        logger.warning(
+            "Gave up delivering %d events to %s", len(batch.events), batch.url
+        )
+        WEBHOOK_DELIVERIES.inc(("failed",))
+        return False
+
+    async def _post(self, batch: WebhookBatch, body: bytes) -> Optional[bool]:
+        """None once delivered, else whether the failure is worth retrying"""
+        url = httpx.URL(batch.url)
+        try:
+            address = await asyncio.to_thread(public_address, url)
+        except UnsafeDestinationError as exc:
+            logger.warning("Refused webhook delivery to %s: %s", batch.url, exc)
+            return False
+        except OSError as exc:
+            logger.info("Could not resolve webhook host of %s: %r", batch.url, exc)
+            return True
+
+        timestamp = str(int(time.time()))
+        try:
+            response = await self.client.post(
+                url.copy_with(host=address),
+                content=body,
+                headers={
+                    "Host": url.netloc.decode("ascii"),
+                    "Content-Type": "application/json",
+                    "X-Webhook-Timestamp": timestamp,
+                    "X-Webhook-Signature": sign(batch.secret, timestamp, body),
+                },
+                # TLS is still verified against the registered name
+                extensions={"sni_hostname": url.host},
+            )
+        except httpx.TransportError as exc:
+            logger.info("Webhook delivery to %s failed: %r", batch.url, exc)
+            return True
+        if response.is_success:
+            return None
+        logger.info("Webhook delivery to %s got %d", batch.url, response.status_code)
+        return response.status_code in RETRY_STATUSES
@@ -12,5 +12,27 @@ engine = create_engine(settings.DATABASE_URL, echo=True)
 
 
 def get_session():
+    # A session only checks out a connection for its first statement and
+    # hands it back when its transaction ends, so one that fails auth or
+    # validation first never touches the pool.
     with Session(engine) as session:
         yield session
+
+
+def release_connection(session: Session) -> None:
+    """
+    End the session's transaction and return its connection to the pool,
+    keeping what it loaded usable.
+
+    For slow work that follows the last statement of a request, such as an
+    RPC call or serialization; a later statement checks a connection out
+    again.
+    """
+    if not session.in_transaction():
+        return
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
@@ -55,3 +55,54 @@ class BookingInvalidDurationException(HTTPException):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Booking duration must be a positive number for time-based pricing.",
         )
+
+
+class BookingInvalidVariantException(HTTPException):
+    def __init__(self, variant: str, option: str = None):
+        detail = f"Unknown variant '{variant}' for this service."
+        if option is not None:
+            detail = f"Option '{option}' is not available for variant '{variant}'."
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
+
+
+class BookingVariantRequiredException(HTTPException):
+    def __init__(self, variant: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A selection for variant '{variant}' is required.",
+        )
+
+
+class BookingSingleVariantException(HTTPException):
+    def __init__(self, variant: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Variant '{variant}' accepts a single option only.",
+        )
+
+
+class BookingUnknownVariantOptionException(HTTPException):
+    def __init__(self, variant: str, option: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown option '{option}' for variant '{variant}'.",
+        )
+
+
+class BookingDuplicateVariantOptionException(HTTPException):
+    def __init__(self, variant: str, option: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Option '{option}' is selected more than once for variant '{variant}'.",
+        )
+
+
+class InvalidBookingCursorException(HTTPException):
+    def __init__(self, cursor: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid bookings cursor: {cursor}",
+        )
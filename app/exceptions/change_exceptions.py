@@ -0,0 +1,9 @@
+from fastapi import HTTPException, status
+
+
+class InvalidChangeCursorException(HTTPException):
+    def __init__(self, cursor: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid change feed cursor: {cursor}",
+        )
@@ -0,0 +1,10 @@
+from typing import Iterable
+from fastapi import HTTPException, status
+
+
+class InvalidFieldsException(HTTPException):
+    def __init__(self, fields: Iterable[str]):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields requested: {', '.join(sorted(fields))}",
+        )
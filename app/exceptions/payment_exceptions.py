@@ -31,3 +31,11 @@ class UnauthorizedPaymentAccessException(HTTPException):
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Not authorized to access Payment {payment_id}",
         )
+
+
+class PaymentCheckoutConflictException(HTTPException):
+    def __init__(self, booking_id: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Active payment for booking {booking_id} changed concurrently, please retry",
+        )
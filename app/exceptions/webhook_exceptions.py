@@ -0,0 +1,25 @@
+from fastapi import HTTPException, status
+
+
+class WebhookNotFoundException(HTTPException):
+    def __init__(self, webhook_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Webhook with id {webhook_id} not found",
+        )
+
+
+class UnauthorizedWebhookAccessException(HTTPException):
+    def __init__(self, webhook_id: str):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to access Webhook {webhook_id}",
+        )
+
+
+class WebhookUrlNotAllowedException(HTTPException):
+    def __init__(self, url: str, reason: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Webhook URL {url} is not allowed: {reason}",
+        )
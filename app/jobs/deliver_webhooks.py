@@ -0,0 +1,47 @@
+import asyncio
+from typing import Optional
+from sqlmodel import Session
+from app.config import settings
+from app.core.webhooks import WebhookSender
+from app.database import engine
+from app.services.webhook_service import WebhookDispatcher
+
+# Shared across runs, so connections to endpoints are kept alive between them
+_sender: Optional[WebhookSender] = None
+
+
+def get_sender() -> WebhookSender:
+    global _sender
+    if _sender is None:
+        _sender = WebhookSender(
+            max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+            endpoint_concurrency=settings.WEBHOOK_ENDPOINT_CONCURRENCY,
+            max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+            backoff_seconds=settings.WEBHOOK_BACKOFF_SECONDS,
+            timeout_seconds=settings.WEBHOOK_TIMEOUT_SECONDS,
+        )
+    return _sender
+
+
+async def run() -> int:
+    """Send owners' webhooks the events written since the last run."""
+    with Session(engine) as session:
+        return await WebhookDispatcher(session, get_sender()).dispatch()
+
+
+async def close() -> None:
+    global _sender
+    if _sender is not None:
+        await _sender.aclose()
+        _sender = None
+
+
+async def _main() -> int:
+    try:
+        return await run()
+    finally:
+        await close()
+
+
+if __name__ == "__main__":
+    print(f"Read {asyncio.run(_main())} change events")
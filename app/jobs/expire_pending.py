@@ -0,0 +1,16 @@
+from sqlmodel import Session
+from app.database import engine
+from app.services.booking_service import BookingService
+from app.services.payment_service import PaymentService
+
+
+def run(session: Session) -> int:
+    """Cancel pending payments and bookings that outlived their TTL."""
+    return (
+        PaymentService(session).expire_stale() + BookingService(session).expire_stale()
+    )
+
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        print(f"Expired {run(session)} pending bookings and payments")
@@ -0,0 +1,13 @@
+from sqlmodel import Session
+from app.database import engine
+from app.services.change_service import ChangeFeedService
+
+
+def run(session: Session) -> int:
+    """Delete change events past their retention that every consumer has read."""
+    return ChangeFeedService(session).purge_old()
+
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        print(f"Purged {run(session)} change events")
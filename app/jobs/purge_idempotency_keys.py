@@ -0,0 +1,13 @@
+from sqlmodel import Session
+from app.database import engine
+from app.services.idempotency_service import IdempotencyService
+
+
+def run(session: Session) -> int:
+    """Delete expired Idempotency-Key records in batches."""
+    return IdempotencyService(session).purge_expired()
+
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        print(f"Purged {run(session)} expired idempotency keys")
@@ -0,0 +1,14 @@
+from sqlmodel import Session
+from app.config import settings
+from app.database import engine
+from app.services.payment_service import PaymentService
+
+
+def run(session: Session) -> int:
+    """Check open payments on chain and settle the verified ones."""
+    return PaymentService(session).reconcile_open(settings.PAYMENT_RECONCILE_BATCH_SIZE)
+
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        print(f"Checked {run(session)} open payments")
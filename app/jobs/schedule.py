@@ -0,0 +1,46 @@
+from typing import List
+from app.config import settings
+from app.core.scheduler import Job
+from app.jobs import (
+    deliver_webhooks,
+    expire_pending,
+    purge_change_events,
+    purge_idempotency_keys,
+    reconcile_payments,
+)
+
+
+def scheduled_jobs() -> List[Job]:
+    """The jobs the app's scheduler runs"""
+    return [
+        Job(
+            "purge_idempotency_keys",
+            purge_idempotency_keys.run,
+            settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+            settings.SCHEDULER_JITTER,
+        ),
+        Job(
+            "reconcile_payments",
+            reconcile_payments.run,
+            settings.PAYMENT_RECONCILE_INTERVAL_SECONDS,
+            settings.SCHEDULER_JITTER,
+        ),
+        Job(
+            "expire_pending",
+            expire_pending.run,
+            settings.EXPIRY_SWEEP_INTERVAL_SECONDS,
+            settings.SCHEDULER_JITTER,
+        ),
+        Job(
+            "purge_change_events",
+            purge_change_events.run,
+            settings.CHANGE_EVENT_PURGE_INTERVAL_SECONDS,
+            settings.SCHEDULER_JITTER,
+        ),
+        Job(
+            "deliver_webhooks",
+            deliver_webhooks.run,
+            settings.WEBHOOK_DELIVERY_INTERVAL_SECONDS,
+            settings.SCHEDULER_JITTER,
+        ),
+    ]
@@ -1,28 +1,55 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-# from contextlib import asynccontextmanager
 # from app.database import create_db_and_tables
 
 from app.api.router import api_router
 from app.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, instrument_engine, render_metrics
+from app.core.profiling import QueryProfilerMiddleware, install_query_profiler
+from app.core.scheduler import Scheduler
+from app.core.tracing import (
+    InMemoryExporter,
+    OTLPFileExporter,
+    TracingMiddleware,
+    install_tracing,
+)
+from app.core.warmup import warm_up
+from app.database import engine
+from app.jobs import deliver_webhooks
+from app.jobs.schedule import scheduled_jobs
+from app.security import verify_metrics_token
 
 # from app.core.exceptions import setup_exception_handlers
 
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#     # Startup code
-#     create_db_and_tables()
-#     yield
-#     # Shutdown code (if needed)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uvicorn only starts accepting requests once this startup has finished
+    if settings.WARMUP_ENABLED:
+        await run_in_threadpool(warm_up, engine, settings.WARMUP_POOL_CONNECTIONS)
+
+    scheduler = Scheduler(engine, scheduled_jobs()) if settings.SCHEDULER_ENABLED else None
+    if scheduler is not None:
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        await scheduler.stop()
+    await deliver_webhooks.close()
+    if trace_exporter is not None:
+        await run_in_threadpool(trace_exporter.close)
+    engine.dispose()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
-    # lifespan=lifespan,
+    lifespan=lifespan,
 )
 
 
@@ -35,6 +62,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        cpu_budget_ms=settings.COMPRESSION_CPU_BUDGET_MS,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    )
+
+if settings.DEBUG:
+    app.add_middleware(
+        QueryProfilerMiddleware,
+        n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD,
+    )
+    install_query_profiler(engine)
+
+trace_exporter = None
+if settings.TRACING_ENABLED:
+    if settings.TRACING_EXPORTER == "memory":
+        trace_exporter = InMemoryExporter()
+    else:
+        trace_exporter = OTLPFileExporter(settings.TRACING_OTLP_FILE, settings.PROJECT_NAME)
+    app.add_middleware(
+        TracingMiddleware,
+        exporter=trace_exporter,
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+    )
+    install_tracing()
+
+if settings.METRICS_ENABLED:
+    # Outermost, so the time spent compressing is part of the latency
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+
 # # Exception handlers
 # setup_exception_handlers(app)
 
@@ -45,3 +106,16 @@ app.include_router(api_router, prefix="/api")
 @app.get("/")
 async def root():
     return {"message": "Welcome to the API"}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get(
+        "/metrics",
+        include_in_schema=False,
+        dependencies=[Depends(verify_metrics_token)],
+    )
+    async def metrics():
+        return PlainTextResponse(
+            render_metrics(), media_type="text/plain; version=0.0.4"
+        )
@@ -1,5 +1,20 @@
 from .service import Service
 from .booking import Booking
 from .business import Business
+from .payment import Payment
+from .service_snapshot import ServiceSnapshot
+from .idempotency import IdempotencyKey
+from .change_event import ChangeEvent, OutboxCursor
+from .webhook import WebhookSubscription
 
-__all_models__ = [Service, Booking, Business]
+__all_models__ = [
+    Service,
+    ServiceSnapshot,
+    Booking,
+    Business,
+    Payment,
+    IdempotencyKey,
+    ChangeEvent,
+    OutboxCursor,
+    WebhookSubscription,
+]
@@ -2,6 +2,7 @@ from enum import Enum
 from typing import Optional, Dict, Any, List
 from decimal import Decimal
 from datetime import datetime, timezone
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Column, JSON, Relationship
 
 
@@ -14,21 +15,37 @@ class BookingStatus(str, Enum):
 
 class Booking(SQLModel, table=True):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Keeps the expiry sweep to the pending rows
+        Index(
+            "ix_bookings_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        # A service's calendar, walked in (scheduled_at, id) order. Also
+        # serves lookups by service_id alone.
+        Index("ix_bookings_service_scheduled_at", "service_id", "scheduled_at", "id"),
+    )
 
     id: str = Field(primary_key=True, index=True)
-    service_id: str = Field(index=True, foreign_key="services.id")
+    service_id: str = Field(foreign_key="services.id")
     user_id: str = Field(index=True)
 
     variant_id: Optional[str] = Field(default=None, index=True)
     status: BookingStatus = Field(default=BookingStatus.PENDING)
 
-    # JSON fields
-    service_snapshot: Dict[str, Any] = Field(
-        sa_column=Column(JSON, nullable=False), default_factory=dict
+    # Service as it was at booking time, stored once per distinct content
+    service_snapshot_hash: str = Field(
+        foreign_key="service_snapshots.hash", index=True
     )
+
+    # JSON fields
     attributes: Optional[Dict[str, Any]] = Field(
         default_factory=dict, sa_column=Column(JSON)
     )
+    price_breakdown: Optional[Dict[str, Any]] = Field(
+        default=None, sa_column=Column(JSON)
+    )
 
     scheduled_at: datetime
     duration: Optional[int] = Field(default=None)
@@ -44,3 +61,8 @@ class Booking(SQLModel, table=True):
     # 👇 Relationship to Service
     service: Optional["Service"] = Relationship(back_populates="bookings")
     payments: List["Payment"] = Relationship(back_populates="booking")
+    snapshot: Optional["ServiceSnapshot"] = Relationship()
+
+    @property
+    def service_snapshot(self) -> Dict[str, Any]:
+        return self.snapshot.snapshot if self.snapshot else {}
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import BigInteger, Boolean, Identity, Index, text, true
+from sqlmodel import SQLModel, Field, Column
+
+
+class ChangeEvent(SQLModel, table=True):
+    """
+    Outbox row appended in the same transaction as each booking or payment
+    write, read back in order by GET /changes.
+    """
+
+    __tablename__ = "change_events"
+    __table_args__ = (
+        Index("ix_change_events_user_cursor", "user_id", "txid", "id"),
+        # Consumers reading every user's events, such as webhooks
+        Index("ix_change_events_cursor", "txid", "id"),
+    )
+
+    id: Optional[int] = Field(
+        default=None, sa_column=Column(BigInteger, Identity(), primary_key=True)
+    )
+    # Writing transaction's id. Ids from the sequence are handed out before
+    # commit, so readers order by (txid, id) and only read transactions that
+    # are known to have finished.
+    txid: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            BigInteger,
+            nullable=False,
+            server_default=text("pg_current_xact_id()::text::bigint"),
+        ),
+    )
+
+    entity: str  # "booking" or "payment"
+    entity_id: str
+    user_id: str
+    action: str  # "created", "updated" or "deleted"
+    status: Optional[str] = Field(default=None)
+    # False when an update left the status as it was, so consumers can react
+    # to transitions such as a payment succeeding only once
+    status_changed: bool = Field(
+        default=True,
+        sa_column=Column(Boolean, nullable=False, server_default=true()),
+    )
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class OutboxCursor(SQLModel, table=True):
+    """How far a consumer of the change events, such as webhooks, has read"""
+
+    __tablename__ = "outbox_cursors"
+
+    consumer: str = Field(primary_key=True)
+    txid: int = Field(sa_column=Column(BigInteger, nullable=False))
+    event_id: int = Field(sa_column=Column(BigInteger, nullable=False))
+
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
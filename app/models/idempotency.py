@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import SQLModel, Field, Column, Text
+
+
+class IdempotencyKey(SQLModel, table=True):
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of (user_id, scope, Idempotency-Key header)
+    id: str = Field(primary_key=True)
+    request_hash: str
+
+    # Unset while the original request is still running
+    status_code: Optional[int] = Field(default=None)
+    response_body: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # Lease of the request running under the key; past it, the request is
+    # presumed dead and a retry may take the key over
+    locked_until: Optional[datetime] = Field(default=None)
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    expires_at: datetime = Field(index=True)
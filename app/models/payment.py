@@ -3,6 +3,7 @@ from typing import Optional, Dict, Any
 from decimal import Decimal
 from datetime import datetime, timezone
 from app.utils.ids import generate_unique_id
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Column, JSON, Relationship, DECIMAL
 
 
@@ -15,6 +16,19 @@ class PaymentStatus(str, Enum):
     REFUNDED = "refunded"
 
 
+# Payments that still hold a booking: at most one of these may exist per
+# booking. Succeeded payments are included so a paid booking is never
+# charged twice.
+ACTIVE_PAYMENT_STATUSES = (
+    PaymentStatus.PENDING,
+    PaymentStatus.PROCESSING,
+    PaymentStatus.SUCCEEDED,
+)
+
+# Not settled yet; checked on chain until they are
+OPEN_PAYMENT_STATUSES = (PaymentStatus.PENDING, PaymentStatus.PROCESSING)
+
+
 class PaymentMethod(str, Enum):
     CARD = "card"
     MANDEL_COIN = "mandel_coin"
@@ -26,6 +40,22 @@ class PaymentProvider(str, Enum):
 
 class Payment(SQLModel, table=True):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index(
+            "uq_payments_active_booking",
+            "booking_id",
+            unique=True,
+            postgresql_where=text(
+                "booking_id IS NOT NULL AND status IN ('PENDING', 'PROCESSING', 'SUCCEEDED')"
+            ),
+        ),
+        # Keeps the reconcile and expiry sweeps to the open rows
+        Index(
+            "ix_payments_open_created_at",
+            "created_at",
+            postgresql_where=text("status IN ('PENDING', 'PROCESSING')"),
+        ),
+    )
 
     id: str = Field(
         default_factory=lambda: generate_unique_id(), primary_key=True, index=True
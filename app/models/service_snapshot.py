@@ -0,0 +1,14 @@
+from datetime import datetime, timezone
+from typing import Dict, Any
+from sqlmodel import SQLModel, Field, Column, JSON
+
+
+class ServiceSnapshot(SQLModel, table=True):
+    __tablename__ = "service_snapshots"
+
+    # sha256 of the canonical JSON encoding of ``snapshot``
+    hash: str = Field(primary_key=True)
+    service_id: str = Field(index=True)
+    snapshot: Dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+from sqlmodel import SQLModel, Field
+
+
+class WebhookSubscription(SQLModel, table=True):
+    """An endpoint a service owner has asked to be sent their events at"""
+
+    __tablename__ = "webhook_subscriptions"
+
+    id: str = Field(primary_key=True)
+    owner_id: str = Field(index=True)
+    url: str
+    # Key deliveries are signed with, shown to the owner once
+    secret: str
+    active: bool = Field(default=True)
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1,35 +1,211 @@
 from datetime import datetime, timezone
-from typing import List
-from sqlalchemy.orm import selectinload
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, exists, func, true, tuple_, update
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from sqlmodel import Session, select, and_
 from app.utils.ids import generate_unique_id
+from app.utils.projection import column_names
 from fastapi.encoders import jsonable_encoder
-from app.models.booking import Booking
+from app.models.booking import Booking, BookingStatus
 from app.schemas.booking import BookingCreate, BookingUpdate, BookingCreateValidated
+from app.models.payment import ACTIVE_PAYMENT_STATUSES, Payment
 from app.models.service import Service
+from app.repositories.change_event_repository import ChangeEventRepository
+from app.repositories.service_snapshot_repository import ServiceSnapshotRepository
+from app.core.tracing import traced_methods
 
+# Hot lookups are built once; see service_repository
+_GET_BOOKING = (
+    select(Booking)
+    .where(Booking.id == bindparam("booking_id"))
+    .options(joinedload(Booking.service))
+)
+_BOOKING_VERSION = select(Booking.id, Booking.user_id, Booking.updated_at).where(
+    Booking.id == bindparam("booking_id")
+)
+_BOOKINGS_VERSION = select(func.count(), func.max(Booking.updated_at)).where(
+    Booking.user_id == bindparam("user_id")
+)
+# Whether the user already holds a live booking of the service at that time
+_BOOKING_CONFLICT = select(
+    exists().where(
+        and_(
+            Booking.user_id == bindparam("user_id"),
+            Booking.service_id == bindparam("service_id"),
+            Booking.scheduled_at == bindparam("scheduled_at"),
+            Booking.status != BookingStatus.CANCELLED,
+        )
+    )
+)
+
+
+def _change(booking: Booking) -> Tuple[str, str, str]:
+    return booking.id, booking.user_id, BookingStatus(booking.status).value
 
+
+@traced_methods
 class BookingRepository:
     def __init__(self, session: Session):
         self.session = session
+        self.snapshot_repo = ServiceSnapshotRepository(session)
+        self.changes = ChangeEventRepository(session)
 
     def get(self, booking_id: str) -> Booking:
+        return self.session.exec(_GET_BOOKING, params={"booking_id": booking_id}).first()
+
+    def list_by_user(
+        self, user_id: str, fields: Optional[Sequence[str]] = None
+    ) -> List[Booking]:
         statement = (
             select(Booking)
-            .where(Booking.id == booking_id)
-            .options(selectinload(Booking.service))
+            .where(Booking.user_id == user_id)
+            .options(*self._load_options(fields))
         )
-        booking = self.session.exec(statement).first()
-        return booking
+        return self.session.exec(statement).all()
+
+    def list_by_service(
+        self,
+        service_id: str,
+        limit: int,
+        scheduled_from: Optional[datetime] = None,
+        scheduled_to: Optional[datetime] = None,
+        status: Optional[BookingStatus] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Booking]:
+        """A page of the service's bookings in ``(scheduled_at, id)`` order"""
+        statement = select(Booking).where(Booking.service_id == service_id)
+        return self._calendar(
+            statement, limit, scheduled_from, scheduled_to, status, after, fields
+        )
+
+    def list_by_owner(
+        self,
+        owner_id: str,
+        limit: int,
+        scheduled_from: Optional[datetime] = None,
+        scheduled_to: Optional[datetime] = None,
+        status: Optional[BookingStatus] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Booking]:
+        """
+        A page of the bookings of every service the owner has.
+
+        Each owned service contributes at most ``limit`` rows through a
+        LATERAL subquery that reads one range of
+        ix_bookings_service_scheduled_at, so only those candidates are
+        sorted into the page, however many bookings the services have.
+        """
+        owned = select(Service.id).where(Service.owner_id == owner_id).subquery("owned")
+        page = (
+            self._filter(
+                select(Booking.id).where(Booking.service_id == owned.c.id),
+                scheduled_from,
+                scheduled_to,
+                status,
+                after,
+            )
+            .order_by(Booking.scheduled_at, Booking.id)
+            .limit(limit)
+            .correlate(owned)
+            .lateral("page")
+        )
+        statement = (
+            select(Booking)
+            .select_from(owned)
+            .join(page, true())
+            .join(Booking, Booking.id == page.c.id)
+        )
+        return self._ordered_page(statement, limit, fields)
+
+    def _calendar(
+        self,
+        statement,
+        limit: int,
+        scheduled_from: Optional[datetime],
+        scheduled_to: Optional[datetime],
+        status: Optional[BookingStatus],
+        after: Optional[Tuple[datetime, str]],
+        fields: Optional[Sequence[str]],
+    ) -> List[Booking]:
+        # A service's rows are one range of ix_bookings_service_scheduled_at,
+        # already in page order, and a page resumes from its (scheduled_at, id)
+        # key instead of skipping the rows before it
+        statement = self._filter(statement, scheduled_from, scheduled_to, status, after)
+        return self._ordered_page(statement, limit, fields)
+
+    def _filter(
+        self,
+        statement,
+        scheduled_from: Optional[datetime],
+        scheduled_to: Optional[datetime],
+        status: Optional[BookingStatus],
+        after: Optional[Tuple[datetime, str]],
+    ):
+        if scheduled_from is not None:
+            statement = statement.where(Booking.scheduled_at >= scheduled_from)
+        if scheduled_to is not None:
+            statement = statement.where(Booking.scheduled_at < scheduled_to)
+        if status is not None:
+            statement = statement.where(Booking.status == status)
+        if after is not None:
+            statement = statement.where(tuple_(Booking.scheduled_at, Booking.id) > tuple_(*after))
+        return statement
 
-    def list_by_user(self, user_id: str) -> List[Booking]:
-        statement = select(Booking).where(Booking.user_id == user_id)
+    def _ordered_page(
+        self, statement, limit: int, fields: Optional[Sequence[str]]
+    ) -> List[Booking]:
+        if fields is not None:
+            fields = (*fields, "scheduled_at")
+        statement = (
+            statement.order_by(Booking.scheduled_at, Booking.id)
+            .limit(limit)
+            .options(*self._load_options(fields))
+        )
         return self.session.exec(statement).all()
 
+    def get_version(self, booking_id: str) -> Optional[Tuple[str, str, datetime]]:
+        """``(id, user_id, updated_at)`` of a booking, without its JSON columns"""
+        return self.session.exec(_BOOKING_VERSION, params={"booking_id": booking_id}).first()
+
+    def list_version(self, user_id: str) -> Tuple[int, Optional[datetime]]:
+        """Row count and newest ``updated_at`` of the user's bookings"""
+        return self.session.exec(_BOOKINGS_VERSION, params={"user_id": user_id}).one()
+
+    def iter_for_export(self, user_id: str, batch_size: int) -> Iterator[Dict[str, Any]]:
+        """Stream raw booking rows through a server-side cursor"""
+        statement = (
+            select(*Booking.__table__.columns)
+            .where(Booking.user_id == user_id)
+            .order_by(Booking.created_at)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in self.session.execute(statement).mappings().partitions():
+            yield from partition
+
+    def _load_options(self, fields: Optional[Sequence[str]]) -> list:
+        """Loader options restricting a query to the projected ``fields``"""
+        if fields is None:
+            return [selectinload(Booking.snapshot)]
+
+        columns = column_names(Booking, (*fields, "updated_at"))
+        options = []
+        if "service_snapshot" in fields:
+            columns.append("service_snapshot_hash")
+            options.append(selectinload(Booking.snapshot))
+
+        options.append(
+            load_only(*(getattr(Booking, column) for column in columns), raiseload=True)
+        )
+        return options
+
     def create(self, booking_in: BookingCreateValidated, user_id: str) -> Booking:
 
-        service_snapshot = self.session.get(Service, booking_in.service_id)
-        snapshot = jsonable_encoder(service_snapshot)
+        service = self.session.get(Service, booking_in.service_id)
+        snapshot_hash = self.snapshot_repo.add(
+            service_id=service.id, snapshot=jsonable_encoder(service)
+        )
 
         booking_id = generate_unique_id()
         booking_data = booking_in.model_dump()
@@ -37,46 +213,87 @@ class BookingRepository:
         booking = Booking(
             id=booking_id,
             user_id=user_id,
-            service_snapshot=snapshot,
+            service_snapshot_hash=snapshot_hash,
             **booking_data,
             created_at=datetime.now(timezone.utc),
             updated_at=datetime.now(timezone.utc),
         )
 
         self.session.add(booking)
+        self.changes.append("booking", "created", [_change(booking)])
         self.session.commit()
+        self.snapshot_repo.mark_committed(snapshot_hash)
         self.session.refresh(booking)
         return booking
 
     def update(self, booking_id: str, booking_in: BookingUpdate) -> Booking:
         booking = self.get(booking_id)
+        previous_status = BookingStatus(booking.status)
 
         for key, value in booking_in.model_dump(exclude_unset=True).items():
             setattr(booking, key, value)
 
         booking.updated_at = datetime.now(timezone.utc)
         self.session.add(booking)
+        self.changes.append(
+            "booking",
+            "updated",
+            [_change(booking)],
+            status_changed=BookingStatus(booking.status) != previous_status,
+        )
         self.session.commit()
         self.session.refresh(booking)
         return booking
 
     def check_booking_conflict(
         self, user_id: str, service_id: str, scheduled_at: datetime
-    ):
+    ) -> bool:
         # Check for duplicate bookings by same user for overlapping scheduled time
-        existing_booking = self.session.exec(
-            select(Booking).where(
-                and_(
-                    Booking.user_id == user_id,
-                    Booking.service_id == service_id,
-                    Booking.scheduled_at == scheduled_at,
-                    Booking.status != "cancelled",
-                )
+        return self.session.exec(
+            _BOOKING_CONFLICT,
+            params={"service_id": service_id, "user_id": user_id, "scheduled_at": scheduled_at},
+        ).one()
+
+    def expire_pending(self, created_before: datetime, batch_size: int) -> List[str]:
+        """
+        Cancel up to ``batch_size`` pending bookings created before
+        ``created_before`` and return their ids. Bookings with an active
+        payment are kept: paid ones hold their slot, and open ones are
+        left until the payment sweep settles or cancels the payment. Rows
+        locked by a request in flight are left for the next batch.
+        """
+        stale = (
+            select(Booking.id)
+            .where(
+                Booking.status == BookingStatus.PENDING,
+                Booking.created_at < created_before,
+                ~exists().where(
+                    Payment.booking_id == Booking.id,
+                    Payment.status.in_(ACTIVE_PAYMENT_STATUSES),
+                ),
             )
-        ).first()
-        return existing_booking is not None
+            .order_by(Booking.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        expired = self.session.execute(
+            update(Booking)
+            .where(Booking.id.in_(stale))
+            .values(status=BookingStatus.CANCELLED, updated_at=datetime.now(timezone.utc))
+            .returning(Booking.id, Booking.user_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.changes.append(
+            "booking",
+            "updated",
+            [(booking_id, user_id, BookingStatus.CANCELLED.value) for booking_id, user_id in expired],
+        )
+        self.session.commit()
+        return [booking_id for booking_id, _ in expired]
 
     def delete(self, booking_id: str) -> None:
         booking = self.get(booking_id)
         self.session.delete(booking)
+        self.changes.append("booking", "deleted", [(booking.id, booking.user_id, None)])
         self.session.commit()
@@ -0,0 +1,206 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import (
+    BigInteger,
+    Insert,
+    Text,
+    and_,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+from app.models.booking import Booking
+from app.models.change_event import ChangeEvent, OutboxCursor
+from app.models.payment import Payment
+from app.models.service import Service
+from app.core.tracing import traced_methods
+
+# Oldest transaction still running; every txid below it has finished
+_FINISHED_BEFORE = cast(
+    cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger
+)
+
+
+@traced_methods
+class ChangeEventRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def append(
+        self,
+        entity: str,
+        action: str,
+        rows: Iterable[Tuple[str, str, Optional[str]]],
+        status_changed: bool = True,
+    ) -> None:
+        """
+        Append one event per ``(entity_id, user_id, status)`` in a single
+        INSERT, inside the caller's transaction.
+        """
+        now = datetime.now(timezone.utc)
+        values = [
+            {
+                "entity": entity,
+                "entity_id": entity_id,
+                "user_id": user_id,
+                "action": action,
+                "status": status,
+                "status_changed": status_changed,
+                "created_at": now,
+            }
+            for entity_id, user_id, status in rows
+        ]
+        if values:
+            self.session.execute(insert(ChangeEvent.__table__).values(values))
+
+    def append_from(self, entity: str, action: str, rows) -> Insert:
+        """
+        An INSERT of one event per ``(entity_id, user_id, status)`` row of
+        the ``rows`` select, for use as a CTE of the statement that writes
+        the entity, so the event costs no extra round trip.
+        """
+        rows = rows.subquery()
+        return insert(ChangeEvent.__table__).from_select(
+            ["entity", "entity_id", "user_id", "action", "status", "created_at"],
+            select(
+                literal(entity),
+                rows.c[0],
+                rows.c[1],
+                literal(action),
+                rows.c[2],
+                func.timezone("UTC", func.now()),
+            ),
+        )
+
+    def list_after(
+        self, user_id: str, after: Tuple[int, int], limit: int
+    ) -> List[ChangeEvent]:
+        """
+        The user's events after the ``(txid, id)`` cursor, oldest first.
+
+        Events of transactions that may still be running are held back, so
+        an event never appears behind a cursor a reader already has.
+        """
+        statement = (
+            select(ChangeEvent)
+            .where(
+                ChangeEvent.user_id == user_id,
+                tuple_(ChangeEvent.txid, ChangeEvent.id) > tuple_(*after),
+                ChangeEvent.txid < _FINISHED_BEFORE,
+            )
+            .order_by(ChangeEvent.txid, ChangeEvent.id)
+            .limit(limit)
+        )
+        return self.session.exec(statement).all()
+
+    def list_with_owners(self, after: Tuple[int, int], limit: int) -> List[Tuple]:
+        """
+        Every user's events after the ``(txid, id)`` cursor, oldest first,
+        each as ``(event, service_id, owner_id)`` of the service the booking
+        or paid booking is for. Both are None once the booking is deleted.
+        """
+        page = (
+            select(ChangeEvent)
+            .where(
+                tuple_(ChangeEvent.txid, ChangeEvent.id) > tuple_(*after),
+                ChangeEvent.txid < _FINISHED_BEFORE,
+            )
+            .order_by(ChangeEvent.txid, ChangeEvent.id)
+            .limit(limit)
+            .subquery()
+        )
+        event = aliased(ChangeEvent, page)
+        paid_booking = aliased(Booking)
+        statement = (
+            select(event, Service.id, Service.owner_id)
+            .outerjoin(
+                Booking, and_(event.entity == "booking", Booking.id == event.entity_id)
+            )
+            .outerjoin(
+                Payment, and_(event.entity == "payment", Payment.id == event.entity_id)
+            )
+            .outerjoin(paid_booking, paid_booking.id == Payment.booking_id)
+            .outerjoin(
+                Service,
+                Service.id
+                == func.coalesce(Booking.service_id, paid_booking.service_id),
+            )
+            .order_by(event.txid, event.id)
+        )
+        return self.session.exec(statement).all()
+
+    def latest_cursor(self) -> Tuple[int, int]:
+        """The cursor of the newest event readers can see, (0, 0) if none"""
+        statement = (
+            select(ChangeEvent.txid, ChangeEvent.id)
+            .where(ChangeEvent.txid < _FINISHED_BEFORE)
+            .order_by(ChangeEvent.txid.desc(), ChangeEvent.id.desc())
+            .limit(1)
+        )
+        latest = self.session.exec(statement).first()
+        return tuple(latest) if latest else (0, 0)
+
+    def oldest_cursor(self) -> Optional[Tuple[int, int]]:
+        """The cursor of the consumer furthest behind, None if there are none"""
+        statement = (
+            select(OutboxCursor.txid, OutboxCursor.event_id)
+            .order_by(OutboxCursor.txid, OutboxCursor.event_id)
+            .limit(1)
+        )
+        oldest = self.session.exec(statement).first()
+        return tuple(oldest) if oldest else None
+
+    def purge(
+        self,
+        created_before: datetime,
+        read_up_to: Optional[Tuple[int, int]],
+        batch_size: int,
+    ) -> int:
+        """
+        Delete up to ``batch_size`` of the oldest events created before
+        ``created_before`` and at or behind the ``read_up_to`` cursor,
+        returning how many went.
+        """
+        stale = select(ChangeEvent.id).where(ChangeEvent.created_at < created_before)
+        if read_up_to is not None:
+            stale = stale.where(
+                tuple_(ChangeEvent.txid, ChangeEvent.id) <= tuple_(*read_up_to)
+            )
+        stale = (
+            stale.order_by(ChangeEvent.txid, ChangeEvent.id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = self.session.exec(delete(ChangeEvent).where(ChangeEvent.id.in_(stale)))
+        self.session.commit()
+        return result.rowcount
+
+    def get_cursor(self, consumer: str) -> Optional[Tuple[int, int]]:
+        cursor = self.session.get(OutboxCursor, consumer)
+        return (cursor.txid, cursor.event_id) if cursor else None
+
+    def save_cursor(self, consumer: str, cursor: Tuple[int, int]) -> None:
+        table = OutboxCursor.__table__
+        txid, event_id = cursor
+        statement = pg_insert(table).values(
+            consumer=consumer,
+            txid=txid,
+            event_id=event_id,
+            updated_at=datetime.now(timezone.utc),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.consumer],
+            set_={
+                "txid": statement.excluded.txid,
+                "event_id": statement.excluded.event_id,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        self.session.execute(statement)
+        self.session.commit()
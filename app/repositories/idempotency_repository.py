@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import bindparam, delete, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from app.models.idempotency import IdempotencyKey
+from app.core.tracing import traced_methods
+
+_GET_KEY = select(IdempotencyKey).where(IdempotencyKey.id == bindparam("key_id"))
+
+
+@traced_methods
+class IdempotencyRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, key_id: str) -> Optional[IdempotencyKey]:
+        return self.session.exec(_GET_KEY, params={"key_id": key_id}).first()
+
+    def reserve(
+        self,
+        key_id: str,
+        request_hash: str,
+        expires_at: datetime,
+        locked_until: datetime,
+    ) -> bool:
+        """
+        Claim ``key_id`` for a new request, leased until ``locked_until``.
+
+        Returns False when an unexpired record already holds the key. An
+        expired record is taken over in place so no purge has to run first,
+        and so is an unfinished one whose lease has run out, left behind by
+        a worker that died mid-request.
+        """
+        now = datetime.now(timezone.utc)
+        table = IdempotencyKey.__table__
+
+        statement = insert(table).values(
+            id=key_id,
+            request_hash=request_hash,
+            created_at=now,
+            expires_at=expires_at,
+            locked_until=locked_until,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                "request_hash": statement.excluded.request_hash,
+                "status_code": None,
+                "response_body": None,
+                "created_at": statement.excluded.created_at,
+                "expires_at": statement.excluded.expires_at,
+                "locked_until": statement.excluded.locked_until,
+            },
+            where=or_(
+                table.c.expires_at < now,
+                (table.c.status_code.is_(None) & (table.c.locked_until < now)),
+            ),
+        ).returning(table.c.id)
+
+        claimed = self.session.exec(statement).first() is not None
+        self.session.commit()
+        return claimed
+
+    def complete(
+        self,
+        key_id: str,
+        request_hash: str,
+        locked_until: datetime,
+        status_code: int,
+        response_body: str,
+    ) -> bool:
+        """
+        Store the response of the request holding the lease that ended at
+        ``locked_until``. Returns False when the key was taken over or
+        purged meanwhile, in which case nothing is written.
+        """
+        stored = self.session.exec(
+            update(IdempotencyKey)
+            .where(*self._lease(key_id, request_hash, locked_until))
+            .values(
+                status_code=status_code, response_body=response_body, locked_until=None
+            )
+        )
+        self.session.commit()
+        return stored.rowcount > 0
+
+    def release(self, key_id: str, request_hash: str, locked_until: datetime) -> None:
+        """Drop the key if this request still holds it, so it may be retried"""
+        # The failed request may have left the transaction aborted
+        self.session.rollback()
+        self.session.exec(
+            delete(IdempotencyKey).where(
+                *self._lease(key_id, request_hash, locked_until)
+            )
+        )
+        self.session.commit()
+
+    def _lease(self, key_id: str, request_hash: str, locked_until: datetime) -> tuple:
+        # The lease's end time doubles as its token: a takeover sets a new one
+        return (
+            IdempotencyKey.id == key_id,
+            IdempotencyKey.request_hash == request_hash,
+            IdempotencyKey.locked_until == locked_until,
+            IdempotencyKey.status_code.is_(None),
+        )
+
+    def purge_expired(self, batch_size: int) -> int:
+        """Delete up to ``batch_size`` expired keys, returning how many went."""
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = self.session.exec(
+            delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired))
+        )
+        self.session.commit()
+        return result.rowcount
@@ -1,30 +1,89 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, func, literal, union_all, update
+from sqlalchemy.orm import load_only
+from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import Session, select
 from app.utils.ids import generate_unique_id
+from app.utils.projection import column_names
 from app.schemas.payment import PaymentBase, PaymentUpdate, PaymentCreate
-from app.models.payment import Payment
+from app.models.payment import (
+    Payment,
+    PaymentStatus,
+    ACTIVE_PAYMENT_STATUSES,
+    OPEN_PAYMENT_STATUSES,
+)
+from app.repositories.change_event_repository import ChangeEventRepository
+from app.core.tracing import traced_methods
 
+# Hot lookups are built once; see service_repository
+_GET_PAYMENT = select(Payment).where(Payment.id == bindparam("payment_id"))
+_PAYMENT_VERSION = select(Payment.id, Payment.status, Payment.updated_at).where(
+    Payment.id == bindparam("payment_id")
+)
 
+
+def _change(payment: Payment) -> Tuple[str, str, str]:
+    return payment.id, payment.user_id, PaymentStatus(payment.status).value
+
+
+@traced_methods
 class PaymentRepository:
     def __init__(self, session: Session):
         self.session = session
+        self.changes = ChangeEventRepository(session)
 
     def get(self, payment_id: str) -> Payment:
-        statement = select(Payment).where(Payment.id == payment_id)
-
-        payment = self.session.exec(statement).first()
-        return payment
+        return self.session.exec(_GET_PAYMENT, params={"payment_id": payment_id}).first()
 
     def list_payments(
         self,
         booking_id: Optional[str] = None,
         reference_id: Optional[str] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[Payment]:
 
         statement = select(Payment)
 
+        if fields is not None:
+            statement = statement.options(
+                load_only(
+                    *(
+                        getattr(Payment, column)
+                        for column in column_names(Payment, (*fields, "updated_at"))
+                    ),
+                    raiseload=True,
+                )
+            )
+
+        statement = self._filter(statement, booking_id, reference_id, user_id)
+        statement = statement.order_by(Payment.created_at.desc())
+        return self.session.exec(statement).all()
+
+    def get_version(self, payment_id: str) -> Optional[Tuple[str, PaymentStatus, datetime]]:
+        """``(id, status, updated_at)`` of a payment, without its metadata"""
+        return self.session.exec(_PAYMENT_VERSION, params={"payment_id": payment_id}).first()
+
+    def list_version(
+        self,
+        booking_id: Optional[str] = None,
+        reference_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Tuple[int, Optional[datetime]]:
+        """Row count and newest ``updated_at`` of what ``list_payments`` would return"""
+        statement = select(func.count(), func.max(Payment.updated_at)).select_from(Payment)
+        statement = self._filter(statement, booking_id, reference_id, user_id)
+        return self.session.exec(statement).one()
+
+    def _filter(
+        self,
+        statement,
+        booking_id: Optional[str],
+        reference_id: Optional[str],
+        user_id: Optional[str],
+    ):
         if user_id:
             statement = statement.where(Payment.user_id == user_id)
 
@@ -36,8 +95,87 @@ class PaymentRepository:
                 (Payment.reference_id == reference_id) 
             )
 
-        statement = statement.order_by(Payment.created_at.desc())
-        return self.session.exec(statement).all()
+        return statement
+
+    def list_open(
+        self,
+        limit: int,
+        after_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> List[Tuple[str, str, Decimal, Dict[str, Any]]]:
+        """
+        ``(id, external_id, amount, payment_metadata)`` of up to ``limit``
+        pending and processing payments after ``after_id``, in id order.
+        Nothing is locked; ``settle`` and ``cancel_open`` re-check the
+        status when they write.
+        """
+        statement = select(
+            Payment.id, Payment.external_id, Payment.amount, Payment.payment_metadata
+        ).where(Payment.status.in_(OPEN_PAYMENT_STATUSES))
+        if after_id is not None:
+            statement = statement.where(Payment.id > after_id)
+        if created_after is not None:
+            statement = statement.where(Payment.created_at >= created_after)
+        if created_before is not None:
+            statement = statement.where(Payment.created_at < created_before)
+        return self.session.exec(statement.order_by(Payment.id).limit(limit)).all()
+
+    def settle(self, payment_id: str, payment_metadata: Dict[str, Any]) -> bool:
+        """
+        Mark a payment verified on chain as succeeded, unless it stopped
+        being open meanwhile. Returns whether this call settled it.
+        """
+        settled = self.session.execute(
+            update(Payment)
+            .where(Payment.id == payment_id, Payment.status.in_(OPEN_PAYMENT_STATUSES))
+            .values(
+                status=PaymentStatus.SUCCEEDED,
+                payment_metadata=payment_metadata,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(Payment.user_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if settled is not None:
+            self.changes.append(
+                "payment", "updated", [(payment_id, settled.user_id, PaymentStatus.SUCCEEDED.value)]
+            )
+        self.session.commit()
+        return settled is not None
+
+    def cancel_open(self, payment_ids: Sequence[str]) -> List[str]:
+        """
+        Cancel those of ``payment_ids`` that are still pending or processing
+        and return their ids.
+        """
+        if not payment_ids:
+            return []
+        cancelled = self.session.execute(
+            update(Payment)
+            .where(Payment.id.in_(payment_ids), Payment.status.in_(OPEN_PAYMENT_STATUSES))
+            .values(status=PaymentStatus.CANCELLED, updated_at=datetime.now(timezone.utc))
+            .returning(Payment.id, Payment.user_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.changes.append(
+            "payment",
+            "updated",
+            [(payment_id, user_id, PaymentStatus.CANCELLED.value) for payment_id, user_id in cancelled],
+        )
+        self.session.commit()
+        return [payment_id for payment_id, _ in cancelled]
+
+    def iter_for_export(self, user_id: str, batch_size: int) -> Iterator[Dict[str, Any]]:
+        """Stream raw payment rows through a server-side cursor"""
+        statement = (
+            select(*Payment.__table__.columns)
+            .where(Payment.user_id == user_id)
+            .order_by(Payment.created_at)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in self.session.execute(statement).mappings().partitions():
+            yield from partition
 
     def create(self, payment_in: PaymentCreate, booking_id: str, user_id: str) -> Payment:
 
@@ -53,13 +191,108 @@ class PaymentRepository:
         )
 
         self.session.add(payment)
+        self.session.flush()
+        self.changes.append("payment", "created", [_change(payment)])
         self.session.commit()
         self.session.refresh(payment)
         return payment
 
+    def get_or_create_for_booking(
+        self,
+        payment_in: PaymentCreate,
+        booking_id: str,
+        user_id: str,
+        force: bool = False,
+    ) -> Optional[Payment]:
+        """
+        Return the booking's active payment, creating it if there is none.
+
+        The insert and the lookup of an existing payment run as a single
+        ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` statement against the
+        ``uq_payments_active_booking`` partial index, so concurrent checkouts
+        for one booking converge on the same row. With ``force`` any pending
+        or processing payment is cancelled first, in the same transaction.
+        Returns None if the active payment keeps changing under the insert.
+        """
+        if force:
+            cancelled = self.session.execute(
+                update(Payment)
+                .where(
+                    Payment.booking_id == booking_id,
+                    Payment.status.in_(
+                        [PaymentStatus.PENDING, PaymentStatus.PROCESSING]
+                    ),
+                )
+                .values(
+                    status=PaymentStatus.CANCELLED,
+                    updated_at=datetime.now(timezone.utc),
+                )
+                .returning(Payment.id, Payment.user_id)
+            ).all()
+            self.changes.append(
+                "payment",
+                "updated",
+                [(payment_id, owner, PaymentStatus.CANCELLED.value) for payment_id, owner in cancelled],
+            )
+
+        payment = Payment(
+            id=generate_unique_id(),
+            user_id=user_id,
+            booking_id=booking_id,
+            **payment_in.model_dump(),
+            created_at=datetime.now(timezone.utc),
+            updated_at=datetime.now(timezone.utc),
+        )
+        table = Payment.__table__
+        active = table.c.status.in_(ACTIVE_PAYMENT_STATUSES)
+
+        inserted = (
+            insert(table)
+            .values({column.key: getattr(payment, column.key) for column in table.c})
+            .on_conflict_do_nothing(
+                index_elements=[table.c.booking_id],
+                index_where=table.c.booking_id.isnot(None) & active,
+            )
+            .returning(*table.c)
+            .cte("inserted")
+        )
+        created_event = self.changes.append_from(
+            "payment",
+            "created",
+            select(inserted.c.id, inserted.c.user_id, literal(PaymentStatus(payment.status).value)),
+        ).cte("created_event")
+        existing = select(*table.c).where(table.c.booking_id == booking_id, active)
+        statement = union_all(select(*inserted.c), existing).limit(1).add_cte(created_event)
+
+        for _ in range(2):
+            payment = self.session.scalars(
+                select(Payment).from_statement(statement)
+            ).first()
+            if payment is None:
+                # The conflicting row was committed by a concurrent request
+                # after this statement took its snapshot; it is visible to a
+                # new one.
+                payment = self.session.exec(
+                    select(Payment).where(
+                        Payment.booking_id == booking_id,
+                        Payment.status.in_(ACTIVE_PAYMENT_STATUSES),
+                    )
+                ).first()
+            if payment is not None:
+                break
+            # ...unless it was settled in between, which frees the slot again
+        else:
+            self.session.rollback()
+            return None
+
+        # Fully loaded by RETURNING; keep the commit from expiring it
+        self.session.expunge(payment)
+        self.session.commit()
+        return payment
+
     def update(self, payment_id: str, payment_in: PaymentUpdate) -> Payment:
         payment = self.get(payment_id)
-
+        previous_status = PaymentStatus(payment.status)
 
         for field, value in payment_in.model_dump(
             exclude_unset=True, mode="json"
@@ -71,6 +304,12 @@ class PaymentRepository:
 
         payment.updated_at = datetime.now(timezone.utc)
         self.session.add(payment)
+        self.changes.append(
+            "payment",
+            "updated",
+            [_change(payment)],
+            status_changed=PaymentStatus(payment.status) != previous_status,
+        )
         self.session.commit()
         self.session.refresh(payment)
         return payment
@@ -1,23 +1,57 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam
+from sqlalchemy.orm import load_only
 from sqlmodel import select, Session, and_, or_
 from datetime import datetime, timezone
 from app.utils.ids import generate_unique_id
+from app.utils.projection import column_names
 from app.models.service import Service
 from app.schemas.service import ServiceCreate, ServiceUpdate
+from app.core.tracing import traced_methods
 
+# Hot lookups are built once; a module-level statement also caches its
+# SQLAlchemy cache key, so each call only binds parameters.
+_GET_SERVICE = select(Service).where(Service.id == bindparam("service_id"))
+_SERVICE_VERSION = select(Service.id, Service.updated_at).where(
+    Service.id == bindparam("service_id")
+)
+_SERVICE_OWNER = select(Service.owner_id).where(Service.id == bindparam("service_id"))
 
+
+@traced_methods
 class ServiceRepository:
     def __init__(self, session: Session):
         self.session = session
 
     def get(self, service_id: str) -> Optional[Service]:
-        statement = select(Service).where(Service.id == service_id)
-        service = self.session.exec(statement).first()
-        return service
+        return self.session.exec(_GET_SERVICE, params={"service_id": service_id}).first()
 
-    def list(self, search: Optional[str] = None) -> List[Service]:
+    def list(
+        self, search: Optional[str] = None, fields: Optional[Sequence[str]] = None
+    ) -> List[Service]:
         statement = select(Service)
 
+        if fields is not None:
+            statement = statement.options(
+                load_only(
+                    *(
+                        getattr(Service, column)
+                        for column in column_names(Service, (*fields, "updated_at"))
+                    ),
+                    raiseload=True,
+                )
+            )
+
+        return self.session.exec(self._search(statement, search)).all()
+
+    def get_version(self, service_id: str) -> Optional[Tuple[str, datetime]]:
+        """``(id, updated_at)`` of a service, without loading its JSON columns"""
+        return self.session.exec(_SERVICE_VERSION, params={"service_id": service_id}).first()
+
+    def get_owner_id(self, service_id: str) -> Optional[str]:
+        return self.session.exec(_SERVICE_OWNER, params={"service_id": service_id}).first()
+
+    def _search(self, statement, search: Optional[str]):
         if search:
             keyword = f"%{search}%"
             statement = statement.where(
@@ -26,8 +60,7 @@ class ServiceRepository:
                     Service.description.ilike(keyword)
                 )
             )
-
-        return self.session.exec(statement).all()
+        return statement
 
     # def list_by_business(self, business_id: str) -> List[Service]:
     #     statement = select(Service).where(Service.business_id == business_id)
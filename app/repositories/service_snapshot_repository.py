@@ -0,0 +1,50 @@
+from threading import Lock
+from typing import Any, Dict, Optional
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from app.models.service_snapshot import ServiceSnapshot
+from app.utils.hashing import content_hash
+from app.core.tracing import traced_methods
+
+# Hashes known to be committed, so repeat bookings of an unchanged service
+# skip the insert entirely. Snapshots are immutable and never deleted.
+_KNOWN_HASHES_LIMIT = 10_000
+_known_hashes: Dict[str, None] = {}
+_known_hashes_lock = Lock()
+
+_GET_SNAPSHOT = select(ServiceSnapshot).where(ServiceSnapshot.hash == bindparam("hash"))
+
+
+@traced_methods
+class ServiceSnapshotRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, snapshot_hash: str) -> Optional[ServiceSnapshot]:
+        return self.session.exec(_GET_SNAPSHOT, params={"hash": snapshot_hash}).first()
+
+    def add(self, service_id: str, snapshot: Dict[str, Any]) -> str:
+        """
+        Store ``snapshot`` once under its content hash and return the hash.
+
+        Runs inside the caller's transaction; call ``mark_committed`` once
+        that transaction has been committed.
+        """
+        snapshot_hash = content_hash(snapshot)
+        if snapshot_hash in _known_hashes:
+            return snapshot_hash
+
+        self.session.exec(
+            insert(ServiceSnapshot.__table__)
+            .values(hash=snapshot_hash, service_id=service_id, snapshot=snapshot)
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+        return snapshot_hash
+
+    @staticmethod
+    def mark_committed(snapshot_hash: str) -> None:
+        with _known_hashes_lock:
+            if len(_known_hashes) >= _KNOWN_HASHES_LIMIT:
+                _known_hashes.clear()
+            _known_hashes[snapshot_hash] = None
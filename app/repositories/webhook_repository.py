@@ -0,0 +1,50 @@
+from typing import Iterable, List, Optional
+from sqlmodel import Session, select
+from app.models.webhook import WebhookSubscription
+from app.utils.ids import generate_random_base58_key, generate_unique_id
+from app.core.tracing import traced_methods
+
+
+@traced_methods
+class WebhookRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def create(self, owner_id: str, url: str) -> WebhookSubscription:
+        subscription = WebhookSubscription(
+            id=generate_unique_id(),
+            owner_id=owner_id,
+            url=url,
+            secret=generate_random_base58_key(),
+        )
+        self.session.add(subscription)
+        self.session.commit()
+        self.session.refresh(subscription)
+        return subscription
+
+    def get(self, webhook_id: str) -> Optional[WebhookSubscription]:
+        return self.session.get(WebhookSubscription, webhook_id)
+
+    def list_by_owner(self, owner_id: str) -> List[WebhookSubscription]:
+        statement = (
+            select(WebhookSubscription)
+            .where(WebhookSubscription.owner_id == owner_id)
+            .order_by(WebhookSubscription.created_at.desc())
+        )
+        return self.session.exec(statement).all()
+
+    def list_active_for_owners(
+        self, owner_ids: Iterable[str]
+    ) -> List[WebhookSubscription]:
+        owner_ids = list(owner_ids)
+        if not owner_ids:
+            return []
+        statement = select(WebhookSubscription).where(
+            WebhookSubscription.owner_id.in_(owner_ids),
+            WebhookSubscription.active,
+        )
+        return self.session.exec(statement).all()
+
+    def delete(self, subscription: WebhookSubscription) -> None:
+        self.session.delete(subscription)
+        self.session.commit()
@@ -4,6 +4,7 @@ from typing import Optional, Dict, Any
 from decimal import Decimal
 from pydantic import BaseModel, ConfigDict
 from .service import ServiceResponse
+from .pricing import PriceBreakdown, VariantSelections
 from app.models.booking import BookingStatus
 
 
@@ -18,6 +19,7 @@ class BookingBase(BaseModel):
     duration: Optional[int]
     status: BookingStatus = BookingStatus.PENDING
     attributes: Optional[Dict[str, Any]] = None
+    price_breakdown: Optional[PriceBreakdown] = None
 
 
 class BookingCreate(BaseModel):
@@ -25,6 +27,7 @@ class BookingCreate(BaseModel):
     # variant_id: Optional[str] = None
     scheduled_at: datetime
     duration: Optional[int]
+    variants: Optional[VariantSelections] = None
     attributes: Optional[Dict[str, Any]] = None
     force_add: Optional[bool] = None
 
@@ -32,6 +35,7 @@ class BookingCreate(BaseModel):
 class BookingCreateValidated(BookingCreate):
     total_price: Optional[Decimal]
     base_price: Optional[Decimal]
+    price_breakdown: Optional[Dict[str, Any]] = None
 
 class BookingUpdate(BaseModel):
     # status: Optional[BookingStatus] = None
@@ -40,6 +44,13 @@ class BookingUpdate(BaseModel):
     scheduled_at: Optional[datetime] = None
 
 
+class BookingCalendarFilter(BaseModel):
+    # Bookings scheduled in [scheduled_from, scheduled_to)
+    scheduled_from: Optional[datetime] = None
+    scheduled_to: Optional[datetime] = None
+    status: Optional[BookingStatus] = None
+
+
 class BookingResponse(BookingBase):
     model_config = ConfigDict(from_attributes=True)
 
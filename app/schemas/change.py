@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ChangeEventResponse(BaseModel):
+    cursor: str
+    entity: str
+    entity_id: str
+    action: str
+    status: Optional[str] = None
+    created_at: datetime
+
+
+class ChangeFeedResponse(BaseModel):
+    events: List[ChangeEventResponse]
+    # Pass back as ``since`` to read what follows; unchanged when empty
+    next_cursor: str
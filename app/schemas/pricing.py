@@ -0,0 +1,45 @@
+from decimal import Decimal
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, Field
+from app.models.service import PricingType
+
+# Variant name -> chosen option name(s). Single-choice variants may pass a
+# plain string, multiple-choice variants a list of option names.
+VariantSelections = Dict[str, Union[str, List[str]]]
+
+
+class PriceBreakdownLine(BaseModel):
+    variant: str
+    option: str
+    price_change: Decimal
+
+
+class PriceBreakdown(BaseModel):
+    pricing_model: PricingType
+    currency: Optional[str] = None
+    duration: Optional[int] = None
+    unit_price: Decimal
+    tier_duration: Optional[int] = None
+    base_amount: Decimal
+    variants: List[PriceBreakdownLine] = []
+    total_price: Decimal
+
+
+class QuoteItem(BaseModel):
+    duration: Optional[int] = None
+    variants: Optional[VariantSelections] = None
+
+
+class QuoteRequest(BaseModel):
+    items: List[QuoteItem] = Field(min_length=1, max_length=1000)
+
+
+class QuoteResult(QuoteItem):
+    price_breakdown: Optional[PriceBreakdown] = None
+    error: Optional[str] = None
+
+
+class QuoteBatchResponse(BaseModel):
+    service_id: str
+    currency: Optional[str] = None
+    quotes: List[QuoteResult]
@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, HttpUrl
+
+
+class WebhookCreate(BaseModel):
+    url: HttpUrl
+
+
+class WebhookResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    url: str
+    active: bool
+    created_at: datetime
+
+
+class WebhookCreatedResponse(WebhookResponse):
+    # Deliveries carry X-Webhook-Signature, sha256=HMAC(secret, "<timestamp>.<body>")
+    secret: str
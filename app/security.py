@@ -1,11 +1,15 @@
+import hmac
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from jose import jwt, ExpiredSignatureError, JWTError
 from app.config import settings
+from app.core.metrics import AUTH, record_phase
+from app.core.tracing import span
 
 # Initialize security scheme
 security = HTTPBearer()
+metrics_security = HTTPBearer(auto_error=False)
 
 
 class TokenData:
@@ -13,6 +17,8 @@ class TokenData:
         self.user_id = user_id
 
 
+@record_phase(AUTH)
+@span("auth.jwt_decode")
 def verify_jwt_token(token: str) -> TokenData:
     """
     Verify JWT token and extract user_id
@@ -78,3 +84,23 @@ def get_current_user(
     """
     token = credentials.credentials
     return verify_jwt_token(token)
+
+
+def verify_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_security),
+) -> None:
+    """
+    Dependency guarding /metrics: the caller must present METRICS_TOKEN
+    as a bearer token
+    """
+    expected = settings.METRICS_TOKEN
+    if (
+        not expected
+        or credentials is None
+        or not hmac.compare_digest(credentials.credentials.encode(), expected.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
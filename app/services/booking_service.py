@@ -1,23 +1,57 @@
-from typing import List
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Sequence, Tuple
 from sqlmodel import Session
+from app.config import settings
+from app.database import release_connection
 from app.models.booking import Booking
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingCreateValidated
-from app.schemas.service import ServiceBase, PricingType
+from app.schemas.booking import (
+    BookingCalendarFilter,
+    BookingCreate,
+    BookingUpdate,
+    BookingCreateValidated,
+)
+from app.models.service import Service
+from app.schemas.pricing import PriceBreakdown
 from app.exceptions.booking_exception import (
     BookingNotFoundException,
     BookingConflictException,
-    BookingInvalidDurationException,
     BookingTimeBasedDurationRequiredException,
     BookingInvalidTimeBasedConfigurationException,
+    InvalidBookingCursorException,
     UnauthorizedBookingAccessException,
 )
-from app.exceptions.service_exception import ServiceNotFoundException
+from app.exceptions.service_exception import (
+    ServiceNotFoundException,
+    UnauthorizedServiceAccessException,
+)
 from app.repositories.booking_repository import BookingRepository
 from app.repositories.service_repository import ServiceRepository
+from app.services.pricing_service import get_compiled_pricing
+from app.utils.etags import collection_etag, resource_etag
+
+
+def encode_cursor(booking: Booking) -> str:
+    key = f"{booking.scheduled_at.isoformat()}|{booking.id}"
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    if not cursor:
+        return None
+    try:
+        scheduled_at, booking_id = (
+            base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        )
+        return datetime.fromisoformat(scheduled_at), booking_id
+    except (ValueError, binascii.Error):
+        raise InvalidBookingCursorException(cursor)
 
 
 class BookingService:
     def __init__(self, session: Session):
+        self.session = session
         self.repo = BookingRepository(session)
         self.service_repo = ServiceRepository(session)
 
@@ -31,35 +65,108 @@ class BookingService:
 
         return booking
 
-    def list_user_bookings(self, current_user_id: str) -> List[Booking]:
-        return self.repo.list_by_user(user_id=current_user_id)
+    def get_etag(self, booking_id: str, user_id: str) -> str:
+        version = self.repo.get_version(booking_id=booking_id)
+        if not version:
+            raise BookingNotFoundException(booking_id)
 
-    def calculate_total_price(self, service: ServiceBase, booking: BookingCreate) -> float:
+        version_id, owner_id, updated_at = version
+        if owner_id != user_id:
+            raise UnauthorizedBookingAccessException(booking_id=booking_id)
+
+        return resource_etag(version_id, updated_at)
+
+    def list_etag(
+        self, current_user_id: str, fields: Optional[Sequence[str]] = None
+    ) -> str:
+        return collection_etag(*self.repo.list_version(user_id=current_user_id), fields=fields)
+
+    def list_user_bookings(
+        self, current_user_id: str, fields: Optional[Sequence[str]] = None
+    ) -> List[Booking]:
+        bookings = self.repo.list_by_user(user_id=current_user_id, fields=fields)
+        release_connection(self.session)
+        return bookings
+
+    def list_service_bookings(
+        self,
+        service_id: str,
+        current_user_id: str,
+        filters: BookingCalendarFilter,
+        cursor: Optional[str],
+        limit: int,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Booking], Optional[str]]:
+        """A page of the bookings of a service the user owns, and the next cursor"""
+        owner_id = self.service_repo.get_owner_id(service_id)
+        if owner_id is None:
+            raise ServiceNotFoundException(service_id)
+        if owner_id != current_user_id:
+            raise UnauthorizedServiceAccessException(service_id)
+
+        return self._page(
+            self.repo.list_by_service, service_id, filters, cursor, limit, fields
+        )
+
+    def list_owned_bookings(
+        self,
+        current_user_id: str,
+        filters: BookingCalendarFilter,
+        cursor: Optional[str],
+        limit: int,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Booking], Optional[str]]:
+        """A page of the bookings of every service the user owns"""
+        return self._page(
+            self.repo.list_by_owner, current_user_id, filters, cursor, limit, fields
+        )
+
+    def _page(
+        self,
+        list_page: Callable[..., List[Booking]],
+        key: str,
+        filters: BookingCalendarFilter,
+        cursor: Optional[str],
+        limit: int,
+        fields: Optional[Sequence[str]],
+    ) -> Tuple[List[Booking], Optional[str]]:
+        after = decode_cursor(cursor)
+        # One row past the page tells whether another page follows
+        bookings = list_page(
+            key, limit + 1, after=after, fields=fields, **filters.model_dump()
+        )
+        release_connection(self.session)
+        if len(bookings) <= limit:
+            return bookings, None
+        bookings = bookings[:limit]
+        return bookings, encode_cursor(bookings[-1])
+
+    def expire_stale(self) -> int:
+        """Cancel pending bookings older than BOOKING_PENDING_TTL_SECONDS"""
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.BOOKING_PENDING_TTL_SECONDS
+        )
+        expired = 0
+        while True:
+            ids = self.repo.expire_pending(cutoff, settings.EXPIRY_SWEEP_BATCH_SIZE)
+            expired += len(ids)
+            if len(ids) < settings.EXPIRY_SWEEP_BATCH_SIZE:
+                return expired
+
+    def calculate_total_price(self, service: Service, booking: BookingCreate) -> PriceBreakdown:
         """
-        Calculate the total price for a booking based on the service pricing model.
+        Price a booking against the service's compiled pricing rules.
 
         Args:
-            service (ServiceBase): The service object containing pricing info.
-            booking (BookingCreate): The booking details, including duration if needed.
+            service (Service): The service object containing pricing info.
+            booking (BookingCreate): The booking details, including duration
+                and variant selections.
 
         Returns:
-            float: The total calculated price.
+            PriceBreakdown: Unit price, matched tier, variant lines and total.
         """
-
-        # Defensive check for duration in time-based pricing
-        if service.pricing_model == PricingType.TIME_BASED:
-            if not booking.duration or booking.duration <= 0:
-                raise BookingInvalidDurationException()
-            return service.base_price * booking.duration
-
-        # Extend here for other pricing models in the future
-        # e.g. if service.pricing_model == PricingType.FLAT_FEE:
-        #           return service.base_price
-        # or if service.pricing_model == PricingType.PER_UNIT:
-        #           return service.base_price * booking.units
-
-        return service.base_price
-
+        pricing = get_compiled_pricing(service)
+        return pricing.quote(duration=booking.duration, selections=booking.variants)
 
     def create(self, booking_in: BookingCreate, current_user_id: str) -> Booking:
         service = self.service_repo.get(booking_in.service_id)
@@ -84,10 +191,14 @@ class BookingService:
                 raise BookingTimeBasedDurationRequiredException()
             if base_price is None or time_unit is None:
                 raise BookingInvalidTimeBasedConfigurationException()
-        
-        base_price = service.base_price
-        total_price = self.calculate_total_price(service=service, booking=booking_in)
-        booking_in_validated = BookingCreateValidated(base_price=base_price, total_price=total_price, **booking_in.model_dump())
+
+        breakdown = self.calculate_total_price(service=service, booking=booking_in)
+        booking_in_validated = BookingCreateValidated(
+            base_price=base_price,
+            total_price=breakdown.total_price,
+            price_breakdown=breakdown.model_dump(mode="json"),
+            **booking_in.model_dump(),
+        )
 
         return self.repo.create(booking_in=booking_in_validated, user_id=current_user_id)
 
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from sqlmodel import Session
+from app.config import settings
+from app.exceptions.change_exceptions import InvalidChangeCursorException
+from app.models.change_event import ChangeEvent
+from app.repositories.change_event_repository import ChangeEventRepository
+from app.schemas.change import ChangeEventResponse, ChangeFeedResponse
+
+START = (0, 0)
+
+
+def encode_cursor(event: ChangeEvent) -> str:
+    return f"{event.txid}.{event.id}"
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[int, int]:
+    if not cursor:
+        return START
+    try:
+        txid, event_id = cursor.split(".")
+        return int(txid), int(event_id)
+    except ValueError:
+        raise InvalidChangeCursorException(cursor)
+
+
+class ChangeFeedService:
+    def __init__(self, session: Session):
+        self.repo = ChangeEventRepository(session)
+
+    def since(
+        self, user_id: str, cursor: Optional[str], limit: int
+    ) -> ChangeFeedResponse:
+        events = self.repo.list_after(user_id, decode_cursor(cursor), limit)
+        return ChangeFeedResponse(
+            events=[
+                ChangeEventResponse(
+                    cursor=encode_cursor(event),
+                    entity=event.entity,
+                    entity_id=event.entity_id,
+                    action=event.action,
+                    status=event.status,
+                    created_at=event.created_at,
+                )
+                for event in events
+            ],
+            next_cursor=encode_cursor(events[-1]) if events else cursor or "0.0",
+        )
+
+    def purge_old(self) -> int:
+        """
+        Delete events older than CHANGE_EVENT_RETENTION_SECONDS that every
+        outbox consumer, such as webhook delivery, has already read.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.CHANGE_EVENT_RETENTION_SECONDS
+        )
+        read_up_to = self.repo.oldest_cursor()
+        purged = 0
+        while True:
+            deleted = self.repo.purge(
+                cutoff, read_up_to, settings.CHANGE_EVENT_PURGE_BATCH_SIZE
+            )
+            purged += deleted
+            if deleted < settings.CHANGE_EVENT_PURGE_BATCH_SIZE:
+                return purged
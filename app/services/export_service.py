@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+import zstandard
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app.config import settings
+from app.database import engine
+from app.models.booking import Booking
+from app.models.payment import Payment
+from app.repositories.booking_repository import BookingRepository
+from app.repositories.payment_repository import PaymentRepository
+from app.schemas.export import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _json_default(value: Any):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+
+def _csv_value(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, (Enum, datetime, date, Decimal)):
+        return _json_default(value)
+    return value
+
+
+class ExportService:
+    """
+    Streams full booking and payment histories.
+
+    Each export opens its own session inside the response generator, since
+    request-scoped sessions are closed before a streaming body is sent.
+    Rows come from a server-side cursor in ``EXPORT_BATCH_SIZE`` batches and
+    are flushed in ``EXPORT_CHUNK_BYTES`` chunks, so memory stays flat
+    regardless of history size.
+    """
+
+    def export_bookings(
+        self, user_id: str, export_format: ExportFormat, compress: bool
+    ) -> StreamingResponse:
+        return self._response(
+            name="bookings",
+            columns=list(Booking.__table__.columns.keys()),
+            rows=lambda session: BookingRepository(session).iter_for_export(
+                user_id=user_id, batch_size=settings.EXPORT_BATCH_SIZE
+            ),
+            export_format=export_format,
+            compress=compress,
+        )
+
+    def export_payments(
+        self, user_id: str, export_format: ExportFormat, compress: bool
+    ) -> StreamingResponse:
+        return self._response(
+            name="payments",
+            columns=list(Payment.__table__.columns.keys()),
+            rows=lambda session: PaymentRepository(session).iter_for_export(
+                user_id=user_id, batch_size=settings.EXPORT_BATCH_SIZE
+            ),
+            export_format=export_format,
+            compress=compress,
+        )
+
+    def _response(
+        self,
+        name: str,
+        columns: List[str],
+        rows: Callable[[Session], Iterable[Dict[str, Any]]],
+        export_format: ExportFormat,
+        compress: bool,
+    ) -> StreamingResponse:
+        filename = f"{name}.{export_format.value}"
+        media_type = MEDIA_TYPES[export_format]
+
+        body = self._stream(columns, rows, export_format)
+        if compress:
+            body = self._zstd(body)
+            filename += ".zst"
+            media_type = "application/zstd"
+
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    def _stream(
+        self,
+        columns: List[str],
+        rows: Callable[[Session], Iterable[Dict[str, Any]]],
+        export_format: ExportFormat,
+    ) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        if export_format == ExportFormat.CSV:
+            writer.writerow(columns)
+
+        with Session(engine) as session:
+            for row in rows(session):
+                if export_format == ExportFormat.CSV:
+                    writer.writerow([_csv_value(row[column]) for column in columns])
+                else:
+                    buffer.write(json.dumps(dict(row), default=_json_default))
+                    buffer.write("\n")
+
+                if buffer.tell() >= settings.EXPORT_CHUNK_BYTES:
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def _zstd(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        compressor = zstandard.ZstdCompressor().compressobj()
+        for chunk in chunks:
+            # Flush each block so the client receives data as it is produced
+            compressed = compressor.compress(chunk) + compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+            if compressed:
+                yield compressed
+        yield compressor.flush()
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Type
+from fastapi import Response
+from pydantic import BaseModel
+from sqlmodel import Session
+from app.config import settings
+from app.core.tracing import span
+from app.exceptions.idempotency_exceptions import (
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyMismatchException,
+)
+from app.repositories.idempotency_repository import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def hash_request(payload: BaseModel) -> str:
+    # Stored with each key, so this encoding (json.dumps' default separators)
+    # must not change or replays of keys stored before would be refused
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class IdempotencyService:
+    def __init__(self, session: Session):
+        self.repo = IdempotencyRepository(session)
+
+    def key_id(self, key: str, user_id: str, scope: str) -> str:
+        return hashlib.sha256(f"{user_id}\0{scope}\0{key}".encode("utf-8")).hexdigest()
+
+    def run(
+        self,
+        key: Optional[str],
+        user_id: str,
+        scope: str,
+        payload: BaseModel,
+        action: Callable[[], object],
+        response_model: Type[BaseModel],
+        status_code: int,
+    ) -> Response:
+        """
+        Execute ``action`` once per ``Idempotency-Key``.
+
+        The first request stores its serialized response; retries with the
+        same key and body are answered from storage without running
+        ``action`` again. Requests without a key always execute.
+        """
+        if not key:
+            return self._respond(action(), response_model, status_code)
+
+        key_id = self.key_id(key, user_id, scope)
+        request_hash = hash_request(payload)
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+        locked_until = now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+
+        # A key released or purged between a failed reserve and the read
+        # that follows is claimed again, once
+        for _ in range(2):
+            if self.repo.reserve(key_id, request_hash, expires_at, locked_until):
+                break
+            stored = self.repo.get(key_id)
+            if stored is None:
+                continue
+            if stored.request_hash != request_hash:
+                raise IdempotencyKeyMismatchException()
+            if stored.status_code is None:
+                raise IdempotencyKeyInProgressException()
+            return Response(
+                content=stored.response_body,
+                status_code=stored.status_code,
+                media_type="application/json",
+                headers={REPLAY_HEADER: "true"},
+            )
+        else:
+            raise IdempotencyKeyInProgressException()
+
+        try:
+            response = self._respond(action(), response_model, status_code)
+        except Exception:
+            # Failed requests may be retried with the same key
+            self.repo.release(key_id, request_hash, locked_until)
+            raise
+
+        if not self.repo.complete(
+            key_id,
+            request_hash,
+            locked_until,
+            status_code,
+            response.body.decode("utf-8"),
+        ):
+            logger.warning(
+                "Idempotency key %s was taken over before its request finished", key_id
+            )
+        return response
+
+    def purge_expired(self) -> int:
+        purged = 0
+        while True:
+            deleted = self.repo.purge_expired(settings.IDEMPOTENCY_PURGE_BATCH_SIZE)
+            purged += deleted
+            if deleted < settings.IDEMPOTENCY_PURGE_BATCH_SIZE:
+                return purged
+
+    def _respond(
+        self, result: object, response_model: Type[BaseModel], status_code: int
+    ) -> Response:
+        with span("serialize_response"):
+            body = response_model.model_validate(result, from_attributes=True)
+            content = body.model_dump_json()
+        return Response(
+            content=content,
+            status_code=status_code,
+            media_type="application/json",
+        )
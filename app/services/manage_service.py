@@ -1,17 +1,32 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+from fastapi import HTTPException
 from sqlmodel import Session
+from app.config import settings
+from app.database import release_connection
 from app.models.service import Service
-from app.schemas.service import ServiceCreate, ServiceUpdate
+from app.schemas.service import ServiceCreate, ServiceResponse, ServiceUpdate
+from app.schemas.pricing import QuoteRequest, QuoteResult, QuoteBatchResponse
 from app.exceptions.service_exception import (
     ServiceAlreadyExistsException,
     ServiceNotFoundException,
     UnauthorizedServiceAccessException,
 )
 from app.repositories.service_repository import ServiceRepository
+from app.services.pricing_service import get_compiled_pricing, invalidate_pricing
+from app.utils.etags import items_etag, resource_etag
+from app.utils.response_cache import CachedResponse, ResponseCache
+from app.utils.responses import list_json
+
+# Serialized GET /services bodies, shared by every user
+catalog_cache = ResponseCache(
+    maxsize=settings.SERVICE_CATALOG_CACHE_SIZE,
+    ttl_seconds=settings.SERVICE_CATALOG_CACHE_TTL_SECONDS,
+)
 
 
 class ServiceManager:
     def __init__(self, session: Session):
+        self.session = session
         self.repo = ServiceRepository(session)
 
     def get(self, service_id: str) -> Optional[Service]:
@@ -22,17 +37,65 @@ class ServiceManager:
 
         return service
 
-    def list(self, search: Optional[str]) -> List[Service]:
-        return self.repo.list(search)
+    def get_etag(self, service_id: str) -> str:
+        version = self.repo.get_version(service_id)
+
+        if not version:
+            raise ServiceNotFoundException(service_id)
+
+        return resource_etag(*version)
+
+    def list(
+        self, search: Optional[str], fields: Optional[Sequence[str]] = None
+    ) -> List[Service]:
+        return self.repo.list(search, fields=fields)
+
+    def catalog(
+        self, search: Optional[str], fields: Optional[Tuple[str, ...]] = None
+    ) -> CachedResponse:
+        """The JSON body and ETag of ``list``, served from ``catalog_cache``"""
+        # The search is a case-insensitive ILIKE, so its case never matters
+        search = search.lower() if search else None
+
+        def build() -> CachedResponse:
+            services = self.repo.list(search, fields=fields)
+            release_connection(self.session)
+            return CachedResponse(
+                body=list_json(services, ServiceResponse, fields),
+                etag=items_etag(services, fields),
+            )
+
+        return catalog_cache.get_or_build((search, fields), build)
 
     def list_by_owner_id(self, owner_id: str) -> List[Service]:
         return self.repo.list_by_owner_id(owner_id=owner_id)
 
+    def quote(self, service_id: str, quote_in: QuoteRequest) -> QuoteBatchResponse:
+        service = self.get(service_id)
+        pricing = get_compiled_pricing(service)
+
+        prices = pricing.quote_many(
+            [(item.duration, item.variants) for item in quote_in.items]
+        )
+
+        quotes = []
+        for item, price in zip(quote_in.items, prices):
+            if isinstance(price, HTTPException):
+                quotes.append(QuoteResult(**item.model_dump(), error=price.detail))
+            else:
+                quotes.append(QuoteResult(**item.model_dump(), price_breakdown=price))
+
+        return QuoteBatchResponse(
+            service_id=service.id, currency=service.currency, quotes=quotes
+        )
+
     def create(self, service_in: ServiceCreate, owner_id: str) -> Service:
         if self.repo.check_name_conflict(service_in.name, owner_id=owner_id):
             raise ServiceAlreadyExistsException(service_in.name, owner_id)
 
-        return self.repo.create(service_in=service_in, owner_id=owner_id)
+        service = self.repo.create(service_in=service_in, owner_id=owner_id)
+        catalog_cache.bump()
+        return service
 
     def update(
         self, service_id: str, service_in: ServiceUpdate, current_user_id: str
@@ -45,7 +108,10 @@ class ServiceManager:
         if service.owner_id != current_user_id:
             raise UnauthorizedServiceAccessException(service_id)
 
-        return self.repo.update(service_id=service_id, service_in=service_in)
+        service = self.repo.update(service_id=service_id, service_in=service_in)
+        invalidate_pricing(service_id)
+        catalog_cache.bump()
+        return service
 
     def delete(self, service_id: str, current_user_id: str) -> None:
         service = self.repo.get(service_id)
@@ -56,4 +122,6 @@ class ServiceManager:
         if service.owner_id != current_user_id:
             raise UnauthorizedServiceAccessException(service_id)
 
-        return self.repo.delete(service_id)
+        self.repo.delete(service_id)
+        invalidate_pricing(service_id)
+        catalog_cache.bump()
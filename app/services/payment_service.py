@@ -1,5 +1,7 @@
+import logging
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode, quote
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from decimal import Decimal
 from app.repositories.payment_repository import PaymentRepository
 from app.repositories.booking_repository import BookingRepository
@@ -15,25 +17,39 @@ from app.schemas.payment import (
     PaymentMethod,
 )
 from app.config import settings
+from app.database import release_connection
 from sqlmodel import Session
 from app.exceptions.payment_exceptions import (
+    PaymentCheckoutConflictException,
     PaymentNotFoundException,
     UnauthorizedPaymentAccessException,
 )
 from app.services.solana_service import verify_payment
 from app.models.payment import Payment, PaymentProvider
+from app.utils.etags import collection_etag, resource_etag
+
+logger = logging.getLogger(__name__)
 
 
 class PaymentService:
     def __init__(self, session: Session):
+        self.session = session
         self.repo = PaymentRepository(session)
         self.booking_repo = BookingRepository(session)
         self.service_repo = ServiceRepository(session)
 
 
-    def verify_payment_status(self, payment_id: str):
-        payment_data = self.repo.get(payment_id=payment_id)
+    def verify_payment_status(self, payment_id: str, payment_data: Optional[Payment] = None):
+        if payment_data is None:
+            payment_data = self.repo.get(payment_id=payment_id)
 
+        if self._settle_if_paid(payment_id, payment_data):
+            return self.repo.get(payment_id=payment_id)
+
+        return payment_data
+
+    def _settle_if_paid(self, payment_id: str, payment_data) -> bool:
+        """Check the payment on chain and settle it if it landed"""
         ref = payment_data.external_id
 
         status = False
@@ -45,37 +61,132 @@ class PaymentService:
         except Exception as e:
             raise Exception(e)
 
-        if status:
-            payment_data.status = PaymentStatus.SUCCEEDED
+        if not status:
+            return False
 
-            meta = payment_data.payment_metadata or {}
-            meta['signature'] = signature
+        meta = dict(payment_data.payment_metadata or {})
+        meta['signature'] = signature
 
-            self.repo.update(
-                payment_id=payment_id,
-                payment_in=PaymentUpdate(
-                    status=payment_data.status,
-                    payment_metadata=meta
-                )
-            )
+        # Only an open payment is settled, so a concurrent check or a
+        # refund in between is never overwritten
+        return self.repo.settle(payment_id=payment_id, payment_metadata=meta)
 
-        
     def get(self, payment_id: str) -> Payment:
-        self.verify_payment_status(payment_id)
         payment_data = self.repo.get(payment_id=payment_id)
 
         if not payment_data:
             raise PaymentNotFoundException(payment_id)
 
-        return payment_data
+        # Don't hold a pooled connection through the RPC round trips
+        release_connection(self.session)
+        return self.verify_payment_status(payment_id, payment_data)
+
+    def reconcile_open(self, batch_size: int) -> int:
+        """
+        Check open payments on chain and settle the verified ones, returning
+        how many were checked. Payments past PAYMENT_PENDING_TTL_SECONDS are
+        left to the expiry sweep, which checks them once more before
+        cancelling, so the set scanned here stays bounded.
+
+        Each batch is read in a short transaction and checked with no
+        connection held and nothing locked; a verified payment is settled
+        by a conditional UPDATE, so a request settling it first wins.
+        """
+        checked = 0
+        after_id = None
+        while True:
+            payments = self.repo.list_open(
+                batch_size, after_id=after_id, created_after=self._pending_cutoff()
+            )
+            release_connection(self.session)
+            for payment in payments:
+                try:
+                    self.verify_payment_status(payment.id, payment)
+                except Exception:
+                    logger.warning("Could not verify payment %s", payment.id, exc_info=True)
+            checked += len(payments)
+            if len(payments) < batch_size:
+                return checked
+            after_id = payments[-1].id
+
+    def expire_stale(self) -> int:
+        """
+        Cancel open payments older than PAYMENT_PENDING_TTL_SECONDS, after a
+        last on-chain check so a transfer that landed late is settled
+        rather than cancelled. Payments whose check fails stay open for the
+        next sweep.
+        """
+        cutoff = self._pending_cutoff()
+        batch_size = settings.EXPIRY_SWEEP_BATCH_SIZE
+        expired = 0
+        after_id = None
+        while True:
+            payments = self.repo.list_open(
+                batch_size, after_id=after_id, created_before=cutoff
+            )
+            release_connection(self.session)
+            unpaid = []
+            for payment in payments:
+                try:
+                    if not self._settle_if_paid(payment.id, payment):
+                        unpaid.append(payment.id)
+                except Exception:
+                    logger.warning("Could not verify payment %s", payment.id, exc_info=True)
+            expired += len(self.repo.cancel_open(unpaid))
+            if len(payments) < batch_size:
+                return expired
+            after_id = payments[-1].id
+
+    def _pending_cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(
+            seconds=settings.PAYMENT_PENDING_TTL_SECONDS
+        )
+
+    def get_etag(self, payment_id: str) -> Optional[str]:
+        """
+        ETag of a settled payment, or None while it is still pending, since
+        reading a pending payment re-checks it on chain.
+        """
+        version = self.repo.get_version(payment_id=payment_id)
+
+        if not version:
+            raise PaymentNotFoundException(payment_id)
+
+        version_id, status, updated_at = version
+        if status in (PaymentStatus.PENDING, PaymentStatus.PROCESSING):
+            return None
+
+        return resource_etag(version_id, updated_at)
+
+    def list_etag(
+        self,
+        booking_id: Optional[str] = None,
+        reference_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> str:
+        return collection_etag(
+            *self.repo.list_version(
+                booking_id=booking_id, reference_id=reference_id, user_id=user_id
+            ),
+            fields=fields,
+        )
 
     def list_payments(
         self,
         booking_id: Optional[str] = None,
         reference_id: Optional[str] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[Payment]:
-        return self.repo.list_payments(user_id=user_id, booking_id=booking_id, reference_id=reference_id)
+        payments = self.repo.list_payments(
+            user_id=user_id,
+            booking_id=booking_id,
+            reference_id=reference_id,
+            fields=fields,
+        )
+        release_connection(self.session)
+        return payments
 
     def get_payment_provider(self, method: PaymentMethod):
         if method == PaymentMethod.MANDEL_COIN:
@@ -137,11 +248,6 @@ class PaymentService:
             amount = booking.total_price or 0
             currency = booking.service.currency
 
-            # Check for existing payments
-            payments = self.repo.list_payments(booking_id=resolved_booking_id)
-            if payments and not payment_in.force_add:
-                return payments[0]
-
         # Case 2: Custom reference-based payment
         elif payment_in.reference_id:
             amount = Decimal(payment_in.amount)
@@ -171,7 +277,18 @@ class PaymentService:
             reference_type=payment_in.reference_type,
         )
 
-        # Save payment
+        # Save payment, reusing the booking's active payment unless forced
+        if payment_in.booking_id:
+            payment = self.repo.get_or_create_for_booking(
+                payment_in=payment_data,
+                booking_id=payment_in.booking_id,
+                user_id=user_id,
+                force=payment_in.force_add,
+            )
+            if payment is None:
+                raise PaymentCheckoutConflictException(payment_in.booking_id)
+            return payment
+
         payment_created = self.repo.create(
             payment_in=payment_data,
             booking_id=payment_in.booking_id,  # Optional,
@@ -0,0 +1,295 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from decimal import Decimal, ROUND_HALF_UP
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
+from fastapi import HTTPException
+from app.config import settings
+from app.models.service import (
+    Service,
+    PricingTier,
+    PricingType,
+    Variant,
+    VariantType,
+)
+from app.schemas.pricing import PriceBreakdown, PriceBreakdownLine, VariantSelections
+from app.exceptions.booking_exception import (
+    BookingInvalidDurationException,
+    BookingDuplicateVariantOptionException,
+    BookingInvalidVariantException,
+    BookingSingleVariantException,
+    BookingUnknownVariantOptionException,
+    BookingVariantRequiredException,
+)
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0")
+
+
+def _to_decimal(value) -> Decimal:
+    if value is None:
+        return ZERO
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class CompiledPricing:
+    """
+    Pricing rules of a single service, flattened for repeated lookups.
+
+    Tiers are sorted by duration so the rate for any duration is a binary
+    search: the tier with the largest ``duration`` not exceeding the booked
+    duration sets the unit price, shorter bookings fall back to
+    ``base_price``. Variant options are indexed by name and add their
+    ``price_change`` once per booking.
+    """
+
+    __slots__ = (
+        "service_id",
+        "version",
+        "pricing_model",
+        "currency",
+        "base_price",
+        "tier_durations",
+        "tier_rates",
+        "variant_types",
+        "options",
+        "required_variants",
+    )
+
+    def __init__(self, service: Service):
+        self.service_id = service.id
+        self.version = service.updated_at
+        self.pricing_model = PricingType(service.pricing_model or PricingType.FLAT)
+        self.currency = service.currency
+        self.base_price = _to_decimal(service.base_price)
+
+        tiers = sorted(
+            (PricingTier.model_validate(tier) for tier in service.pricing_tiers or []),
+            key=lambda tier: tier.duration,
+        )
+        self.tier_durations: Tuple[int, ...] = tuple(tier.duration for tier in tiers)
+        self.tier_rates: Tuple[Decimal, ...] = tuple(
+            self.base_price if tier.price is None else _to_decimal(tier.price)
+            for tier in tiers
+        )
+
+        self.variant_types: Dict[str, VariantType] = {}
+        self.options: Dict[str, Dict[str, Optional[Decimal]]] = {}
+        required = []
+        for variant in service.variants or []:
+            variant = Variant.model_validate(variant)
+            self.variant_types[variant.name] = variant.type
+            # Unavailable options are kept with a ``None`` price so they can be
+            # told apart from unknown ones.
+            self.options[variant.name] = {
+                option.name: (
+                    _to_decimal(option.price_change) if option.available else None
+                )
+                for option in variant.options
+            }
+            if variant.required:
+                required.append(variant.name)
+        self.required_variants: Tuple[str, ...] = tuple(required)
+
+    def unit_price(self, duration: Optional[int]) -> Tuple[Decimal, Optional[int]]:
+        """Return the unit price for ``duration`` and the tier that matched."""
+        if duration is None or not self.tier_durations:
+            return self.base_price, None
+
+        index = bisect_right(self.tier_durations, duration) - 1
+        if index < 0:
+            return self.base_price, None
+        return self.tier_rates[index], self.tier_durations[index]
+
+    def variant_lines(
+        self, selections: Optional[VariantSelections]
+    ) -> List[PriceBreakdownLine]:
+        selections = selections or {}
+        lines = []
+
+        for variant, chosen in selections.items():
+            options = self.options.get(variant)
+            if options is None:
+                raise BookingInvalidVariantException(variant)
+
+            chosen = [chosen] if isinstance(chosen, str) else list(chosen)
+            if len(chosen) > 1 and self.variant_types[variant] == VariantType.SINGLE:
+                raise BookingSingleVariantException(variant)
+
+            if len(set(chosen)) < len(chosen):
+                repeated = next(option for option in chosen if chosen.count(option) > 1)
+                raise BookingDuplicateVariantOptionException(variant, repeated)
+
+            for option in chosen:
+                if option not in options:
+                    raise BookingUnknownVariantOptionException(variant, option)
+                price_change = options[option]
+                if price_change is None:
+                    raise BookingInvalidVariantException(variant, option)
+                lines.append(
+                    PriceBreakdownLine(
+                        variant=variant, option=option, price_change=price_change
+                    )
+                )
+
+        for variant in self.required_variants:
+            if not selections.get(variant):
+                raise BookingVariantRequiredException(variant)
+
+        return lines
+
+    def quote(
+        self, duration: Optional[int], selections: Optional[VariantSelections] = None
+    ) -> PriceBreakdown:
+        if self.pricing_model == PricingType.TIME_BASED:
+            if not duration or duration <= 0:
+                raise BookingInvalidDurationException()
+            unit_price, tier_duration = self.unit_price(duration)
+        else:
+            unit_price, tier_duration = self.base_price, None
+
+        return self._breakdown(
+            duration, unit_price, tier_duration, self.variant_lines(selections)
+        )
+
+    def quote_many(
+        self, items: List[Tuple[Optional[int], Optional[VariantSelections]]]
+    ) -> List[Union[PriceBreakdown, HTTPException]]:
+        """
+        Price a batch of ``(duration, selections)`` pairs in one pass.
+
+        Distinct durations are sorted once and merged against the tier table,
+        and each distinct variant selection is resolved once, so a price grid
+        costs roughly ``len(durations) + len(selections)`` lookups. Invalid
+        items yield the exception instead of failing the whole batch.
+        """
+        rates: Dict[int, Tuple[Decimal, Optional[int]]] = {}
+        if self.pricing_model == PricingType.TIME_BASED:
+            index = -1
+            tier_count = len(self.tier_durations)
+            for duration in sorted(
+                {duration for duration, _ in items if duration and duration > 0}
+            ):
+                while (
+                    index + 1 < tier_count
+                    and self.tier_durations[index + 1] <= duration
+                ):
+                    index += 1
+                if index < 0:
+                    rates[duration] = (self.base_price, None)
+                else:
+                    rates[duration] = (
+                        self.tier_rates[index],
+                        self.tier_durations[index],
+                    )
+
+        resolved_lines: Dict[tuple, Union[List[PriceBreakdownLine], HTTPException]] = {}
+        results: List[Union[PriceBreakdown, HTTPException]] = []
+
+        for duration, selections in items:
+            # Same order as quote(): the duration is checked before variants
+            if self.pricing_model == PricingType.TIME_BASED:
+                if duration not in rates:
+                    results.append(BookingInvalidDurationException())
+                    continue
+                unit_price, tier_duration = rates[duration]
+            else:
+                unit_price, tier_duration = self.base_price, None
+
+            key = _selection_key(selections)
+            lines = resolved_lines.get(key)
+            if lines is None:
+                try:
+                    lines = self.variant_lines(selections)
+                except HTTPException as exc:
+                    lines = exc
+                resolved_lines[key] = lines
+            if isinstance(lines, HTTPException):
+                results.append(lines)
+                continue
+
+            results.append(self._breakdown(duration, unit_price, tier_duration, lines))
+
+        return results
+
+    def _breakdown(
+        self,
+        duration: Optional[int],
+        unit_price: Decimal,
+        tier_duration: Optional[int],
+        lines: List[PriceBreakdownLine],
+    ) -> PriceBreakdown:
+        if self.pricing_model == PricingType.TIME_BASED:
+            base_amount = unit_price * duration
+        else:
+            base_amount = unit_price
+        total = base_amount + sum((line.price_change for line in lines), ZERO)
+
+        return PriceBreakdown(
+            pricing_model=self.pricing_model,
+            currency=self.currency,
+            duration=duration,
+            unit_price=unit_price,
+            tier_duration=tier_duration,
+            base_amount=base_amount.quantize(CENT, rounding=ROUND_HALF_UP),
+            variants=lines,
+            total_price=total.quantize(CENT, rounding=ROUND_HALF_UP),
+        )
+
+
+def _selection_key(selections: Optional[VariantSelections]) -> tuple:
+    if not selections:
+        return ()
+    return tuple(
+        (variant, (chosen,) if isinstance(chosen, str) else tuple(chosen))
+        for variant, chosen in sorted(selections.items())
+    )
+
+
+class PricingCache:
+    """
+    LRU of compiled pricing keyed by service id.
+
+    Entries are also checked against the service's ``updated_at`` so an
+    update made through another machine is picked up without an explicit
+    invalidation.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, CompiledPricing]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, service: Service) -> CompiledPricing:
+        with self._lock:
+            compiled = self._entries.get(service.id)
+            if compiled is not None and compiled.version == service.updated_at:
+                self._entries.move_to_end(service.id)
+                return compiled
+
+        compiled = CompiledPricing(service)
+
+        with self._lock:
+            self._entries[service.id] = compiled
+            self._entries.move_to_end(service.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return compiled
+
+    def invalidate(self, service_id: str) -> None:
+        with self._lock:
+            self._entries.pop(service_id, None)
+
+
+pricing_cache = PricingCache(maxsize=settings.PRICING_CACHE_SIZE)
+
+
+def get_compiled_pricing(service: Service) -> CompiledPricing:
+    return pricing_cache.get(service)
+
+
+def invalidate_pricing(service_id: str) -> None:
+    pricing_cache.invalidate(service_id)
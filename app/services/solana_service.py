@@ -1,18 +1,36 @@
-from solana.rpc.api import Client
-from solders.pubkey import Pubkey
+from app.core.metrics import SOLANA_RPC, record_phase
+from app.core.tracing import span
 
-client = Client("https://api.mainnet-beta.solana.com")
+# The solana/solders stack takes a noticeable share of a cold start, so it
+# is imported, and the client built, on the first payment check.
+client = None
 
+
+def get_client():
+    global client
+    if client is None:
+        from solana.rpc.api import Client
+
+        client = Client("https://api.mainnet-beta.solana.com")
+    return client
+
+
+@record_phase(SOLANA_RPC)
 def verify_payment(reference_key: str, expected_amount: float = None, token_mint: str = None):
     """Verify SPL token payment using reference key"""
+    from solders.pubkey import Pubkey
+
+    client = get_client()
     reference_pubkey = Pubkey.from_string(reference_key)
 
-    sigs = client.get_signatures_for_address(reference_pubkey, limit=10)
+    with span("solana.get_signatures_for_address"):
+        sigs = client.get_signatures_for_address(reference_pubkey, limit=10)
     if not sigs.value:
         return False, "No transactions found"
 
     for sig_info in sigs.value:
-        tx = client.get_transaction(sig_info.signature, encoding="jsonParsed")
+        with span("solana.get_transaction"):
+            tx = client.get_transaction(sig_info.signature, encoding="jsonParsed")
         if not tx.value:
             continue
 
@@ -0,0 +1,140 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlmodel import Session
+from app.config import settings
+import httpx
+from app.core.webhooks import (
+    UnsafeDestinationError,
+    WebhookBatch,
+    WebhookSender,
+    public_address,
+)
+from app.database import release_connection
+from app.exceptions.webhook_exceptions import (
+    UnauthorizedWebhookAccessException,
+    WebhookNotFoundException,
+    WebhookUrlNotAllowedException,
+)
+from app.models.change_event import ChangeEvent
+from app.models.payment import PaymentStatus
+from app.models.webhook import WebhookSubscription
+from app.repositories.change_event_repository import ChangeEventRepository
+from app.repositories.webhook_repository import WebhookRepository
+from app.schemas.webhook import WebhookCreate
+
+# Outbox consumer name the delivery cursor is stored under
+CONSUMER = "webhooks"
+
+
+def event_type(event: ChangeEvent) -> Optional[str]:
+    """The webhook event a change is sent to the service owner as, if any"""
+    if event.entity == "booking" and event.action == "created":
+        return "booking.created"
+    if (
+        event.entity == "payment"
+        and event.status == PaymentStatus.SUCCEEDED.value
+        and event.status_changed
+    ):
+        return "payment.succeeded"
+    return None
+
+
+class WebhookService:
+    def __init__(self, session: Session):
+        self.repo = WebhookRepository(session)
+
+    def create(self, webhook_in: WebhookCreate, owner_id: str) -> WebhookSubscription:
+        url = str(webhook_in.url)
+        if webhook_in.url.scheme != "https" and not settings.DEBUG:
+            raise WebhookUrlNotAllowedException(url, "it must use https")
+        # Checked again on every delivery, in case the name is rebound
+        try:
+            public_address(httpx.URL(url))
+        except UnsafeDestinationError as exc:
+            raise WebhookUrlNotAllowedException(url, str(exc))
+        except OSError:
+            raise WebhookUrlNotAllowedException(url, "its host does not resolve")
+        return self.repo.create(owner_id=owner_id, url=url)
+
+    def list_by_owner(self, owner_id: str) -> List[WebhookSubscription]:
+        return self.repo.list_by_owner(owner_id=owner_id)
+
+    def delete(self, webhook_id: str, owner_id: str) -> None:
+        subscription = self.repo.get(webhook_id)
+        if not subscription:
+            raise WebhookNotFoundException(webhook_id)
+        if subscription.owner_id != owner_id:
+            raise UnauthorizedWebhookAccessException(webhook_id)
+        self.repo.delete(subscription)
+
+
+class WebhookDispatcher:
+    """
+    Send owners the booking and payment events written since the last run,
+    read from the change events outbox.
+
+    Each subscription's events go out in batches of WEBHOOK_BATCH_SIZE. The
+    cursor moves past a run's events once every batch was delivered, gave
+    up after its retries or ran past WEBHOOK_RUN_TIMEOUT_SECONDS, so a slow
+    or dead endpoint can't hold up everyone else for long.
+    """
+
+    def __init__(self, session: Session, sender: WebhookSender):
+        self.session = session
+        self.events = ChangeEventRepository(session)
+        self.repo = WebhookRepository(session)
+        self.sender = sender
+
+    async def dispatch(self) -> int:
+        """Returns the number of change events read."""
+        cursor, batches, read = await asyncio.to_thread(self._collect)
+        if batches:
+            await self.sender.deliver(
+                batches, timeout=settings.WEBHOOK_RUN_TIMEOUT_SECONDS
+            )
+        if read:
+            await asyncio.to_thread(self.events.save_cursor, CONSUMER, cursor)
+        return read
+
+    def _collect(self) -> Tuple[Optional[Tuple[int, int]], List[WebhookBatch], int]:
+        after = self.events.get_cursor(CONSUMER)
+        if after is None:
+            # First run: start at the newest event instead of replaying history
+            self.events.save_cursor(CONSUMER, self.events.latest_cursor())
+            return None, [], 0
+
+        rows = self.events.list_with_owners(after, settings.WEBHOOK_SCAN_LIMIT)
+        if not rows:
+            return None, [], 0
+
+        by_owner: Dict[str, List[dict]] = defaultdict(list)
+        for event, service_id, owner_id in rows:
+            kind = event_type(event)
+            if kind is None or owner_id is None:
+                continue
+            by_owner[owner_id].append(
+                {
+                    "id": f"{event.txid}.{event.id}",
+                    "type": kind,
+                    "entity_id": event.entity_id,
+                    "service_id": service_id,
+                    "status": event.status,
+                    "created_at": event.created_at.isoformat(),
+                }
+            )
+
+        size = settings.WEBHOOK_BATCH_SIZE
+        batches = [
+            WebhookBatch(
+                subscription.url, subscription.secret, events[start : start + size]
+            )
+            for subscription in self.repo.list_active_for_owners(by_owner)
+            for events in (by_owner[subscription.owner_id],)
+            for start in range(0, len(events), size)
+        ]
+        # Sending can take a while; don't hold a pooled connection through it
+        release_connection(self.session)
+
+        last = rows[-1][0]
+        return (last.txid, last.id), batches, len(rows)
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence
+from fastapi import Request, Response, status
+
+
+def _weak_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:27]}"'
+
+
+def resource_etag(resource_id: str, updated_at: Optional[datetime]) -> str:
+    """Weak ETag of a single resource, from ``(id, updated_at)``"""
+    return _weak_etag(resource_id, updated_at.isoformat() if updated_at else "")
+
+
+def collection_etag(
+    count: int,
+    max_updated_at: Optional[datetime],
+    fields: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Weak ETag of a list, from its size and newest ``updated_at``, and the
+    ``?fields=`` projection it was rendered with, so a client switching
+    projections doesn't get a 304 for a body it never received
+    """
+    parts = [count, max_updated_at.isoformat() if max_updated_at else ""]
+    if fields:
+        parts.append(",".join(sorted(fields)))
+    return _weak_etag(*parts)
+
+
+def items_etag(items: Iterable[Any], fields: Optional[Sequence[str]] = None) -> str:
+    """``collection_etag`` computed from rows that are already loaded"""
+    count = 0
+    newest = None
+    for item in items:
+        count += 1
+        if item.updated_at is not None and (newest is None or item.updated_at > newest):
+            newest = item.updated_at
+    return collection_etag(count, newest, fields)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,9 @@
+import hashlib
+import json
+from typing import Any
+
+
+def content_hash(data: Any) -> str:
+    """sha256 of the canonical (sorted, compact) JSON encoding of ``data``"""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
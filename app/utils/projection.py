@@ -0,0 +1,48 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict, create_model
+from app.exceptions.common_exceptions import InvalidFieldsException
+
+
+def parse_fields(
+    fields: Optional[str], response_model: Type[BaseModel]
+) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a ``?fields=a,b`` query value against ``response_model``.
+
+    Returns None when no projection was requested. ``id`` is always kept so
+    clients can address the rows they list.
+    """
+    if not fields:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = set(requested) - set(response_model.model_fields)
+    if unknown:
+        raise InvalidFieldsException(unknown)
+
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+def column_names(model: Any, fields: Iterable[str]) -> List[str]:
+    """The subset of ``fields`` that are mapped columns of ``model``."""
+    columns = model.__table__.columns
+    return [field for field in fields if field in columns]
+
+
+@lru_cache(maxsize=256)
+def projection_model(
+    response_model: Type[BaseModel], fields: Tuple[str, ...]
+) -> Type[BaseModel]:
+    """``response_model`` reduced to ``fields``, built once per combination"""
+    return create_model(
+        f"{response_model.__name__}Projection",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            field: (
+                response_model.model_fields[field].annotation,
+                response_model.model_fields[field],
+            )
+            for field in fields
+        },
+    )
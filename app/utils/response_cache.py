@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class _Build:
+    """A key's build lock and how many callers are using it"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.users = 0
+
+
+class ResponseCache:
+    """
+    LRU of serialized response bodies guarded by a version counter.
+
+    ``bump`` invalidates every entry at once. Entries also expire after
+    ``ttl_seconds`` so writes made by other processes, which cannot bump
+    this counter, show up within that window. Concurrent misses on the
+    same key are collapsed: one caller builds the entry while the others
+    wait for it.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self.version = 0
+        # key -> (version, expires_at, response)
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, CachedResponse]]" = (
+            OrderedDict()
+        )
+        self._building: Dict[Hashable, _Build] = {}
+        self._lock = Lock()
+
+    def bump(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def get_or_build(
+        self, key: Hashable, build: Callable[[], CachedResponse]
+    ) -> CachedResponse:
+        with self._lock:
+            cached = self._fresh(key)
+            if cached is not None:
+                return cached
+            building = self._building.get(key)
+            if building is None:
+                building = self._building[key] = _Build()
+            building.users += 1
+
+        try:
+            with building.lock:
+                return self._build(key, build)
+        finally:
+            with self._lock:
+                # Only the last caller out drops the lock, so a caller
+                # arriving meanwhile still queues behind the builder
+                building.users -= 1
+                if not building.users:
+                    del self._building[key]
+
+    def _build(
+        self, key: Hashable, build: Callable[[], CachedResponse]
+    ) -> CachedResponse:
+        with self._lock:
+            # Another caller may have built it while we waited
+            cached = self._fresh(key)
+            if cached is not None:
+                return cached
+            version = self.version
+
+        response = build()
+
+        with self._lock:
+            # Drop results computed from data a writer has since changed
+            if version == self.version:
+                self._entries[key] = (
+                    version,
+                    time.monotonic() + self.ttl,
+                    response,
+                )
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return response
+
+    def _fresh(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        version, expires_at, response = entry
+        if version != self.version or expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return response
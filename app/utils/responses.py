@@ -0,0 +1,77 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from app.config import settings
+from app.core.tracing import span
+from app.utils.projection import projection_model
+
+
+@lru_cache(maxsize=256)
+def list_adapter(response_model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[response_model])
+
+
+def list_json(
+    items: Sequence[Any],
+    response_model: Type[BaseModel],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> bytes:
+    """
+    Serialize ORM rows for a list route straight to JSON bytes.
+
+    Rows are validated once from their attributes by a cached TypeAdapter
+    and dumped by pydantic-core, skipping FastAPI's response_model
+    validation, ``jsonable_encoder`` and stdlib ``json`` passes. Decimal
+    and datetime values are encoded natively. With ``FAST_JSON_RESPONSES``
+    off, the validated rows go through ``jsonable_encoder`` and stdlib
+    ``json`` as FastAPI would.
+    """
+    if fields is not None:
+        response_model = projection_model(response_model, fields)
+
+    adapter = list_adapter(response_model)
+    with span("serialize_response", rows=len(items)):
+        validated = adapter.validate_python(items, from_attributes=True)
+
+        if not settings.FAST_JSON_RESPONSES:
+            return JSONResponse(content=jsonable_encoder(validated)).body
+
+        return adapter.dump_json(validated)
+
+
+def list_response(
+    items: Sequence[Any],
+    response_model: Type[BaseModel],
+    fields: Optional[Tuple[str, ...]] = None,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return json_response(
+        list_json(items, response_model, fields),
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def json_response(
+    body: bytes,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def next_page_headers(request: Request, cursor: Optional[str]) -> Dict[str, str]:
+    """A ``Link: rel="next"`` header for keyset-paginated lists, if one follows"""
+    if cursor is None:
+        return {}
+    url = request.url.include_query_params(after=cursor)
+    return {"Link": f'<{url}>; rel="next"'}
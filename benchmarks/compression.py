@@ -0,0 +1,118 @@
+"""
+Measure bytes saved against CPU spent for the response encodings offered
+by app.core.compression, on representative list payloads.
+
+    python -m benchmarks.compression --repeat 20
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import app.models  # noqa: F401  configures all mappers
+from app.core.compression import GZIP, ZSTD, _Compressor
+from app.models.service import Service
+from app.schemas.booking import BookingResponse
+from app.schemas.service import ServiceResponse
+from app.utils.responses import list_adapter
+from benchmarks.serialization import make_bookings
+
+
+def make_services(count: int):
+    now = datetime.now(timezone.utc)
+    return [
+        Service(
+            id=f"service-{index}",
+            name=f"Harbour tour {index}",
+            description="Guided tour around the old harbour and fish market. " * 4,
+            owner_id=f"owner-{index % 20}",
+            pricing_model="time_based",
+            currency="USD",
+            base_price=Decimal("30.00") + index,
+            time_unit="hour",
+            pricing_tiers=[
+                {"duration": 3, "price": "27.00"},
+                {"duration": 6, "price": "24.00"},
+            ],
+            variants=[
+                {
+                    "name": "group",
+                    "type": "single",
+                    "required": True,
+                    "options": [
+                        {"name": "private", "price_change": "40.00", "available": True},
+                        {"name": "shared", "price_change": "0", "available": True},
+                    ],
+                }
+            ],
+            attributes={"languages": ["en", "es", "de"], "meeting_point": "Pier 4"},
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def payloads():
+    bookings = list_adapter(BookingResponse)
+    services = list_adapter(ServiceResponse)
+    return {
+        "bookings_1000": bookings.dump_json(
+            bookings.validate_python(make_bookings(1000), from_attributes=True)
+        ),
+        "bookings_20": bookings.dump_json(
+            bookings.validate_python(make_bookings(20), from_attributes=True)
+        ),
+        "services_200": services.dump_json(
+            services.validate_python(make_services(200), from_attributes=True)
+        ),
+    }
+
+
+def measure(body: bytes, encoding: str, level: int, repeat: int) -> dict:
+    cpu = []
+    size = 0
+    for _ in range(repeat):
+        started = time.thread_time()
+        size = len(_Compressor(encoding, level).compress(body, final=True))
+        cpu.append(time.thread_time() - started)
+    cpu_ms = min(cpu) * 1000
+    return {
+        "encoding": encoding,
+        "level": level,
+        "bytes": size,
+        "ratio": round(len(body) / size, 2),
+        "saved_bytes": len(body) - size,
+        "cpu_ms": round(cpu_ms, 3),
+        "saved_kb_per_cpu_ms": round((len(body) - size) / 1024 / max(cpu_ms, 1e-6), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    report = {}
+    for name, body in payloads().items():
+        report[name] = {
+            "identity_bytes": len(body),
+            "results": [
+                measure(body, encoding, level, args.repeat)
+                for encoding, level in (
+                    (ZSTD, 1),
+                    (ZSTD, 3),
+                    (ZSTD, 9),
+                    (GZIP, 1),
+                    (GZIP, 6),
+                    (GZIP, 9),
+                )
+            ],
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Load-test app.main:app in-process with a weighted mix of user journeys.
+
+Requests go through httpx's ASGI transport, so the full middleware stack,
+routing and database work are measured without socket overhead. The
+Solana RPC client is replaced by a stub with a fixed latency. Seed data
+first with ``benchmarks.load.seed``; the report lists throughput and
+p50/p95/p99 latency per route as JSON.
+
+    python -m benchmarks.load.run --duration 30 --concurrency 32 --output before.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import httpx
+from jose import jwt
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.database import engine
+from app.main import app
+from app.models.booking import Booking
+from app.models.payment import Payment, PaymentStatus
+from app.models.service import Service
+from benchmarks.load.seed import PREFIX
+
+DEFAULT_MIX = "browse=60,book=15,pay=10,poll=15"
+
+
+class StubSolanaClient:
+    """Answers like an RPC node that has not seen the payment yet."""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+
+    def get_signatures_for_address(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return SimpleNamespace(value=[])
+
+    def get_transaction(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return SimpleNamespace(value=None)
+
+
+def install_solana_stub(latency_ms: float) -> None:
+    import app.services.solana_service as solana_service
+
+    solana_service.client = StubSolanaClient(latency_ms)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, status_code: int, seconds: float) -> None:
+        self.latencies[route].append(seconds * 1000)
+        # Random slots sometimes collide; a 409 is the expected answer then
+        if status_code >= 400 and status_code != 409:
+            self.errors[route] += 1
+
+
+class Journey:
+    """State shared by one virtual user's requests."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        data: dict,
+        rng: random.Random,
+    ):
+        self.client = client
+        self.recorder = recorder
+        self.data = data
+        self.rng = rng
+        self.user_id = rng.choice(data["users"])
+        token = jwt.encode(
+            {"user_id": self.user_id}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept-Encoding": "gzip, zstd",
+        }
+        # Seeded rows owned by this user, so pay and poll pass the ownership checks
+        self.bookings: List[str] = list(data["bookings"][self.user_id])
+        self.payments: List[str] = list(data["payments"].get(self.user_id, []))
+
+    async def request(
+        self, method: str, route: str, path: str, **kwargs
+    ) -> Optional[dict]:
+        started = time.perf_counter()
+        response = await self.client.request(
+            method, path, headers=self.headers, **kwargs
+        )
+        self.recorder.record(
+            f"{method} {route}", response.status_code, time.perf_counter() - started
+        )
+        if response.status_code < 300 and response.content:
+            return response.json()
+        return None
+
+    async def browse(self) -> None:
+        query = self.rng.choice([None, "tour", "class", "session"])
+        params = {"q": query} if query else None
+        await self.request("GET", "/api/services/", "/api/services/", params=params)
+        service_id = self.rng.choice(self.data["services"])
+        await self.request(
+            "GET", "/api/services/{service_id}", f"/api/services/{service_id}"
+        )
+
+    async def book(self) -> None:
+        scheduled_at = datetime.now(timezone.utc) + timedelta(
+            days=self.rng.randrange(30, 3650), minutes=self.rng.randrange(1440)
+        )
+        booking = await self.request(
+            "POST",
+            "/api/bookings/",
+            "/api/bookings/",
+            json={
+                "service_id": self.rng.choice(self.data["services"]),
+                "scheduled_at": scheduled_at.isoformat(),
+                "duration": self.rng.randrange(1, 6),
+            },
+        )
+        if booking:
+            self.bookings.append(booking["id"])
+
+    async def pay(self) -> None:
+        if not self.bookings:
+            return
+        booking_id = self.bookings.pop()
+        payment = await self.request(
+            "POST",
+            "/api/payments/",
+            "/api/payments/",
+            json={"booking_id": booking_id, "payment_method": "mandel_coin"},
+        )
+        if payment:
+            self.payments.append(payment["id"])
+
+    async def poll(self) -> None:
+        if not self.payments:
+            return
+        payment_id = self.rng.choice(self.payments)
+        await self.request(
+            "GET", "/api/payments/{payment_id}", f"/api/payments/{payment_id}"
+        )
+
+
+def load_seed_data(limit: int = 20000) -> dict:
+    with Session(engine) as session:
+        services = session.exec(
+            select(Service.id).where(Service.id.like(f"{PREFIX}%"))
+        ).all()
+        bookings = session.exec(
+            select(Booking.id, Booking.user_id)
+            .where(Booking.id.like(f"{PREFIX}%"))
+            .limit(limit)
+        ).all()
+        payments = session.exec(
+            select(Payment.id, Payment.user_id)
+            .where(
+                Payment.id.like(f"{PREFIX}%"), Payment.status == PaymentStatus.PENDING
+            )
+            .limit(limit)
+        ).all()
+
+    if not services or not bookings:
+        raise SystemExit(
+            "No benchmark data found; run python -m benchmarks.load.seed first"
+        )
+
+    bookings_by_user = defaultdict(list)
+    for booking_id, user_id in bookings:
+        bookings_by_user[user_id].append(booking_id)
+    payments_by_user = defaultdict(list)
+    for payment_id, user_id in payments:
+        payments_by_user[user_id].append(payment_id)
+
+    return {
+        "services": list(services),
+        "users": sorted(bookings_by_user),
+        "bookings": bookings_by_user,
+        "payments": payments_by_user,
+    }
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("browse", "book", "pay", "poll"):
+            raise SystemExit(f"Unknown journey {name!r}")
+        weights[name] = int(weight)
+    return weights
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    routes = {}
+    total = 0
+    for route, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        total += len(latencies)
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[route],
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+    return {
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "routes": routes,
+    }
+
+
+async def run(
+    duration: float, concurrency: int, mix: Dict[str, int], seed: int
+) -> dict:
+    data = load_seed_data()
+    recorder = Recorder()
+    journeys = list(mix)
+    weights = [mix[name] for name in journeys]
+    deadline = time.perf_counter() + duration
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def virtual_user(index: int) -> None:
+            rng = random.Random(seed + index)
+            journey = Journey(client, recorder, data, rng)
+            while time.perf_counter() < deadline:
+                name = rng.choices(journeys, weights)[0]
+                await getattr(journey, name)()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(recorder, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="journey weights")
+    parser.add_argument("--rpc-latency-ms", type=float, default=80)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here as well")
+    args = parser.parse_args()
+
+    engine.echo = False
+    install_solana_stub(args.rpc_latency_ms)
+    report = asyncio.run(
+        run(args.duration, args.concurrency, parse_mix(args.mix), args.seed)
+    )
+    report["config"] = {
+        "concurrency": args.concurrency,
+        "mix": parse_mix(args.mix),
+        "rpc_latency_ms": args.rpc_latency_ms,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Compare FastAPI's default response_model serialization with the fast
+TypeAdapter path used by list routes (app.utils.responses.list_response).
+
+Runs entirely in memory; no database is needed, but app settings are still
+read from the environment / .env.
+
+    python -m benchmarks.serialization --rows 1000 --repeat 50
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.models  # noqa: F401  configures all mappers
+from app.models.booking import Booking
+from app.models.service_snapshot import ServiceSnapshot
+from app.schemas.booking import BookingResponse
+from app.utils.responses import list_response
+
+
+def make_bookings(count: int) -> List[Booking]:
+    snapshot = ServiceSnapshot(
+        hash="0" * 64,
+        service_id="service-1",
+        snapshot={
+            "id": "service-1",
+            "name": "Sunset kayak tour",
+            "description": "Two hours along the coast with a local guide. " * 6,
+            "pricing_model": "time_based",
+            "currency": "USD",
+            "base_price": "45.00",
+            "attributes": {
+                "amenities": ["life vest", "dry bag", "water"],
+                "level": "easy",
+            },
+        },
+    )
+    now = datetime.now(timezone.utc)
+    bookings = []
+    for index in range(count):
+        booking = Booking(
+            id=f"booking-{index}",
+            service_id="service-1",
+            user_id="user-1",
+            service_snapshot_hash=snapshot.hash,
+            scheduled_at=now + timedelta(hours=index),
+            duration=2,
+            base_price=Decimal("45.00"),
+            total_price=Decimal("90.00"),
+            attributes={"guests": 2, "notes": "window seat"},
+            price_breakdown={
+                "pricing_model": "time_based",
+                "currency": "USD",
+                "duration": 2,
+                "unit_price": "45.00",
+                "base_amount": "90.00",
+                "variants": [],
+                "total_price": "90.00",
+            },
+        )
+        booking.snapshot = snapshot
+        bookings.append(booking)
+    return bookings
+
+
+def build_app(bookings: List[Booking]) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/default", response_model=List[BookingResponse])
+    def default():
+        return bookings
+
+    @bench.get("/fast", response_model=List[BookingResponse])
+    def fast():
+        return list_response(bookings, BookingResponse)
+
+    return bench
+
+
+def measure(client: TestClient, path: str, repeat: int) -> dict:
+    client.get(path)  # warm up schema and adapter caches
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(response.content)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    client = TestClient(build_app(make_bookings(args.rows)))
+    default = measure(client, "/default", args.repeat)
+    fast = measure(client, "/fast", args.repeat)
+
+    assert json.loads(client.get("/default").content) == json.loads(
+        client.get("/fast").content
+    ), "fast path must produce the same payload"
+
+    print(
+        json.dumps(
+            {
+                "rows": args.rows,
+                "default": default,
+                "fast": fast,
+                "speedup": round(default["median_ms"] / fast["median_ms"], 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measure time to first response of a freshly started server, the latency
+a user sees when a scaled-to-zero machine wakes up.
+
+Each run starts uvicorn in a new process and polls GET / until it
+answers; the report also includes the import profile of app.main. Exits
+non-zero when the median exceeds --target-ms.
+
+    python -m benchmarks.startup --runs 5 --target-ms 2000
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.core.startup import import_profile
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(timeout: float) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            except httpx.TransportError:
+                if server.poll() is not None:
+                    raise SystemExit(f"Server exited with code {server.returncode}")
+                time.sleep(0.005)
+                continue
+            if response.status_code == 200:
+                return (time.perf_counter() - started) * 1000
+        raise SystemExit(f"No response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=2000)
+    parser.add_argument("--timeout", type=float, default=30, help="seconds per run")
+    parser.add_argument(
+        "--top", type=int, default=10, help="packages in the import profile"
+    )
+    args = parser.parse_args()
+
+    timings = [time_to_first_response(args.timeout) for _ in range(args.runs)]
+    profile = import_profile("app.main")
+    median = statistics.median(timings)
+
+    print(
+        json.dumps(
+            {
+                "runs_ms": [round(ms, 1) for ms in timings],
+                "median_ms": round(median, 1),
+                "target_ms": args.target_ms,
+                "import_ms": round(sum(profile.values()), 1),
+                "import_packages_ms": {
+                    package: round(ms, 1)
+                    for package, ms in list(profile.items())[: args.top]
+                },
+            },
+            indent=2,
+        )
+    )
+    if median > args.target_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
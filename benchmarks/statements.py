@@ -0,0 +1,114 @@
+"""
+Compare building a lookup statement per call with the module-level
+statements the repositories execute (e.g. _GET_SERVICE).
+
+By default only the Python side is timed: constructing the statement and
+generating the cache key SQLAlchemy looks its compiled form up by. With
+--execute, whole lookups also run against DATABASE_URL.
+
+    python -m benchmarks.statements --repeat 20000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+from sqlalchemy import and_, exists
+from sqlalchemy.orm import joinedload
+from sqlmodel import Session, select
+
+import app.models  # noqa: F401  configures all mappers
+from app.models.booking import Booking, BookingStatus
+from app.models.payment import Payment
+from app.models.service import Service
+from app.repositories import booking_repository, payment_repository, service_repository
+
+LOOKUP_ID = "benchmark-missing-id"
+NOW = datetime.now(timezone.utc)
+
+
+def inline_statements() -> Dict[str, Callable]:
+    """The statements as the repositories used to build them on every call"""
+
+    def booking_conflict():
+        return select(
+            exists().where(
+                and_(
+                    Booking.user_id == LOOKUP_ID,
+                    Booking.service_id == LOOKUP_ID,
+                    Booking.scheduled_at == NOW,
+                    Booking.status != BookingStatus.CANCELLED,
+                )
+            )
+        )
+
+    return {
+        "service.get": lambda: select(Service).where(Service.id == LOOKUP_ID),
+        "booking.get": lambda: select(Booking)
+        .where(Booking.id == LOOKUP_ID)
+        .options(joinedload(Booking.service)),
+        "payment.get": lambda: select(Payment).where(Payment.id == LOOKUP_ID),
+        "booking.check_booking_conflict": booking_conflict,
+    }
+
+
+CACHED_STATEMENTS = {
+    "service.get": (service_repository._GET_SERVICE, {"service_id": LOOKUP_ID}),
+    "booking.get": (booking_repository._GET_BOOKING, {"booking_id": LOOKUP_ID}),
+    "payment.get": (payment_repository._GET_PAYMENT, {"payment_id": LOOKUP_ID}),
+    "booking.check_booking_conflict": (
+        booking_repository._BOOKING_CONFLICT,
+        {"service_id": LOOKUP_ID, "user_id": LOOKUP_ID, "scheduled_at": NOW},
+    ),
+}
+
+
+def per_call_us(function: Callable, repeat: int) -> float:
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--execute", action="store_true", help="also time real lookups")
+    args = parser.parse_args()
+
+    report = {}
+    for name, build in inline_statements().items():
+        statement, params = CACHED_STATEMENTS[name]
+        inline = per_call_us(lambda: build()._generate_cache_key(), args.repeat)
+        cached = per_call_us(lambda: statement._generate_cache_key(), args.repeat)
+        report[name] = {
+            "inline_prepare_us": round(inline, 2),
+            "cached_prepare_us": round(cached, 2),
+        }
+
+    if args.execute:
+        from app.database import engine
+
+        engine.echo = False
+        repeat = max(1, args.repeat // 10)
+        with Session(engine) as session:
+            for name, build in inline_statements().items():
+                statement, params = CACHED_STATEMENTS[name]
+                report[name]["inline_execute_us"] = round(
+                    per_call_us(lambda: session.exec(build()).first(), repeat), 2
+                )
+                report[name]["cached_execute_us"] = round(
+                    per_call_us(
+                        lambda: session.exec(statement, params=params).first(), repeat
+                    ),
+                    2,
+                )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
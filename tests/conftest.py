@@ -0,0 +1,194 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from types import SimpleNamespace
+from typing import Iterator
+import pytest
+
+# The app reads its settings at import time, so point it at the test
+# database before anything from ``app`` is imported.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("SOLANA_DESTINATION_ADDRESS", "11111111111111111111111111111111")
+os.environ.setdefault("MANDEL_COIN_MINT_ADDRESS", "11111111111111111111111111111111")
+
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel
+from app.config import settings
+from app.core.profiling import QueryProfile, fetched_rows
+from app.database import engine
+from app.main import app
+from app.models.payment import Payment, PaymentStatus
+from app.services import solana_service
+from app.services.manage_service import catalog_cache
+
+_ids = count()
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Recreate the schema on the database named by ``TEST_DATABASE_URL``."""
+    if not TEST_DATABASE_URL:
+        # CI must run the budgets, not quietly skip them
+        if os.environ.get("CI"):
+            pytest.fail("TEST_DATABASE_URL must be set in CI")
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    engine.echo = False
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+
+
+class SolanaNode:
+    """
+    Stands in for the RPC node. Transfers land with ``pay``; a reference
+    nobody paid has no transactions.
+    """
+
+    def __init__(self):
+        self.transfers = {}
+
+    def pay(self, reference_key: str, amount) -> None:
+        self.transfers[f"sig-{reference_key}"] = amount
+
+    def get_signatures_for_address(self, reference, limit=10):
+        signature = f"sig-{reference}"
+        if signature not in self.transfers:
+            return SimpleNamespace(value=[])
+        return SimpleNamespace(value=[SimpleNamespace(signature=signature)])
+
+    def get_transaction(self, signature, encoding=None):
+        transfer = {
+            "type": "transferChecked",
+            "info": {
+                "tokenAmount": {"amount": str(int(self.transfers[signature] * 10**9))},
+                "mint": settings.MANDEL_COIN_MINT_ADDRESS,
+            },
+        }
+        message = SimpleNamespace(instructions=[SimpleNamespace(parsed=transfer)])
+        return SimpleNamespace(
+            value=SimpleNamespace(
+                transaction=SimpleNamespace(
+                    transaction=SimpleNamespace(message=message)
+                )
+            )
+        )
+
+
+@pytest.fixture(autouse=True)
+def solana_node() -> Iterator[SolanaNode]:
+    previous = solana_service.client
+    solana_service.client = node = SolanaNode()
+    yield node
+    solana_service.client = previous
+
+
+@pytest.fixture
+def session(database) -> Iterator[Session]:
+    with Session(database) as session:
+        yield session
+
+
+@pytest.fixture
+def client(database) -> TestClient:
+    catalog_cache.bump()
+    return TestClient(app)
+
+
+def auth_headers(user_id: str) -> dict:
+    token = jwt.encode(
+        {"user_id": user_id}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def query_budget(statements: int, rows: int = None) -> Iterator[QueryProfile]:
+    """
+    Fail when the block runs more than ``statements`` SQL statements or
+    fetches more than ``rows`` rows.
+
+    Statements are counted on the engine rather than per request, because
+    TestClient serves requests from its own thread.
+    """
+    profile = QueryProfile()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        profile.record(statement, 0.0, fetched_rows(cursor))
+
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        yield profile
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+    executed = "\n".join(
+        f"  {stats.count}x {statement}"
+        for statement, stats in profile.statements.items()
+    )
+    assert (
+        profile.count <= statements
+    ), f"{profile.count} statements, budget is {statements}:\n{executed}"
+    if rows is not None:
+        assert profile.rows <= rows, f"{profile.rows} rows fetched, budget is {rows}"
+
+
+OWNER_ID = "owner-1"
+CUSTOMER_ID = "customer-1"
+
+
+@pytest.fixture
+def service(client) -> dict:
+    response = client.post(
+        "/api/services/",
+        json={
+            "name": f"Service {next(_ids)}",
+            "pricing_model": "flat",
+            "currency": "USD",
+            "base_price": "25.00",
+        },
+        headers=auth_headers(OWNER_ID),
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def booking(client, service) -> dict:
+    scheduled_at = datetime.now(timezone.utc) + timedelta(days=next(_ids))
+    response = client.post(
+        "/api/bookings/",
+        json={
+            "service_id": service["id"],
+            "scheduled_at": scheduled_at.isoformat(),
+            "duration": 1,
+        },
+        headers=auth_headers(CUSTOMER_ID),
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def payment(client, session, booking) -> dict:
+    """A settled payment"""
+    response = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=auth_headers(CUSTOMER_ID),
+    )
+    assert response.status_code == 201, response.text
+
+    payment = session.get(Payment, response.json()["id"])
+    payment.status = PaymentStatus.SUCCEEDED
+    session.add(payment)
+    session.commit()
+    return response.json()
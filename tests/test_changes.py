@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from sqlmodel import select
+from conftest import CUSTOMER_ID, OWNER_ID, auth_headers
+from app.models.change_event import ChangeEvent
+from app.repositories.change_event_repository import ChangeEventRepository
+
+CUSTOMER = auth_headers(CUSTOMER_ID)
+
+
+def _feed(client, since=None, headers=CUSTOMER):
+    params = {"since": since} if since else {}
+    response = client.get("/api/changes/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_feed_returns_only_new_events_in_order(client, booking):
+    cursor = _feed(client)["next_cursor"]
+    while True:
+        page = _feed(client, cursor)
+        if not page["events"]:
+            break
+        cursor = page["next_cursor"]
+
+    client.patch(
+        f"/api/bookings/{booking['id']}",
+        json={"attributes": {"note": "x"}},
+        headers=CUSTOMER,
+    )
+    payment = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=CUSTOMER,
+    ).json()
+
+    page = _feed(client, cursor)
+    assert [
+        (event["entity"], event["entity_id"], event["action"])
+        for event in page["events"]
+    ] == [
+        ("booking", booking["id"], "updated"),
+        ("payment", payment["id"], "created"),
+    ]
+    assert _feed(client, page["next_cursor"])["events"] == []
+
+
+def test_feed_is_per_user(client, booking):
+    events = _feed(client, headers=auth_headers(OWNER_ID))["events"]
+    assert booking["id"] not in {event["entity_id"] for event in events}
+
+
+def test_invalid_cursor(client, database):
+    response = client.get("/api/changes/", params={"since": "nope"}, headers=CUSTOMER)
+    assert response.status_code == 400
+
+
+def test_purge_keeps_recent_and_unread_events(client, session, booking):
+    for note in ("x", "y"):
+        client.patch(
+            f"/api/bookings/{booking['id']}",
+            json={"attributes": {"note": note}},
+            headers=CUSTOMER,
+        )
+    created, read, unread = session.exec(
+        select(ChangeEvent)
+        .where(ChangeEvent.entity_id == booking["id"])
+        .order_by(ChangeEvent.txid, ChangeEvent.id)
+    ).all()
+    long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    created.created_at = unread.created_at = long_ago
+    session.commit()
+
+    ChangeEventRepository(session).purge(
+        datetime.now(timezone.utc) - timedelta(days=7),
+        (read.txid, read.id),
+        batch_size=1000,
+    )
+
+    remaining = session.exec(
+        select(ChangeEvent.id).where(ChangeEvent.entity_id == booking["id"])
+    ).all()
+    # Old and read goes; recent, or old but not yet read by a consumer, stays
+    assert sorted(remaining) == sorted([read.id, unread.id])
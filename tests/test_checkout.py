@@ -0,0 +1,45 @@
+"""Concurrent checkouts of one booking converge on its active payment."""
+
+from decimal import Decimal
+from app.repositories.payment_repository import PaymentRepository
+from app.schemas.payment import PaymentCreate
+from conftest import CUSTOMER_ID, auth_headers
+
+CUSTOMER = auth_headers(CUSTOMER_ID)
+
+
+class _StaleResult:
+    """What the upsert yields when its snapshot predates the conflicting row"""
+
+    def first(self):
+        return None
+
+
+def _checkout(client, booking):
+    return client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=CUSTOMER,
+    )
+
+
+def test_checkout_falls_back_to_the_concurrently_created_payment(
+    client, session, booking, monkeypatch
+):
+    payment = _checkout(client, booking).json()
+    monkeypatch.setattr(session, "scalars", lambda statement: _StaleResult())
+
+    found = PaymentRepository(session).get_or_create_for_booking(
+        PaymentCreate(amount=Decimal("25.00")), booking["id"], CUSTOMER_ID
+    )
+    assert found.id == payment["id"]
+
+
+def test_checkout_conflicts_when_the_active_payment_keeps_changing(
+    client, booking, monkeypatch
+):
+    monkeypatch.setattr(
+        PaymentRepository, "get_or_create_for_booking", lambda self, **kwargs: None
+    )
+    response = _checkout(client, booking)
+    assert response.status_code == 409
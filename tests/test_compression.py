@@ -0,0 +1,128 @@
+import gzip
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.core.compression import (
+    CompressionMiddleware,
+    negotiate_encoding,
+    skip_compression,
+)
+from conftest import CUSTOMER_ID, auth_headers
+
+BODY = "booking,status\n" * 200
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/skipped")
+    @skip_compression
+    def skipped():
+        return PlainTextResponse(BODY)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BODY, BODY]), media_type="text/csv")
+
+    return app
+
+
+@pytest.fixture(scope="module")
+def local_client() -> TestClient:
+    return TestClient(_app())
+
+
+def _raw(client: TestClient, path: str, accept_encoding: str):
+    """The response with its body as sent, before the client decodes it"""
+    with client.stream(
+        "GET", path, headers={"Accept-Encoding": accept_encoding}
+    ) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, zstd", "zstd"),
+        ("gzip", "gzip"),
+        ("zstd;q=0.5, gzip", "gzip"),
+        ("zstd;q=0, gzip", "gzip"),
+        ("zstd;q=0, gzip;q=0", None),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "gzip"),
+        ("br", None),
+        ("", None),
+    ],
+)
+def test_negotiation(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, decompress",
+    [
+        (
+            "zstd",
+            lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+        ),
+        ("gzip", gzip.decompress),
+    ],
+)
+def test_compressed_response_headers(local_client, accept_encoding, decompress):
+    response, body = _raw(local_client, "/large", accept_encoding)
+    assert response.headers["content-encoding"] == accept_encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    # The length of the compressed body, not of the original one
+    assert int(response.headers["content-length"]) == len(body) < len(BODY)
+    assert decompress(body).decode() == BODY
+
+
+def test_refused_encodings_are_not_used(local_client):
+    response, body = _raw(local_client, "/large", "zstd;q=0, gzip;q=0")
+    assert "content-encoding" not in response.headers
+    assert body.decode() == BODY
+
+
+def test_small_bodies_pass_through(local_client):
+    response, body = _raw(local_client, "/small", "zstd, gzip")
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == "2"
+    assert body == b"ok"
+
+
+def test_streamed_bodies_drop_the_content_length(local_client):
+    response, body = _raw(local_client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body).decode() == BODY * 2
+
+
+def test_skipped_endpoints_pass_through(local_client):
+    response, body = _raw(local_client, "/skipped", "zstd, gzip")
+    assert "content-encoding" not in response.headers
+    assert body.decode() == BODY
+
+
+@pytest.mark.parametrize("path", ["/api/bookings/export", "/api/payments/export"])
+def test_exports_are_sent_uncompressed(client, booking, path):
+    # Streamed, so they would be compressed from their first chunk on
+    with client.stream(
+        "GET",
+        path,
+        headers={**auth_headers(CUSTOMER_ID), "Accept-Encoding": "zstd, gzip"},
+    ) as response:
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert b"".join(response.iter_raw()).startswith(b"id,")
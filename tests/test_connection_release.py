@@ -0,0 +1,30 @@
+"""Requests hand their pooled connection back before slow non-database work."""
+
+import app.services.payment_service as payment_service
+from conftest import CUSTOMER_ID, auth_headers, query_budget
+from app.database import engine
+
+CUSTOMER = auth_headers(CUSTOMER_ID)
+
+
+def test_no_connection_held_during_payment_verification(client, booking, monkeypatch):
+    payment = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=CUSTOMER,
+    ).json()
+
+    checked_out = []
+
+    def verify_payment(reference_key, expected_amount=None, token_mint=None):
+        checked_out.append(engine.pool.checkedout())
+        return False, "No transactions found"
+
+    monkeypatch.setattr(payment_service, "verify_payment", verify_payment)
+
+    # Still one statement: the payment stays loaded after the release
+    with query_budget(statements=1):
+        response = client.get(f"/api/payments/{payment['id']}", headers=CUSTOMER)
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+    assert checked_out == [0]
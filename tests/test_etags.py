@@ -0,0 +1,18 @@
+from conftest import CUSTOMER_ID, auth_headers
+
+CUSTOMER = auth_headers(CUSTOMER_ID)
+
+
+def test_list_etag_depends_on_the_projection(client, booking):
+    projected = client.get("/api/bookings/?fields=status", headers=CUSTOMER)
+    etag = projected.headers["etag"]
+
+    # The full list was never sent, so the projected ETag can't validate it
+    full = client.get("/api/bookings/", headers={**CUSTOMER, "If-None-Match": etag})
+    assert full.status_code == 200
+    assert full.headers["etag"] != etag
+
+    again = client.get(
+        "/api/bookings/?fields=status,id", headers={**CUSTOMER, "If-None-Match": etag}
+    )
+    assert again.status_code == 304
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from conftest import CUSTOMER_ID, auth_headers
+from app.models.booking import Booking, BookingStatus
+from app.models.payment import Payment, PaymentStatus
+from app.services.booking_service import BookingService
+from app.services.payment_service import PaymentService
+
+LONG_AGO = datetime.now(timezone.utc) - timedelta(days=30)
+
+
+def _age(session, row) -> None:
+    row.created_at = LONG_AGO
+    session.add(row)
+    session.commit()
+
+
+def test_expire_stale_bookings(session, booking, service, client):
+    stale = session.get(Booking, booking["id"])
+    _age(session, stale)
+    fresh = client.post(
+        "/api/bookings/",
+        json={
+            "service_id": service["id"],
+            "scheduled_at": (
+                datetime.now(timezone.utc) + timedelta(days=400)
+            ).isoformat(),
+            "duration": 1,
+        },
+        headers=auth_headers(CUSTOMER_ID),
+    ).json()
+
+    assert BookingService(session).expire_stale() >= 1
+
+    session.expire_all()
+    assert session.get(Booking, booking["id"]).status == BookingStatus.CANCELLED
+    assert session.get(Booking, fresh["id"]).status == BookingStatus.PENDING
+
+
+def test_expire_keeps_paid_bookings(session, booking, client):
+    created = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=auth_headers(CUSTOMER_ID),
+    ).json()
+    payment = session.get(Payment, created["id"])
+    payment.status = PaymentStatus.SUCCEEDED
+    _age(session, session.get(Booking, booking["id"]))
+
+    BookingService(session).expire_stale()
+
+    session.expire_all()
+    assert session.get(Booking, booking["id"]).status == BookingStatus.PENDING
+
+
+def test_expire_stale_payments(session, booking, client):
+    created = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=auth_headers(CUSTOMER_ID),
+    ).json()
+    _age(session, session.get(Payment, created["id"]))
+
+    assert PaymentService(session).expire_stale() >= 1
+
+    session.expire_all()
+    assert session.get(Payment, created["id"]).status == PaymentStatus.CANCELLED
+
+
+def test_expire_settles_stale_payments_that_landed(
+    session, booking, client, solana_node
+):
+    created = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=auth_headers(CUSTOMER_ID),
+    ).json()
+    payment = session.get(Payment, created["id"])
+    _age(session, payment)
+    solana_node.pay(payment.external_id, payment.amount)
+
+    PaymentService(session).expire_stale()
+
+    session.expire_all()
+    assert session.get(Payment, created["id"]).status == PaymentStatus.SUCCEEDED
+
+
+def test_expire_stale_processing_payments(session, booking, client):
+    created = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=auth_headers(CUSTOMER_ID),
+    ).json()
+    payment = session.get(Payment, created["id"])
+    payment.status = PaymentStatus.PROCESSING
+    _age(session, payment)
+
+    assert PaymentService(session).expire_stale() >= 1
+
+    session.expire_all()
+    assert session.get(Payment, created["id"]).status == PaymentStatus.CANCELLED
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.services.idempotency_service import hash_request
+
+
+def test_unfinished_key_is_taken_over_once_its_lease_ran_out(session):
+    repo = IdempotencyRepository(session)
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=1)
+
+    assert repo.reserve(
+        "lease-test", "hash", expires_at, locked_until=now + timedelta(minutes=1)
+    )
+    # Still leased: a retry has to wait for the running request
+    assert not repo.reserve(
+        "lease-test", "hash", expires_at, locked_until=now + timedelta(minutes=1)
+    )
+
+    # The worker died and its lease ran out
+    repo.get("lease-test").locked_until = now - timedelta(seconds=1)
+    session.commit()
+    lease = now + timedelta(minutes=2)
+    assert repo.reserve("lease-test", "hash", expires_at, locked_until=lease)
+
+    assert repo.complete("lease-test", "hash", lease, 201, "{}")
+    session.expire_all()
+    record = repo.get("lease-test")
+    record.locked_until = now - timedelta(seconds=1)
+    session.commit()
+    # Finished responses are kept for replay whatever the lease
+    assert not repo.reserve(
+        "lease-test", "hash", expires_at, locked_until=now + timedelta(minutes=1)
+    )
+
+
+def test_taken_over_lease_is_not_completed_or_released(session):
+    repo = IdempotencyRepository(session)
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=1)
+    stale = now - timedelta(seconds=1)
+
+    assert repo.reserve("takeover-test", "hash", expires_at, locked_until=stale)
+    # The stale lease ran out and another request took the key over
+    current = now + timedelta(minutes=1)
+    assert repo.reserve("takeover-test", "hash", expires_at, locked_until=current)
+
+    # The slow first request must neither store its response nor drop the key
+    assert not repo.complete("takeover-test", "hash", stale, 500, "{}")
+    repo.release("takeover-test", "hash", stale)
+    session.expire_all()
+    record = repo.get("takeover-test")
+    assert record is not None and record.status_code is None
+
+    assert repo.complete("takeover-test", "hash", current, 201, "{}")
+    session.expire_all()
+    assert repo.get("takeover-test").status_code == 201
+
+
+def test_request_hash_encoding_is_stable():
+    class Payload(BaseModel):
+        booking_id: str
+        amount: str
+
+    # Hashes of keys already stored must keep matching their replays
+    assert hash_request(Payload(booking_id="b1", amount="10.00")) == (
+        "707de093bf65cd2670a365531b189ae9cb0a23541dea271410eeaeb41af41094"
+    )
@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from app.config import settings
+from app.core.metrics import Counter, RequestTimings, current_timings
+from app.core.profiling import install_query_profiler, profile_queries
+from app.database import engine
+from app.main import app
+
+
+@pytest.fixture
+def metrics_token(monkeypatch) -> str:
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    return "scrape-secret"
+
+
+def test_metrics_need_the_token(metrics_token):
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 401
+    assert (
+        client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code
+        == 401
+    )
+
+    response = client.get(
+        "/metrics", headers={"Authorization": f"Bearer {metrics_token}"}
+    )
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
+
+
+def test_metrics_closed_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    response = TestClient(app).get("/metrics", headers={"Authorization": "Bearer none"})
+    assert response.status_code == 401
+
+
+def test_counters_are_rendered_as_totals():
+    counter = Counter("test_events_total", "Events seen.", ("kind",))
+    counter.inc(("a",))
+    counter.inc(("a",), 2)
+    assert list(counter.render()) == [
+        "# HELP test_events_total Events seen.",
+        "# TYPE test_events_total counter",
+        'test_events_total{kind="a"} 3',
+    ]
+    with pytest.raises(ValueError):
+        counter.inc(("a",), -1)
+    with pytest.raises(ValueError):
+        Counter("test_events", "Events seen.", ("kind",))
+
+
+def test_failed_statements_leave_no_timing_behind(database):
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        with engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(ProgrammingError):
+                    connection.execute(text("SELECT * FROM no_such_table"))
+                connection.rollback()
+            before = dict(connection.info)
+            connection.execute(text("SELECT 1"))
+            assert dict(connection.info) == before
+    finally:
+        current_timings.reset(token)
+    assert timings.db is not None and timings.db < 1
+
+
+def test_profiler_and_metrics_share_statement_timing(database):
+    install_query_profiler(engine)
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        with profile_queries() as profile, engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    finally:
+        current_timings.reset(token)
+    assert profile.count >= 1
+    assert profile.seconds == timings.db
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+from conftest import CUSTOMER_ID, OWNER_ID, auth_headers
+
+OWNER = auth_headers(OWNER_ID)
+
+
+def _book(client, service, days) -> dict:
+    scheduled_at = datetime.now(timezone.utc) + timedelta(days=days)
+    response = client.post(
+        "/api/bookings/",
+        json={
+            "service_id": service["id"],
+            "scheduled_at": scheduled_at.isoformat(),
+            "duration": 1,
+        },
+        headers=auth_headers(CUSTOMER_ID),
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_service_bookings_paginate_in_scheduled_order(client, service):
+    booked = [_book(client, service, days) for days in (903, 901, 902)]
+
+    seen = []
+    url = f"/api/services/{service['id']}/bookings?limit=2&fields=scheduled_at"
+    while url:
+        response = client.get(url, headers=OWNER)
+        assert response.status_code == 200, response.text
+        seen.extend(response.json())
+        url = response.links.get("next", {}).get("url")
+
+    assert [booking["id"] for booking in seen] == [
+        booking["id"]
+        for booking in sorted(booked, key=lambda booking: booking["scheduled_at"])
+    ]
+
+
+def test_service_bookings_filters(client, service):
+    early, late = _book(client, service, 801), _book(client, service, 810)
+    client.delete(f"/api/bookings/{early['id']}", headers=auth_headers(CUSTOMER_ID))
+    middle = _book(client, service, 805)
+
+    response = client.get(
+        f"/api/services/{service['id']}/bookings",
+        params={"from": late["scheduled_at"], "status": "pending"},
+        headers=OWNER,
+    )
+    assert [booking["id"] for booking in response.json()] == [late["id"]]
+
+    response = client.get(
+        "/api/bookings/owned",
+        params={"to": late["scheduled_at"], "from": middle["scheduled_at"]},
+        headers=OWNER,
+    )
+    assert [booking["id"] for booking in response.json()] == [middle["id"]]
+
+
+def test_service_bookings_are_owner_only(client, booking):
+    response = client.get(
+        f"/api/services/{booking['service_id']}/bookings",
+        headers=auth_headers(CUSTOMER_ID),
+    )
+    assert response.status_code == 403
+
+
+def test_owned_bookings_merge_services_in_scheduled_order(client, service):
+    other = client.post(
+        "/api/services/",
+        json={
+            "name": "Second studio",
+            "pricing_model": "flat",
+            "currency": "USD",
+            "base_price": "5",
+        },
+        headers=OWNER,
+    ).json()
+    booked = [
+        _book(client, booked_service, days)
+        for booked_service, days in (
+            (service, 953),
+            (other, 951),
+            (other, 954),
+            (service, 952),
+        )
+    ]
+    window = {
+        "from": (datetime.now(timezone.utc) + timedelta(days=950)).isoformat(),
+        "to": (datetime.now(timezone.utc) + timedelta(days=960)).isoformat(),
+    }
+
+    seen = []
+    response = client.get(
+        "/api/bookings/owned", params={**window, "limit": 3}, headers=OWNER
+    )
+    while True:
+        assert response.status_code == 200, response.text
+        seen.extend(response.json())
+        url = response.links.get("next", {}).get("url")
+        if not url:
+            break
+        response = client.get(url, headers=OWNER)
+
+    assert [booking["id"] for booking in seen] == [
+        booking["id"]
+        for booking in sorted(booked, key=lambda booking: booking["scheduled_at"])
+    ]
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import pytest
+from app.exceptions.booking_exception import (
+    BookingDuplicateVariantOptionException,
+    BookingInvalidDurationException,
+    BookingInvalidVariantException,
+    BookingSingleVariantException,
+    BookingUnknownVariantOptionException,
+    BookingVariantRequiredException,
+)
+from app.models.service import Service
+from app.services.pricing_service import CompiledPricing, PricingCache
+
+
+def _service(**overrides) -> Service:
+    values = dict(
+        id="svc",
+        name="Studio",
+        owner_id="owner",
+        pricing_model="time_based",
+        currency="USD",
+        base_price=Decimal("10.00"),
+        pricing_tiers=[
+            {"duration": 4, "price": "8.00"},
+            {"duration": 2, "price": "9.00"},
+        ],
+        variants=[
+            {
+                "name": "size",
+                "type": "single",
+                "required": True,
+                "options": [
+                    {"name": "small", "price_change": "0"},
+                    {"name": "large", "price_change": "5.00"},
+                    {"name": "huge", "price_change": "9.00", "available": False},
+                ],
+            },
+            {
+                "name": "extras",
+                "type": "multiple",
+                "required": False,
+                "options": [
+                    {"name": "lights", "price_change": "2.50"},
+                    {"name": "mics", "price_change": "1.25"},
+                ],
+            },
+        ],
+    )
+    values.update(overrides)
+    return Service(**values)
+
+
+@pytest.mark.parametrize(
+    "duration, unit_price, tier_duration",
+    [
+        (1, Decimal("10.00"), None),
+        (2, Decimal("9.00"), 2),
+        (3, Decimal("9.00"), 2),
+        (4, Decimal("8.00"), 4),
+        (40, Decimal("8.00"), 4),
+    ],
+)
+def test_unit_price_uses_the_longest_tier_reached(duration, unit_price, tier_duration):
+    assert CompiledPricing(_service()).unit_price(duration) == (
+        unit_price,
+        tier_duration,
+    )
+
+
+def test_quote_adds_variant_options():
+    quote = CompiledPricing(_service()).quote(
+        3, {"size": "large", "extras": ["lights", "mics"]}
+    )
+    assert quote.base_amount == Decimal("27.00")
+    assert [line.option for line in quote.variants] == ["large", "lights", "mics"]
+    assert quote.total_price == Decimal("35.75")
+
+
+def test_quote_many_matches_quote():
+    pricing = CompiledPricing(_service())
+    items = [(duration, {"size": "small"}) for duration in (5, 1, 2, 3)]
+    assert pricing.quote_many(items) == [pricing.quote(*item) for item in items]
+
+
+@pytest.mark.parametrize(
+    "selections, exception",
+    [
+        ({"colour": "red"}, BookingInvalidVariantException),
+        ({"size": "medium"}, BookingUnknownVariantOptionException),
+        ({"size": "huge"}, BookingInvalidVariantException),
+        ({"size": ["small", "large"]}, BookingSingleVariantException),
+        (
+            {"size": "small", "extras": ["lights", "lights"]},
+            BookingDuplicateVariantOptionException,
+        ),
+        ({"extras": ["lights"]}, BookingVariantRequiredException),
+    ],
+)
+def test_invalid_selections(selections, exception):
+    with pytest.raises(exception):
+        CompiledPricing(_service()).quote(2, selections)
+
+
+def test_time_based_quote_needs_a_duration():
+    with pytest.raises(BookingInvalidDurationException):
+        CompiledPricing(_service()).quote(None, {"size": "small"})
+
+
+def test_quote_many_reports_errors_like_quote():
+    pricing = CompiledPricing(_service())
+    # Both the duration and the selection are invalid: the duration wins
+    [error] = pricing.quote_many([(None, {"colour": "red"})])
+    assert isinstance(error, BookingInvalidDurationException)
+    with pytest.raises(BookingInvalidDurationException):
+        pricing.quote(None, {"colour": "red"})
+
+
+def test_pricing_cache_recompiles_updated_services():
+    cache = PricingCache(maxsize=2)
+    service = _service()
+    compiled = cache.get(service)
+    assert cache.get(service) is compiled
+
+    service.updated_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+    assert cache.get(service) is not compiled
+
+
+def test_pricing_cache_invalidate_and_eviction():
+    cache = PricingCache(maxsize=2)
+    first, second, third = (_service(id=service_id) for service_id in ("a", "b", "c"))
+    compiled = cache.get(first)
+
+    cache.invalidate("a")
+    assert cache.get(first) is not compiled
+
+    # The least recently used service goes first
+    cache.get(second)
+    cache.get(first)
+    cache.get(third)
+    assert list(cache._entries) == ["a", "c"]
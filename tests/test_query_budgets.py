@@ -0,0 +1,253 @@
+"""
+SQL budgets for the API's routes.
+
+Each test makes one call and fails if it runs more statements, or
+fetches more rows, than its budget. A change that adds a round trip to
+a hot path has to raise the budget here on purpose.
+"""
+
+from datetime import datetime, timedelta, timezone
+from conftest import CUSTOMER_ID, OWNER_ID, auth_headers, query_budget
+
+OWNER = auth_headers(OWNER_ID)
+CUSTOMER = auth_headers(CUSTOMER_ID)
+
+
+# Services
+
+
+def test_list_services_cold(client, service):
+    with query_budget(statements=1):
+        response = client.get("/api/services/", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+def test_list_services_cached(client, service):
+    client.get("/api/services/", headers=CUSTOMER)
+    with query_budget(statements=0):
+        response = client.get("/api/services/", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+def test_list_my_services(client, service):
+    with query_budget(statements=1):
+        response = client.get("/api/services/my", headers=OWNER)
+    assert response.status_code == 200
+
+
+def test_get_service(client, service):
+    with query_budget(statements=1, rows=1):
+        response = client.get(f"/api/services/{service['id']}", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+def test_get_service_not_modified(client, service):
+    etag = client.get(f"/api/services/{service['id']}", headers=CUSTOMER).headers[
+        "etag"
+    ]
+    with query_budget(statements=1, rows=1):
+        response = client.get(
+            f"/api/services/{service['id']}",
+            headers={**CUSTOMER, "If-None-Match": etag},
+        )
+    assert response.status_code == 304
+
+
+def test_create_service(client):
+    with query_budget(statements=3):
+        response = client.post(
+            "/api/services/",
+            json={
+                "name": "New service",
+                "pricing_model": "flat",
+                "currency": "USD",
+                "base_price": "10",
+            },
+            headers=OWNER,
+        )
+    assert response.status_code == 201
+
+
+def test_update_service(client, service):
+    with query_budget(statements=4):
+        response = client.patch(
+            f"/api/services/{service['id']}", json={"base_price": "30"}, headers=OWNER
+        )
+    assert response.status_code == 200
+
+
+def test_delete_service(client, service):
+    with query_budget(statements=4):
+        response = client.delete(f"/api/services/{service['id']}", headers=OWNER)
+    assert response.status_code == 204
+
+
+def test_quote_service(client, service):
+    with query_budget(statements=1, rows=1):
+        response = client.post(
+            f"/api/services/{service['id']}/quotes",
+            json={"items": [{"duration": 1}, {"duration": 2}]},
+            headers=CUSTOMER,
+        )
+    assert response.status_code == 200
+
+
+# Bookings
+#
+# Each write also appends its change event, one INSERT more.
+
+
+def test_create_booking(client, service):
+    scheduled_at = datetime.now(timezone.utc) + timedelta(days=365)
+    with query_budget(statements=7):
+        response = client.post(
+            "/api/bookings/",
+            json={
+                "service_id": service["id"],
+                "scheduled_at": scheduled_at.isoformat(),
+                "duration": 1,
+            },
+            headers=CUSTOMER,
+        )
+    assert response.status_code == 201
+
+
+def test_create_booking_known_snapshot(client, booking):
+    # The service is unchanged since ``booking``, so its snapshot is reused
+    scheduled_at = datetime.now(timezone.utc) + timedelta(days=366)
+    with query_budget(statements=6):
+        response = client.post(
+            "/api/bookings/",
+            json={
+                "service_id": booking["service_id"],
+                "scheduled_at": scheduled_at.isoformat(),
+                "duration": 1,
+            },
+            headers=CUSTOMER,
+        )
+    assert response.status_code == 201
+    assert response.json()["service_snapshot"] == booking["service_snapshot"]
+
+
+def test_create_booking_conflict(client, booking):
+    with query_budget(statements=2):
+        response = client.post(
+            "/api/bookings/",
+            json={
+                "service_id": booking["service_id"],
+                "scheduled_at": booking["scheduled_at"],
+                "duration": 1,
+            },
+            headers=CUSTOMER,
+        )
+    assert response.status_code == 409
+
+
+def test_list_bookings(client, booking):
+    with query_budget(statements=2):
+        response = client.get("/api/bookings/", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+def test_list_bookings_projected(client, booking):
+    with query_budget(statements=1):
+        response = client.get(
+            "/api/bookings/?fields=status,total_price", headers=CUSTOMER
+        )
+    assert response.status_code == 200
+
+
+def test_get_booking(client, booking):
+    with query_budget(statements=2, rows=2):
+        response = client.get(f"/api/bookings/{booking['id']}", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+def test_update_booking(client, booking):
+    with query_budget(statements=6):
+        response = client.patch(
+            f"/api/bookings/{booking['id']}",
+            json={"attributes": {"note": "x"}},
+            headers=CUSTOMER,
+        )
+    assert response.status_code == 200
+
+
+def test_delete_booking(client, booking):
+    with query_budget(statements=5):
+        response = client.delete(f"/api/bookings/{booking['id']}", headers=CUSTOMER)
+    assert response.status_code == 204
+
+
+def test_list_service_bookings(client, booking):
+    # Ownership check, the page, its snapshots
+    with query_budget(statements=3):
+        response = client.get(
+            f"/api/services/{booking['service_id']}/bookings", headers=OWNER
+        )
+    assert response.status_code == 200
+
+
+def test_list_owned_bookings(client, booking):
+    with query_budget(statements=2):
+        response = client.get("/api/bookings/owned", headers=OWNER)
+    assert response.status_code == 200
+
+
+def test_export_bookings(client, booking):
+    with query_budget(statements=1):
+        response = client.get("/api/bookings/export", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+# Payments
+#
+# A new payment's change event is written by a CTE of its INSERT.
+
+
+def test_create_payment(client, booking):
+    with query_budget(statements=2):
+        response = client.post(
+            "/api/payments/",
+            json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+            headers=CUSTOMER,
+        )
+    assert response.status_code == 201
+
+
+def test_list_payments(client, payment):
+    with query_budget(statements=1):
+        response = client.get("/api/payments/", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+def test_create_payment_existing(client, payment):
+    with query_budget(statements=2):
+        response = client.post(
+            "/api/payments/",
+            json={"booking_id": payment["booking_id"], "payment_method": "mandel_coin"},
+            headers=CUSTOMER,
+        )
+    assert response.status_code == 201
+    assert response.json()["id"] == payment["id"]
+
+
+def test_get_payment(client, payment):
+    with query_budget(statements=1, rows=1):
+        response = client.get(f"/api/payments/{payment['id']}", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+def test_export_payments(client, payment):
+    with query_budget(statements=1):
+        response = client.get("/api/payments/export", headers=CUSTOMER)
+    assert response.status_code == 200
+
+
+# Change feed
+
+
+def test_changes(client, payment):
+    with query_budget(statements=1):
+        response = client.get("/api/changes/", headers=CUSTOMER)
+    assert response.status_code == 200
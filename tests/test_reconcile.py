@@ -0,0 +1,36 @@
+from conftest import CUSTOMER_ID, auth_headers
+from app.models.payment import Payment, PaymentStatus
+from app.repositories.payment_repository import PaymentRepository
+from app.services.payment_service import PaymentService
+
+
+def _pending_payment(client, session, booking) -> Payment:
+    created = client.post(
+        "/api/payments/",
+        json={"booking_id": booking["id"], "payment_method": "mandel_coin"},
+        headers=auth_headers(CUSTOMER_ID),
+    ).json()
+    return session.get(Payment, created["id"])
+
+
+def test_reconcile_settles_payments_that_landed(client, session, booking, solana_node):
+    payment = _pending_payment(client, session, booking)
+    solana_node.pay(payment.external_id, payment.amount)
+
+    assert PaymentService(session).reconcile_open(batch_size=1) >= 1
+
+    session.expire_all()
+    settled = session.get(Payment, payment.id)
+    assert settled.status == PaymentStatus.SUCCEEDED
+    assert settled.payment_metadata["signature"] == f"sig-{payment.external_id}"
+
+
+def test_settle_leaves_payments_that_are_no_longer_open(client, session, booking):
+    payment = _pending_payment(client, session, booking)
+    payment.status = PaymentStatus.CANCELLED
+    session.commit()
+
+    assert not PaymentRepository(session).settle(payment.id, {"signature": "late"})
+
+    session.expire_all()
+    assert session.get(Payment, payment.id).status == PaymentStatus.CANCELLED
@@ -0,0 +1,29 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.response_cache import CachedResponse, ResponseCache
+
+
+def test_concurrent_misses_build_once():
+    cache = ResponseCache(maxsize=8, ttl_seconds=60)
+    builds = []
+    started = threading.Event()
+
+    def build() -> CachedResponse:
+        builds.append(1)
+        started.set()
+        time.sleep(0.05)
+        return CachedResponse(b"[]", '"v1"')
+
+    def get(_) -> CachedResponse:
+        return cache.get_or_build("services", build)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        first = pool.submit(get, None)
+        started.wait()
+        # These arrive while the first build is still running
+        responses = list(pool.map(get, range(8)))
+
+    assert len(builds) == 1
+    assert {response.etag for response in responses} == {first.result().etag}
+    assert cache._building == {}
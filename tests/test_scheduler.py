@@ -0,0 +1,21 @@
+import asyncio
+from sqlalchemy import func
+from sqlmodel import select
+from app.core.scheduler import Job, Scheduler
+
+
+def test_job_skipped_while_another_machine_holds_its_lock(database):
+    calls = []
+    job = Job(
+        "test_job", lambda session: calls.append(session) or 1, interval_seconds=60
+    )
+    scheduler = Scheduler(database, [job])
+
+    with database.connect() as other_machine:
+        other_machine.execute(select(func.pg_advisory_lock(job.lock_key)))
+        assert asyncio.run(scheduler.run_once(job)) is None
+        other_machine.execute(select(func.pg_advisory_unlock(job.lock_key)))
+        other_machine.commit()
+
+    assert asyncio.run(scheduler.run_once(job)) == 1
+    assert len(calls) == 1
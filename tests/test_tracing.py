@@ -0,0 +1,74 @@
+import json
+from typing import Iterator
+import pytest
+from fastapi.testclient import TestClient
+from conftest import CUSTOMER_ID, auth_headers
+from app.core.tracing import (
+    InMemoryExporter,
+    OTLPFileExporter,
+    Span,
+    Trace,
+    TracingMiddleware,
+    install_tracing,
+    uninstall_tracing,
+)
+from app.main import app
+
+
+@pytest.fixture
+def exporter(database) -> Iterator[InMemoryExporter]:
+    install_tracing()
+    yield InMemoryExporter()
+    uninstall_tracing()
+
+
+def test_get_payment_spans(exporter, payment):
+    client = TestClient(TracingMiddleware(app, exporter=exporter))
+    response = client.get(
+        f"/api/payments/{payment['id']}", headers=auth_headers(CUSTOMER_ID)
+    )
+    assert response.status_code == 200
+
+    (trace,) = exporter.traces
+    spans = {span.name: span for span in trace.spans}
+    root = spans["GET /api/payments/{payment_id}"]
+    assert root.parent_id is None
+    assert root.attributes["http.status_code"] == 200
+    for name in (
+        "auth.jwt_decode",
+        "db.session_checkout",
+        "PaymentRepository.get",
+        "serialize_response",
+    ):
+        assert spans[name].trace is trace
+        assert spans[name].end_ns >= spans[name].start_ns
+    # The checkout happens inside the repository call that needed a connection
+    assert (
+        spans["db.session_checkout"].parent_id == spans["PaymentRepository.get"].span_id
+    )
+    # Serialization starts once the endpoint, and its repository calls, are done
+    assert spans["serialize_response"].start_ns >= spans["PaymentRepository.get"].end_ns
+
+
+def test_unsampled_requests_create_no_spans(exporter, payment):
+    client = TestClient(TracingMiddleware(app, exporter=exporter, sample_rate=0.0))
+    client.get(f"/api/payments/{payment['id']}", headers=auth_headers(CUSTOMER_ID))
+    assert exporter.traces == []
+
+
+def test_otlp_file_exporter_writes_in_background(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = OTLPFileExporter(str(path), "test")
+    traces = []
+    for _ in range(3):
+        trace = Trace()
+        Span(trace, "GET /", None).end()
+        exporter.export(trace)
+        traces.append(trace)
+    exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [
+        line["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"]
+        for line in lines
+    ] == [trace.trace_id for trace in traces]
@@ -0,0 +1,191 @@
+import asyncio
+import ipaddress
+import json
+from datetime import datetime, timedelta, timezone
+import httpx
+import pytest
+from conftest import CUSTOMER_ID, OWNER_ID, auth_headers
+from app.core import webhooks
+from app.core.webhooks import WebhookBatch, WebhookSender, sign
+from app.models.change_event import ChangeEvent
+from app.repositories.change_event_repository import ChangeEventRepository
+from app.services.webhook_service import CONSUMER, WebhookDispatcher, event_type
+
+
+PUBLIC_ADDRESS = "93.184.216.34"
+
+
+@pytest.fixture(autouse=True)
+def dns(monkeypatch):
+    """Resolves every name to PUBLIC_ADDRESS unless a test maps it"""
+    names = {}
+
+    def resolve_host(host, port):
+        try:
+            return [str(ipaddress.ip_address(host))]
+        except ValueError:
+            return [names.get(host, PUBLIC_ADDRESS)]
+
+    monkeypatch.setattr(webhooks, "resolve_host", resolve_host)
+    return names
+
+
+def _sender(handler, **options) -> WebhookSender:
+    options = {
+        "max_connections": 10,
+        "endpoint_concurrency": 2,
+        "max_attempts": 3,
+        "backoff_seconds": 0,
+        "timeout_seconds": 5,
+        **options,
+    }
+    return WebhookSender(transport=httpx.MockTransport(handler), **options)
+
+
+async def _deliver(sender, batches, timeout=None):
+    try:
+        return await sender.deliver(batches, timeout=timeout)
+    finally:
+        await sender.aclose()
+
+
+def test_sender_retries_and_signs():
+    responses = [503, 200]
+    received = []
+
+    def endpoint(request):
+        received.append(request)
+        return httpx.Response(responses.pop(0))
+
+    batch = WebhookBatch("https://hooks.test/a", "secret", [{"id": "1.1"}])
+    assert asyncio.run(_deliver(_sender(endpoint), [batch])) == (1, 0)
+
+    assert len(received) == 2
+    request = received[-1]
+    assert request.headers["X-Webhook-Signature"] == sign(
+        "secret", request.headers["X-Webhook-Timestamp"], request.content
+    )
+
+
+def test_sender_limits_concurrency_per_endpoint():
+    in_flight = {"now": 0, "most": 0}
+
+    async def endpoint(request):
+        in_flight["now"] += 1
+        in_flight["most"] = max(in_flight["most"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200)
+
+    batches = [
+        WebhookBatch("https://hooks.test/b", "secret", [{"id": str(i)}])
+        for i in range(6)
+    ]
+    assert asyncio.run(_deliver(_sender(endpoint), batches)) == (6, 0)
+    assert in_flight["most"] == 2
+
+
+def test_dispatch_sends_new_bookings_to_their_owner(client, session, service):
+    url = "https://hooks.test/owner"
+    created = client.post(
+        "/api/webhooks/", json={"url": url}, headers=auth_headers(OWNER_ID)
+    )
+    assert created.status_code == 201, created.text
+    events = ChangeEventRepository(session)
+    events.save_cursor(CONSUMER, events.latest_cursor())
+
+    booking = client.post(
+        "/api/bookings/",
+        json={
+            "service_id": service["id"],
+            "scheduled_at": (
+                datetime.now(timezone.utc) + timedelta(days=500)
+            ).isoformat(),
+            "duration": 1,
+        },
+        headers=auth_headers(CUSTOMER_ID),
+    ).json()
+
+    received = []
+
+    def endpoint(request):
+        if request.headers["host"] == "hooks.test" and request.url.path == "/owner":
+            received.extend(json.loads(request.content)["events"])
+        return httpx.Response(204)
+
+    async def dispatch():
+        sender = _sender(endpoint)
+        try:
+            return await WebhookDispatcher(session, sender).dispatch()
+        finally:
+            await sender.aclose()
+
+    assert asyncio.run(dispatch()) >= 1
+    assert [(event["type"], event["entity_id"]) for event in received] == [
+        ("booking.created", booking["id"])
+    ]
+    assert asyncio.run(dispatch()) == 0
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://169.254.169.254/latest/meta-data",
+        "https://10.0.0.7/hook",
+        "https://[::ffff:127.0.0.1]/hook",
+        "https://localhost/hook",
+        "https://metadata.internal/hook",
+    ],
+)
+def test_internal_urls_are_refused(client, url):
+    response = client.post(
+        "/api/webhooks/", json={"url": url}, headers=auth_headers(OWNER_ID)
+    )
+    assert response.status_code == 400, response.text
+
+
+def test_sender_refuses_names_rebound_to_internal_addresses(dns):
+    received = []
+    dns["hooks.test"] = "127.0.0.1"
+
+    def endpoint(request):
+        received.append(request)
+        return httpx.Response(200)
+
+    batch = WebhookBatch("https://hooks.test/c", "secret", [{"id": "1.1"}])
+    assert asyncio.run(_deliver(_sender(endpoint), [batch])) == (0, 1)
+    assert received == []
+
+
+def test_sender_gives_up_on_batches_past_the_run_timeout():
+    async def endpoint(request):
+        if request.url.path == "/slow":
+            await asyncio.sleep(5)
+        return httpx.Response(200)
+
+    batches = [
+        WebhookBatch("https://hooks.test/slow", "secret", [{"id": "1.1"}]),
+        WebhookBatch("https://hooks.test/fast", "secret", [{"id": "1.2"}]),
+    ]
+    assert asyncio.run(_deliver(_sender(endpoint), batches, timeout=0.1)) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "status, status_changed, expected",
+    [
+        ("succeeded", True, "payment.succeeded"),
+        # e.g. metadata written to a payment that had already succeeded
+        ("succeeded", False, None),
+        ("cancelled", True, None),
+    ],
+)
+def test_payment_succeeded_only_on_the_transition(status, status_changed, expected):
+    event = ChangeEvent(
+        entity="payment",
+        entity_id="p1",
+        user_id=CUSTOMER_ID,
+        action="updated",
+        status=status,
+        status_changed=status_changed,
+    )
+    assert event_type(event) == expected